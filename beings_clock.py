@@ -0,0 +1,168 @@
+import time, math, threading
+from collections import deque
+import numpy as np
+
+"""
+Living beings tempo clock
+================================================================
+24 ppqn MIDI clock for beings_field, sent from its own thread to
+a MIDI output (e.g. a loopMIDI / IAC loopback port) so other rigs
+follow GLOBAL_TEMPO, and the beat grid quantized notes wait for.
+
+================================================================
+- Ticks are scheduled on absolute deadlines (no drift). Clock
+  messages are written LOOKAHEAD_S ahead with PortMidi timestamps:
+  PortMidi sends each one at its time from its own timer, so the
+  MIDI clock does not depend on when this thread gets the GIL (the
+  thread only sleeps, it never spins).
+- PortMidi timestamps are whole milliseconds. Each one is the exact
+  tick time rounded, so the error stays within +-0.5 ms and never
+  accumulates; intervals alternate around the period instead (20/21
+  ms at 120 BPM for 20.83 ms). That is the floor of the sent jitter.
+- After a stall (debugger, suspend) the missed ticks are skipped on
+  the same grid for both the wake-ups and the messages. Messages of
+  the stalled span already handed to PortMidi still go out (at once,
+  late); the grid counts them so its phase matches the receivers.
+- Start (0xFA) on start(), Stop (0xFC) on stop().
+- defer(fn, *args): with quantize > 0 the call waits for the next
+  grid step (every `quantize` ticks, 6 = 16th note) and runs on this
+  thread once the step is reached; otherwise it runs at once.
+- Logged: grid wake lateness (reached - deadline, the timing of the
+  quantized calls), the timestamps of the sent clock messages and
+  writes that missed their lookahead; jitter() summarizes them, the
+  sent intervals against the period being the MIDI clock jitter.
+"""
+
+PPQN = 24
+LOOKAHEAD_S = 0.05  # clock messages are handed to PortMidi this long before their time (s)
+JITTER_LOG = 1 << 16  # ticks kept for the jitter stats
+CLOCK, START, STOP = 0xF8, 0xFA, 0xFC
+
+def open_midi_out(name):
+    """pygame.midi output whose name contains `name` (timestamped), exits if none"""
+    import pygame.midi
+    pygame.midi.init()
+    outputs = []
+    for i in range(pygame.midi.get_count()):
+        _, dev, _, is_output, _ = pygame.midi.get_device_info(i)
+        if is_output:
+            outputs.append(dev.decode())
+            if name.lower() in dev.decode().lower():
+                print(f"--- MIDI clock: output {dev.decode()} ---")
+                return pygame.midi.Output(i, latency=1)  # latency > 0: messages sent at their timestamps (+1 ms)
+    exit(f"MIDI output '{name}' not found (outputs: {', '.join(outputs) or 'none'}).")
+
+class TempoClock:
+    """MIDI clock and quantize grid, timestamped ahead from a sleeping thread"""
+    def __init__(self, bpm, port=None, quantize=0):
+        self.bpm, self.port, self.quantize = bpm, port, quantize
+        self.out = None
+        self.midi_ms = None  # perf_counter (s) -> PortMidi time (ms)
+        self.pending = deque()  # deferred calls, appended by the audio thread, run by the clock thread
+        self.late = np.zeros(JITTER_LOG)
+        self.reached = np.zeros(JITTER_LOG)
+        self.stamps = np.zeros(JITTER_LOG)  # PortMidi timestamps (ms) of the sent clock ticks
+        self.ticks = 0  # grid ticks reached
+        self.skipped = 0  # grid ticks skipped by stalls but sent to the receivers
+        self.sent = 0  # clock messages handed to PortMidi
+        self.late_writes = 0  # clock messages written after their time
+        self.running = threading.Event()
+        self.thread = None
+
+    @property
+    def period(self):
+        return 60.0 / (self.bpm * PPQN)
+
+    def defer(self, fn, *args):
+        """Call fn(*args) on the next grid step, or now when not quantizing"""
+        if self.quantize and self.running.is_set(): self.pending.append((fn, args))
+        else: fn(*args)
+
+    def start(self):
+        if self.port:
+            import pygame.midi
+            self.out = open_midi_out(self.port)
+            offset = pygame.midi.time() - time.perf_counter() * 1e3
+            # Absolute time rounded: the rounding error is carried, not accumulated
+            self.midi_ms = lambda t: int(round(t * 1e3 + offset)) - 1  # minus the output latency
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print(f"--- Tempo clock: {self.bpm:g} BPM, {PPQN} ppqn"
+              + (f", quantize every {self.quantize} ticks" if self.quantize else "") + " ---")
+        return self
+
+    def _send(self, status, t):
+        """Hand one message to PortMidi, to be sent at perf_counter time t"""
+        if t < time.perf_counter(): self.late_writes += 1
+        stamp = self.midi_ms(t)
+        if status == CLOCK:
+            self.stamps[self.sent % JITTER_LOG] = stamp
+            self.sent += 1
+        self.out.write([[[status], stamp]])
+
+    def _run(self):
+        deadline = time.perf_counter() + LOOKAHEAD_S + self.period  # next tick to be reached
+        sent = deadline  # next tick not yet handed to PortMidi
+        if self.out: self._send(START, deadline - self.period)
+        while self.running.is_set():
+            now = time.perf_counter()
+            if now - deadline > self.period:  # stalled (debugger, suspend): skip the missed ticks, don't burst
+                skip = math.floor((now - deadline) / self.period)
+                if self.out:  # those already handed to PortMidi still go out: count them
+                    self.skipped += min(max(round((sent - deadline) / self.period), 0), skip)
+                deadline += skip * self.period
+                sent = max(sent, deadline)  # same grid origin for wake-ups and messages
+            while self.out and sent <= now + LOOKAHEAD_S:
+                self._send(CLOCK, sent)
+                sent += self.period
+            if now >= deadline:
+                k = self.ticks % JITTER_LOG
+                self.late[k], self.reached[k] = now - deadline, now
+                self.ticks += 1
+                if self.quantize and (self.ticks + self.skipped) % self.quantize == 0:
+                    self.flush()
+                deadline += self.period  # absolute schedule, follows bpm changes from the next tick
+                continue
+            wake = min(deadline, sent - LOOKAHEAD_S) if self.out else deadline
+            time.sleep(max(wake - time.perf_counter(), 0))
+
+    def flush(self):
+        while self.pending:
+            fn, args = self.pending.popleft()
+            try: fn(*args)
+            except Exception as e: print(f"--- Tempo clock: deferred call failed: {e} ---")
+
+    def stop(self):
+        self.running.clear()
+        if self.thread: self.thread.join(1.0)
+        self.flush()
+        if self.out:
+            self._send(STOP, time.perf_counter() + LOOKAHEAD_S)
+            time.sleep(2 * LOOKAHEAD_S)  # let PortMidi send what is queued
+            self.out.close()
+
+    def jitter(self):
+        """Grid wake lateness, wake interval spread and sent clock interval error (ms), last JITTER_LOG ticks"""
+        n = min(self.ticks, JITTER_LOG)
+        if n < 2: return None
+        order = np.arange(self.ticks - n, self.ticks) % JITTER_LOG
+        late, reached = self.late[order] * 1e3, self.reached[order] * 1e3
+        j = {'ticks': self.ticks, 'wake_late_mean_ms': late.mean(), 'wake_late_p99_ms': np.percentile(late, 99),
+             'wake_late_max_ms': late.max(), 'wake_interval_std_ms': np.diff(reached).std(),
+             'sent': self.sent, 'late_writes': self.late_writes}
+        m = min(self.sent, JITTER_LOG)
+        if m >= 2:
+            err = np.abs(np.diff(self.stamps[np.arange(self.sent - m, self.sent) % JITTER_LOG]) - self.period * 1e3)
+            j['sent_err_mean_ms'], j['sent_err_max_ms'] = err.mean(), err.max()
+        return j
+
+    def report(self):
+        j = self.jitter()
+        if j:
+            print(f"--- Tempo clock: {j['ticks']} ticks, grid wake lateness mean {j['wake_late_mean_ms']:.3f} ms, "
+                  f"p99 {j['wake_late_p99_ms']:.3f} ms, max {j['wake_late_max_ms']:.3f} ms, "
+                  f"wake interval std {j['wake_interval_std_ms']:.3f} ms ---")
+            if 'sent_err_mean_ms' in j:
+                print(f"--- MIDI clock: {j['sent']} ticks sent, interval error vs period mean {j['sent_err_mean_ms']:.3f} ms, "
+                      f"max {j['sent_err_max_ms']:.3f} ms (1 ms timestamps), {j['late_writes']} written past their time ---")
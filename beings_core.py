@@ -0,0 +1,218 @@
+import numpy as np
+
+"""
+Living beings core
+================================================================
+Vectorized physics of the beings_field beings. Plain NumPy, no
+audio server or Launchpad, so the same step drives the instrument
+(one master tick for all beings) and headless simulations.
+
+================================================================
+Every being has its own tempo: `sleep` is the time between two of
+its moves, as the per-being Metro of MetroBall. Instead of one
+Metro each, a single fixed-rate clock calls step(now); the beings
+whose `due` time has come move together:
+- move one cell along `angle`, bounce on obstacles (angle flips)
+- walls reflect (or wrap), positions are clamped to the world
+- on any hit sleep grows by the friction (x1.7 when fast decaying),
+  fast decaying beings also slow down x1.15 every move
+- a being whose sleep reaches STOP_THRESHOLD expires on its next turn
+Coordinates follow the Launchpad grid: x 0..W-1, y 1..H (8x8 by
+default, larger worlds are seen through an 8x8 viewport).
+
+Neighbors come from a uniform grid (SpatialHash) rebuilt every
+step in O(N): beings sorted by cell, per-cell sums for flocking
+(separation, alignment, cohesion over the 3x3 cells around each
+being) and cell mates for collisions; nothing is pairwise.
+"""
+
+STOP_THRESHOLD, ANGLE_VAR = 1.8, 0.5
+X_MIN, X_MAX, Y_MIN, Y_MAX = 0, 7, 1, 8
+FAST_HIT, FAST_SLOW = 1.7, 1.15  # fast-kill friction on hits, and per move
+FLOCK_STEER = 0.5  # how far one move turns toward the flocking force
+
+def quad_gains(x, y, x_min=X_MIN, x_max=X_MAX, y_min=Y_MIN, y_max=Y_MAX):
+    """Vectorized get_quad_gains: [FL, FR, RL, RR] per being, shape (n, 4)"""
+    nx = np.clip((np.asarray(x) - x_min) / (x_max - x_min), 0, 1)
+    ny = np.clip((np.asarray(y) - y_min) / (y_max - y_min), 0, 1)
+    return np.stack([(1 - nx) * (1 - ny), nx * (1 - ny), (1 - nx) * ny, nx * ny], axis=-1)
+
+class SpatialHash:
+    """Uniform grid of unit cells (the Launchpad cells) over the world
+
+    build() sorts the beings by cell with a counting/radix sort, so a
+    rebuild, per-cell sums and 3x3 neighborhood sums are all O(N + cells).
+    """
+    def __init__(self, cols, rows, n):
+        self.cols, self.rows = cols, rows
+        self.key = np.uint16 if cols * rows <= 1 << 16 else np.int64  # 16-bit keys sort by radix
+        self.cell_id = np.full(n, -1, dtype=np.int64)
+        self.build(np.zeros(n), np.zeros(n), np.zeros(0, dtype=np.int64))
+
+    def cells(self, x, y):
+        cx = np.clip(np.rint(x).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip(np.rint(y).astype(np.int64), 0, self.rows - 1)
+        return cy * self.cols + cx
+
+    def build(self, x, y, members):
+        self.members = members
+        self.ids = self.cells(x[members], y[members])
+        self.cell_id[:] = -1
+        self.cell_id[members] = self.ids
+        self.order = members[np.argsort(self.ids.astype(self.key), kind='stable')]
+        self.counts = np.bincount(self.ids, minlength=self.cols * self.rows)
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    def sums(self, values):
+        """Per-cell sums of values[..., member], shape (..., rows, cols), one bincount"""
+        values = np.atleast_2d(values)[:, self.members]
+        k, cells = len(values), self.cols * self.rows
+        keys = (self.ids + cells * np.arange(k)[:, None]).ravel()
+        total = np.bincount(keys, weights=values.ravel(), minlength=k * cells)
+        return total.reshape(k, self.rows, self.cols)
+
+    @staticmethod
+    def around(grid):
+        """3x3 neighborhood sums over the last two axes (separable, no copy per offset)"""
+        p = np.zeros(grid.shape[:-2] + (grid.shape[-2] + 2, grid.shape[-1] + 2))
+        p[..., 1:-1, 1:-1] = grid
+        rows = p[..., :-2, :] + p[..., 1:-1, :] + p[..., 2:, :]
+        return rows[..., :-2] + rows[..., 1:-1] + rows[..., 2:]
+
+    def in_cell(self, cell):
+        """Beings in one cell id"""
+        return self.order[self.starts[cell]:self.starts[cell] + self.counts[cell]]
+
+    def mate(self, i):
+        """Another being in the same cell as being i, or -1"""
+        if self.cell_id[i] < 0: return -1
+        for j in self.in_cell(self.cell_id[i]):
+            if j != i: return int(j)
+        return -1
+
+class BeingField:
+    """State of up to n beings as arrays, advanced by a shared clock"""
+    def __init__(self, n, width=X_MAX + 1, height=Y_MAX - Y_MIN + 1, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.x_min, self.x_max = X_MIN, X_MIN + width - 1
+        self.y_min, self.y_max = Y_MIN, Y_MIN + height - 1
+        self.x, self.y = np.zeros(n), np.full(n, float(Y_MIN))
+        self.angle = np.zeros(n)
+        self.sleep = np.zeros(n)
+        self.due = np.full(n, np.inf)  # next move time (s)
+        self.active = np.zeros(n, dtype=bool)
+        self.fast_decay = np.zeros(n, dtype=bool)
+        self.cell = np.full((n, 2), -1, dtype=np.int64)  # last grid cell, -1 = none yet
+        # Obstacle cells, indexed [x, y]
+        self.obstacles = np.zeros((self.x_max + 1, self.y_max + 1), dtype=bool)
+        self.hash = SpatialHash(self.x_max + 1, self.y_max + 1, n)
+        self.flock = None  # (separation, alignment, cohesion) weights, None = off
+        self.stop_threshold = STOP_THRESHOLD
+
+    def spawn(self, i, x, y, angle, sleep, now):
+        """Start being i; it moves at once, as a Metro does when played"""
+        self.cell[i] = -1
+        self.x[i], self.y[i], self.angle[i], self.sleep[i] = x, y, angle, sleep
+        self.due[i], self.fast_decay[i] = now, False
+        self.active[i] = True  # last: the audio thread may step meanwhile
+
+    def kill(self, i):
+        self.active[i] = False
+        self.due[i] = np.inf
+
+    def nearest(self, cx, cy, k, among=None):
+        """Indices of the k active beings nearest to (cx, cy), nearest first (O(N))"""
+        cand = np.flatnonzero(self.active if among is None else self.active & among)
+        if len(cand) > k:
+            d2 = (self.x[cand] - cx) ** 2 + (self.y[cand] - cy) ** 2
+            cand = cand[np.argpartition(d2, k - 1)[:k]]
+        d2 = (self.x[cand] - cx) ** 2 + (self.y[cand] - cy) ** 2
+        return cand[np.argsort(d2)]
+
+    def _steer(self, idx, a):
+        """Flocking: turn each moving being toward separation + alignment + cohesion"""
+        ws, wa, wc = self.flock
+        h = self.hash
+        own_n, own_x, own_y, _, _ = own = h.sums(np.stack(
+            [np.ones(self.n), self.x, self.y, np.cos(self.angle), np.sin(self.angle)]))
+        near_n, near_x, near_y, near_c, near_s = h.around(own)
+
+        c = h.cell_id[idx]
+        ok = c >= 0
+        x, y = self.x[idx], self.y[idx]
+        flat = lambda g: np.where(ok, g.ravel()[np.maximum(c, 0)], 0.0)
+        self_in = ok.astype(float)  # a being is counted in its own cell
+        others = flat(near_n) - self_in
+        mates = flat(own_n) - self_in
+        with np.errstate(invalid='ignore', divide='ignore'):
+            coh_x = np.where(others > 0, (flat(near_x) - x * self_in) / others - x, 0)
+            coh_y = np.where(others > 0, (flat(near_y) - y * self_in) / others - y, 0)
+            ali_x = np.where(others > 0, (flat(near_c) - np.cos(a) * self_in) / others, 0)
+            ali_y = np.where(others > 0, (flat(near_s) - np.sin(a) * self_in) / others, 0)
+            sep_x = np.where(mates > 0, x - (flat(own_x) - x * self_in) / mates, 0) * mates
+            sep_y = np.where(mates > 0, y - (flat(own_y) - y * self_in) / mates, 0) * mates
+        fx = ws * sep_x + wa * ali_x + wc * coh_x
+        fy = ws * sep_y + wa * ali_y + wc * coh_y
+        return np.arctan2(np.sin(a) + FLOCK_STEER * fy, np.cos(a) + FLOCK_STEER * fx)
+
+    def step(self, now, wrap=False, friction=1.04):
+        """Move every due being once, returns a dict of index arrays
+
+        friction is one value or one per being. now=inf moves every active
+        being (fast-forward, due times are then meaningless).
+        moved: beings that moved this tick; entered: their subset that reached
+        a new grid cell (cell holds it); obstacle: bounced on an obstacle;
+        hit: any wall or obstacle hit; expired: beings that just stopped.
+        """
+        due = self.active & (self.due <= now)
+        expired = np.flatnonzero(due & (self.sleep >= self.stop_threshold))
+        self.active[expired] = False
+        self.due[expired] = np.inf
+        idx = np.flatnonzero(due & (self.sleep < self.stop_threshold))
+        if not len(idx):
+            if len(expired): self.hash.build(self.x, self.y, np.flatnonzero(self.active))
+            empty = np.zeros(0, dtype=np.int64)
+            return {'moved': empty, 'entered': empty, 'obstacle': empty, 'hit': empty, 'expired': expired}
+
+        x, y, a = self.x[idx], self.y[idx], self.angle[idx]
+        if self.flock is not None:
+            a = self._steer(idx, a)
+        jitter = lambda k: self.rng.uniform(-ANGLE_VAR, ANGLE_VAR, k)
+        nx, ny = x + np.cos(a), y + np.sin(a)
+        ngx, ngy = np.rint(nx).astype(np.int64), np.rint(ny).astype(np.int64)
+        inside = (ngx >= 0) & (ngx <= self.x_max) & (ngy >= 0) & (ngy <= self.y_max)
+        obst = np.zeros(len(idx), dtype=bool)
+        obst[inside] = self.obstacles[ngx[inside], ngy[inside]]
+        a = np.where(obst, -a + jitter(len(idx)), a)
+        x, y = np.where(obst, x, nx), np.where(obst, y, ny)
+        hit = obst.copy()
+
+        if wrap:
+            out_x, out_y = (x < self.x_min) | (x > self.x_max), (y < self.y_min) | (y > self.y_max)
+            x = np.where(x < self.x_min, self.x_max, np.where(x > self.x_max, self.x_min, x))
+            y = np.where(y < self.y_min, self.y_max, np.where(y > self.y_max, self.y_min, y))
+            hit |= out_x | out_y
+        else:
+            wall_x = (x <= self.x_min) | (x >= self.x_max)
+            wall_y = (y <= self.y_min) | (y >= self.y_max)
+            a = np.where(wall_x, np.pi - a + jitter(len(idx)), a)
+            a = np.where(wall_y, -a + jitter(len(idx)), a)
+            hit |= wall_x | wall_y
+            x, y = np.clip(x, self.x_min, self.x_max), np.clip(y, self.y_min, self.y_max)
+
+        cell = np.stack([np.rint(x), np.rint(y)], axis=1).astype(np.int64)
+        entered = (cell != self.cell[idx]).any(axis=1)
+
+        fast = self.fast_decay[idx]
+        sleep = self.sleep[idx]
+        if np.ndim(friction): friction = np.asarray(friction)[idx]
+        sleep = np.where(hit, sleep * np.where(fast, FAST_HIT, friction), sleep)
+        sleep = np.where(fast, sleep * FAST_SLOW, sleep)
+
+        self.x[idx], self.y[idx], self.angle[idx], self.sleep[idx] = x, y, a, sleep
+        self.cell[idx] = cell
+        # Next turn one (new) sleep after the scheduled one, never in the past
+        self.due[idx] = np.maximum(self.due[idx] + sleep, now)
+        self.hash.build(self.x, self.y, np.flatnonzero(self.active))
+        return {'moved': idx, 'entered': idx[entered], 'obstacle': idx[obst], 'hit': idx[hit], 'expired': expired}
@@ -1,7 +1,12 @@
 import time, random, math, threading
+from collections import deque
 import numpy as np
 from pyo import *
 import launchpad_py as launchpad
+from beings_core import BeingField, quad_gains as field_gains
+from beings_samples import INSTRUMENT_FAMILIES, SampleBank, missing_instruments, SAMPLE_DIR
+from beings_reflections import EarlyReflections
+from beings_clock import TempoClock
 
 """
 Living Beings Field: 
@@ -30,6 +35,7 @@ Side Buttons 6-7: Trigger/Kill being (Lows)
 Main Grid (8x8):
 - Press Empty Cell: Toggle Static Obstacle (Amber LED)
 - Active Balls: Real-time position tracking (Unique colors per ball index)
+- Larger worlds (WORLD_W/WORLD_H): the grid is a viewport following the balls, crowd beings dim green
 
 ====================================================================================================
 Life Expectancy (shown at start):
@@ -62,109 +68,8 @@ s.deactivateMidi()
 s.boot().start()
 
 # --- 3. Instrument Families & Envelopes ---
-
-# Envelope format: (attack, decay, sustain, release, osc_type, filter_type, brightness)
-# osc_type: 'sine', 'saw', 'square', 'noise', 'pulse'
-# filter_type: 'lp' (lowpass), 'hp' (highpass), 'bp' (bandpass), 'none'
-# brightness: 0.0-1.0 (affects filter cutoff)
-
-# --- 3. Instrument Families & Envelopes ---
-INSTRUMENT_FAMILIES = {
-    'lows': {
-        'bass': (0.08, 0.15, 0.7, 0.5, 'saw', 'lp', 0.3),
-        'cello': (0.06, 0.12, 0.75, 0.45, 'saw', 'lp', 0.4),
-        'piano': (0.003, 0.3, 0.2, 0.6, 'saw', 'lp', 0.7),
-        'harp': (0.002, 0.2, 0.15, 0.7, 'sine', 'lp', 0.8),
-        'bass_tuba': (0.08, 0.15, 0.75, 0.4, 'square', 'lp', 0.25),
-        'bass_trombone': (0.06, 0.12, 0.7, 0.35, 'square', 'lp', 0.35),
-        'baritone_sax': (0.04, 0.12, 0.7, 0.35, 'square', 'bp', 0.4),
-        'tenor_sax': (0.035, 0.1, 0.7, 0.3, 'square', 'bp', 0.5),
-        'contra_bassoon': (0.06, 0.15, 0.7, 0.4, 'sine', 'lp', 0.2),
-        'bass_clarinet': (0.05, 0.12, 0.75, 0.35, 'sine', 'lp', 0.3),
-   },
-   
-    'mids': {
-        'viola': (0.05, 0.1, 0.75, 0.4, 'saw', 'lp', 0.5),
-        'vibraphone': (0.005, 0.4, 0.3, 1.2, 'sine', 'none', 0.9),
-        'celeste': (0.004, 0.25, 0.25, 0.8, 'sine', 'lp', 0.85),
-        'tenor_trombone': (0.05, 0.1, 0.7, 0.3, 'square', 'lp', 0.45),
-        'soprano_sax': (0.03, 0.08, 0.65, 0.28, 'square', 'bp', 0.6),
-        'alto_clarinet': (0.04, 0.1, 0.75, 0.3, 'sine', 'lp', 0.4),
-        'clarinet': (0.035, 0.08, 0.75, 0.28, 'sine', 'lp', 0.5),
-        'english_horn': (0.04, 0.1, 0.7, 0.3, 'sine', 'lp', 0.45),
-    },
-    'highs': {
-        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
-        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
-        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
-        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
-        'sopranino_sax': (0.025, 0.07, 0.65, 0.25, 'square', 'bp', 0.7),
-        'oboe': (0.03, 0.08, 0.7, 0.25, 'sine', 'lp', 0.6),
-        'alto_flute': (0.04, 0.1, 0.65, 0.3, 'sine', 'lp', 0.65),
-    },
-
-    'veryhighs': {
-        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
-        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
-        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
-        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
-        'piccolo': (0.02, 0.06, 0.5, 0.2, 'sine', 'hp', 0.9),
-    },    
-    'strings': {
-        'bass': (0.08, 0.15, 0.7, 0.5, 'saw', 'lp', 0.3),
-        'cello': (0.06, 0.12, 0.75, 0.45, 'saw', 'lp', 0.4),
-        'viola': (0.05, 0.1, 0.75, 0.4, 'saw', 'lp', 0.5),
-        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
-    }, 
-   'keyboard_perc': {
-        'piano': (0.003, 0.3, 0.2, 0.6, 'saw', 'lp', 0.7),
-        'harp': (0.002, 0.2, 0.15, 0.7, 'sine', 'lp', 0.8),
-        'vibraphone': (0.005, 0.4, 0.3, 1.2, 'sine', 'none', 0.9),
-        'celeste': (0.004, 0.25, 0.25, 0.8, 'sine', 'lp', 0.85),
-        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
-        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
-    },
-    'brass': {
-        'bass_tuba': (0.08, 0.15, 0.75, 0.4, 'square', 'lp', 0.25),
-        'bass_trombone': (0.06, 0.12, 0.7, 0.35, 'square', 'lp', 0.35),
-        'tenor_trombone': (0.05, 0.1, 0.7, 0.3, 'square', 'lp', 0.45),
-        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
-    },
-    'saxophones': {
-        'baritone_sax': (0.04, 0.12, 0.7, 0.35, 'square', 'bp', 0.4),
-        'tenor_sax': (0.035, 0.1, 0.7, 0.3, 'square', 'bp', 0.5),
-        'soprano_sax': (0.03, 0.08, 0.65, 0.28, 'square', 'bp', 0.6),
-        'sopranino_sax': (0.025, 0.07, 0.65, 0.25, 'square', 'bp', 0.7),
-    },
-    'woodwinds': {
-        'contra_bassoon': (0.06, 0.15, 0.7, 0.4, 'sine', 'lp', 0.2),
-        'bass_clarinet': (0.05, 0.12, 0.75, 0.35, 'sine', 'lp', 0.3),
-        'alto_clarinet': (0.04, 0.1, 0.75, 0.3, 'sine', 'lp', 0.4),
-        'clarinet': (0.035, 0.08, 0.75, 0.28, 'sine', 'lp', 0.5),
-        'english_horn': (0.04, 0.1, 0.7, 0.3, 'sine', 'lp', 0.45),
-        'oboe': (0.03, 0.08, 0.7, 0.25, 'sine', 'lp', 0.6),
-        'alto_flute': (0.04, 0.1, 0.65, 0.3, 'sine', 'lp', 0.65),
-        'flute': (0.03, 0.08, 0.6, 0.25, 'sine', 'lp', 0.75),
-        'piccolo': (0.02, 0.06, 0.5, 0.2, 'sine', 'hp', 0.9),
-    },
-    'drums': {
-        'bass_drum': (0.001, 0.15, 0.0, 0.3, 'noise', 'lp', 0.15),
-        'snare_drum': (0.001, 0.05, 0.0, 0.12, 'noise', 'bp', 0.6),
-        'closed_hihat': (0.001, 0.03, 0.0, 0.08, 'noise', 'hp', 0.95),
-        'open_hihat': (0.001, 0.08, 0.1, 0.25, 'noise', 'hp', 0.9),
-        'ride': (0.002, 0.12, 0.15, 0.4, 'noise', 'hp', 0.7),
-        'cymbals': (0.003, 0.3, 0.2, 1.5, 'noise', 'hp', 0.75),
-    },
-    'percussion': {
-        'triangle': (0.001, 0.1, 0.1, 1.2, 'sine', 'hp', 1.0),
-        'claves': (0.001, 0.02, 0.0, 0.05, 'noise', 'bp', 0.8),
-        'maracas': (0.002, 0.05, 0.0, 0.15, 'noise', 'hp', 0.85),
-        'gong': (0.01, 0.5, 0.3, 2.0, 'noise', 'lp', 0.3),
-        'woodblock': (0.001, 0.03, 0.0, 0.08, 'noise', 'bp', 0.7),
-        'cowbell': (0.001, 0.08, 0.05, 0.2, 'square', 'bp', 0.75),
-        'bongos': (0.002, 0.08, 0.0, 0.15, 'noise', 'bp', 0.5),
-    }
-}
+# INSTRUMENT_FAMILIES (envelope, oscillator, filter, brightness per instrument) lives in beings_samples,
+# which renders it to the sample cache played by SamplerVoice
 
 BALL_FAMILY_MAP = [
     'veryhighs',   # Ball/Being 0
@@ -180,6 +85,20 @@ BALL_FAMILY_MAP = [
 # --- 4. Configuration & State ---
 SIZE, MAX_BALLS = 8, 8
 STOP_THRESHOLD, ANGLE_VAR = 1.8, 0.5
+ENGINE_MODE = 'master'  # 'metro': one Metro + TrigFunc per being, 'master': one clock moves all beings (beings_core)
+MASTER_TICK = BUFFER_SIZE / s.getSamplingRate()  # master clock period (s): one audio buffer, as pyo runs
+                                                 # TrigFunc callbacks once per buffer, which bounds the timing error
+VOICE_TAIL = 0.5  # extra time (s) a voice keeps running after its being's last note tail
+EFFECTS_TAIL = 20.0  # time (s) the effects keep running after the last voice parks: 8 s delay echoes, reverb
+WORLD_W, WORLD_H = 8, 8  # world size in cells, the Launchpad shows an 8x8 viewport of it (master mode)
+VIEW_FOLLOW = True  # viewport follows the side-button beings when the world is larger than 8x8
+CROWD = 0  # extra autonomous beings roaming the world (master mode), voiced by lending idle voices
+CROWD_REASSIGN = 0.25  # seconds between two lendings of idle voices to the beings nearest the viewport
+FLOCK = None  # (separation, alignment, cohesion) weights, e.g. (0.3, 0.5, 0.2); None = free beings
+SAMPLER = False  # voices read pre-rendered instruments (python beings_samples.py) instead of synthesizing
+REFLECTIONS = True  # early reflections off the walls and obstacles (beings_reflections), one shared multi-tap delay
+REFLECT_TAPS = 4  # obstacle taps per voice, after the 4 wall taps
+REFLECT_MIX = 0.5  # early reflections level
 
 # Musical Scales (semitone intervals from root)
 SCALES = {
@@ -227,10 +146,71 @@ wrap_enabled = False
 obstacle_mode = 0  # 0=idle(green), 1=removing(red), 2=relocating(amber)
 delay_mode = 0  # 0=off(green), 1=circular(red), 2=pingpong(amber)
 obstacles = set()
-grid_map = {} 
 ball_freqs = [0.0] * MAX_BALLS
 balls = [None] * MAX_BALLS
-lock = threading.Lock()
+
+class CellBoard:
+    """Single-writer double buffer of the grid cell of every being (None = off the grid)
+
+    Only the audio thread writes it: it edits its own list, then publishes an
+    immutable copy with one reference swap. Readers (LED thread, obstacle
+    sequences) take the published tuple, no lock, never a half-done update.
+    """
+    def __init__(self, n):
+        self.cells = [None] * n
+        self.front = tuple(self.cells)
+
+    def set(self, i, pos):
+        self.cells[i] = pos
+        self.front = tuple(self.cells)
+
+    def mate(self, i, pos):
+        """Writer side: another being in pos, or None"""
+        return next((j for j, c in enumerate(self.cells) if c == pos and j != i), None)
+
+audio_calls = deque()  # changes to the beings from control threads, applied by the audio thread
+
+def on_audio_thread(fn, *args):
+    """Run fn(*args) on the audio thread before its next being update (single writer of the beings)"""
+    audio_calls.append((fn, args))
+
+def run_audio_calls():
+    while audio_calls:
+        fn, args = audio_calls.popleft()
+        try: fn(*args)
+        except Exception as e: print(f"--- Audio thread: queued call failed: {e} ---")
+
+class TimedLock:
+    """threading.Lock recording how long each thread waited for it"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = {}  # thread name: [acquisitions, total wait (s), max wait (s)]
+
+    def __enter__(self):
+        t0 = time.perf_counter()
+        self._lock.acquire()
+        wait = time.perf_counter() - t0
+        w = self.waits.setdefault(threading.current_thread().name, [0, 0.0, 0.0])
+        w[0] += 1; w[1] += wait; w[2] = max(w[2], wait)
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def report(self):
+        for name, (n, total, worst) in sorted(self.waits.items()):
+            print(f"--- Lock: {name}, {n} waits, mean {total / n * 1e3:.3f} ms, max {worst * 1e3:.3f} ms ---")
+
+board = CellBoard(MAX_BALLS)  # written by the audio thread only
+lock = TimedLock()  # control threads only (buttons, timers, sequences): never audio, never MIDI
+field = BeingField(MAX_BALLS + CROWD, WORLD_W, WORLD_H)  # vectorized being state (ENGINE_MODE 'master')
+field.flock = FLOCK
+view = [0, 0]  # world offset of the Launchpad viewport (x, y)
+if ENGINE_MODE == 'metro' and (WORLD_W, WORLD_H, CROWD, FLOCK) != (SIZE, SIZE, 0, None):
+    exit("Large worlds, crowds and flocking need ENGINE_MODE 'master'.")
+if SAMPLER and missing_instruments(SAMPLE_DIR):
+    exit("Sample cache missing or outdated, run: python beings_samples.py")
+samples = SampleBank(SAMPLE_DIR) if SAMPLER else None
 
 lt_timer = fm_timer = gran_timer = wrap_timer = obstacle_timer = delay_timer = None
 FRICTION_VALUES = [1.1, 1.04, 1.015]
@@ -252,9 +232,12 @@ BALL_SCALE_FAMILIES = [
     ['indian_raga_bhairav', 'indian_raga_kalyan', 'neapolitan_minor']  # Ball 7 - Modal/Raga
 ]
 
-# Ableton Link tempo (BPM)
+# Tempo (BPM) of the MIDI clock sent to other rigs and of the quantize grid
 GLOBAL_TEMPO = 120.0
-link_metro = None  # Will hold the master Metro
+MIDI_CLOCK = False  # send 24 ppqn MIDI clock to MIDI_CLOCK_PORT
+MIDI_CLOCK_PORT = 'loopMIDI'  # output name (substring), a loopback port is enough to test
+QUANTIZE = 0  # 0: notes play at once, N: notes wait for the next grid step of N clock ticks (6 = 16th note)
+clock = TempoClock(GLOBAL_TEMPO, MIDI_CLOCK_PORT if MIDI_CLOCK else None, QUANTIZE)
 
 # --- 5. Musical Scale Functions ---
 def quantize_to_scale(midi_note, scale_intervals):
@@ -287,6 +270,29 @@ def get_quad_gains(x, y):
     nx, ny = x / 7.0, (y - 1) / 7.0
     return [(1.-nx)*(1.-ny), nx*(1.-ny), (1.-nx)*ny, nx*ny]
 
+def view_gains(x, y):
+    """Quad gains of world positions (arrays) seen from the viewport, clipped at its edges"""
+    return field_gains(np.asarray(x) - view[0], np.asarray(y) - view[1])
+
+def to_pad(pos):
+    """Launchpad cell of a world cell, None outside the viewport"""
+    px, py = pos[0] - view[0], pos[1] - view[1]
+    return (px, py) if 0 <= px <= 7 and 1 <= py <= 8 else None
+
+def view_random_pos():
+    """Random world position inside the viewport"""
+    return view[0] + random.uniform(0, 7), view[1] + random.uniform(1, 8)
+
+def add_obstacle(pos):
+    obstacles.add(pos)
+    on_audio_thread(field.obstacles.__setitem__, pos, True)
+    relayout_reflections()
+
+def remove_obstacle(pos):
+    obstacles.discard(pos)
+    on_audio_thread(field.obstacles.__setitem__, pos, False)
+    relayout_reflections()
+
 def lp_led(x, y, r, g, raw=False):
     if mode == "Mk1":
         if raw: lp.LedCtrlRaw(x, r, g)
@@ -296,26 +302,31 @@ def lp_led(x, y, r, g, raw=False):
         if raw: lp.LedCtrlRaw(x, rs, gs, 0)
         else: lp.LedCtrlXY(x, y, rs, gs, 0)
 
+ui_dirty = threading.Event()
+
 def update_ui():
-    with lock:
-        T = TOP_MK1 if mode == "Mk1" else TOP_MK2
-        # Button 0: Delay (Green=off, Red=circular, Amber=pingpong)
-        lp_led(T[0], 0, *[(0,3), (3,0), (3,3)][delay_mode], raw=True) 
-        lp_led(T[1], 0, *( (3,0) if fm_enabled else (0,3) ), raw=True) 
-        lp_led(T[2], 0, *( (3,0) if warp_running else (0,3) ), raw=True)
-        lp_led(T[3], 0, *[(0,3), (3,0), (3,3)][gran_mode], raw=True)
-        lp_led(T[4], 0, *( (3,0) if wrap_enabled else (0,3) ), raw=True)
-        # Button 5: Obstacle control (Green=idle, Red=removing, Amber=relocating)
-        lp_led(T[5], 0, *[(0,3), (3,0), (3,3)][obstacle_mode], raw=True)
-        
-        # Button 6 & 7: Master Volume
-        vol = master_vol.value
-        if vol < 0.4: v_col = (0, 3)
-        elif vol < 0.7: v_col = (3, 3)
-        elif vol < 0.9: v_col = (2, 0)
-        else: v_col = (3, 0)
-        lp_led(T[6], 0, *v_col, raw=True)
-        lp_led(T[7], 0, *v_col, raw=True)
+    """Ask the LED thread (the only MIDI writer) to repaint the top buttons"""
+    ui_dirty.set()
+
+def paint_top():
+    T = TOP_MK1 if mode == "Mk1" else TOP_MK2
+    # Button 0: Delay (Green=off, Red=circular, Amber=pingpong)
+    lp_led(T[0], 0, *[(0,3), (3,0), (3,3)][delay_mode], raw=True) 
+    lp_led(T[1], 0, *( (3,0) if fm_enabled else (0,3) ), raw=True) 
+    lp_led(T[2], 0, *( (3,0) if warp_running else (0,3) ), raw=True)
+    lp_led(T[3], 0, *[(0,3), (3,0), (3,3)][gran_mode], raw=True)
+    lp_led(T[4], 0, *( (3,0) if wrap_enabled else (0,3) ), raw=True)
+    # Button 5: Obstacle control (Green=idle, Red=removing, Amber=relocating)
+    lp_led(T[5], 0, *[(0,3), (3,0), (3,3)][obstacle_mode], raw=True)
+    
+    # Button 6 & 7: Master Volume
+    vol = master_vol.value
+    if vol < 0.4: v_col = (0, 3)
+    elif vol < 0.7: v_col = (3, 3)
+    elif vol < 0.9: v_col = (2, 0)
+    else: v_col = (3, 0)
+    lp_led(T[6], 0, *v_col, raw=True)
+    lp_led(T[7], 0, *v_col, raw=True)
 
 # --- 6. Audio Engine with Multiple Oscillators ---
 class BallVoice:
@@ -353,7 +364,8 @@ class BallVoice:
         self.ring_mod_sig = Sig(0)
         self.ring_mod_port = Port(self.ring_mod_sig, 0.01, 0.08)
         self.ring_mod_ratio = random.uniform(1.5, 2.2)
-        self.ring_mod_osc = Sine(freq=self.f_port * self.ring_mod_ratio, mul=self.ring_mod_port)
+        self.ring_mod_freq = self.f_port * self.ring_mod_ratio
+        self.ring_mod_osc = Sine(freq=self.ring_mod_freq, mul=self.ring_mod_port, add=1)  # 1 + modulator
         
         # FM modulation
         self.mod_osc = Sine(freq=self.m_f_port, mul=self.m_i_port)
@@ -362,9 +374,33 @@ class BallVoice:
         attack, decay, sustain, release = self.env_params
         self.env = Adsr(attack=attack, decay=decay, sustain=sustain, release=release, dur=1, mul=0)
         
-        # Create oscillator based on type
-        total_freq = self.f_port + self.mod_osc
+        # Create oscillator, envelope, ring modulation and filter (SamplerVoice: pre-rendered tables)
+        self.total_freq = total_freq = self.f_port + self.mod_osc
+        self.fil = self.make_tone(total_freq, brightness)
+        
+        # Resonant tail: noise through resonant bandpass filter tuned to note
+        self.tail_env = Adsr(attack=0.001, decay=0.1, sustain=0.2, release=1.5, dur=1, mul=0)
+        self.tail = self.make_tail() * self.tail_env
+        self.tail_output = self.tail * 0.15  # Mix at lower level
+        
+        # Mix main signal with resonant tail
+        self.mixed = self.fil + self.tail_output
+        
+        self.output = (self.mixed * self.g_port)
+        
+        # Warm pool: the graph is built once here but only runs while its being lives
+        # Every node is an attribute (arithmetic results included), so park() stops them all
+        # Envelopes are left out: play() would trigger them, notes do that
+        self.envs = [self.env, self.tail_env]
+        self.graph = [v for v in vars(self).values()
+                      if isinstance(v, PyoObjectBase) and v is not self.env and v is not self.tail_env]
+        self.awake, self.park_at = True, None
+        self.park()
         
+        print(f"--- Voice {self.index}: {self.family}/{self.instrument}, Osc={self.osc_type}, Filt={self.filt_type}, Q={self.filter_q:.2f}, TailQ={self.tail_filter_q:.2f} ---")
+
+    def make_tone(self, total_freq, brightness):
+        """Live oscillator -> envelope -> ring modulation -> filter"""
         if self.osc_type == 'sine':
             self.osc = Sine(freq=total_freq)
         elif self.osc_type == 'saw':
@@ -384,7 +420,7 @@ class BallVoice:
         self.osc_env = self.osc * self.env
         
         # Apply ring modulation
-        self.ring_modulated = self.osc_env * (1 + self.ring_mod_osc)
+        self.ring_modulated = self.osc_env * self.ring_mod_osc
         
         # Apply filter based on type
         base_cutoff = 500 + (brightness * 14000)
@@ -400,23 +436,38 @@ class BallVoice:
             self.fil = Biquad(self.ring_modulated, freq=self.cutoff, q=self.filter_q, type=2)
         else:  # 'none'
             self.fil = self.ring_modulated
-        
-        # Resonant tail: noise through resonant bandpass filter tuned to note
+        return self.fil
+
+    def make_tail(self):
         self.tail_noise = Noise()
-        self.tail_env = Adsr(attack=0.001, decay=0.1, sustain=0.2, release=1.5, dur=1, mul=0)
         self.tail_filter_q = random.uniform(8, 15)  # High Q for resonance
         self.tail_filter = Biquad(self.tail_noise, freq=self.f_port, q=self.tail_filter_q, type=2)  # Bandpass
-        self.tail_output = self.tail_filter * self.tail_env * 0.15  # Mix at lower level
-        
-        # Mix main signal with resonant tail
-        self.mixed = self.fil + self.tail_output
-        
-        self.output = (self.mixed * self.g_port)
-        
-        print(f"--- Voice {self.index}: {self.family}/{self.instrument}, Osc={self.osc_type}, Filt={self.filt_type}, Q={self.filter_q:.2f}, TailQ={self.tail_filter_q:.2f} ---")
+        return self.tail_filter
 
-    def trigger(self, freq, amp, dur):
+    def tune(self, freq):
         self.f_sig.value = freq
+
+    def wake(self):
+        """Resume the graph for a new being, and the effects behind it (main thread, no allocation)"""
+        self.park_at = None
+        wake_effects()
+        if self.awake: return
+        for o in self.graph: o.play()
+        self.awake = True
+
+    def release(self, hold):
+        """Being expired: park the voice once its last note tail (hold seconds) is over"""
+        self.park_at = time.time() + hold + VOICE_TAIL
+
+    def park(self):
+        """Stop every object of the graph, the voice then costs no DSP"""
+        self.park_at = None
+        if not self.awake: return
+        for o in self.graph + self.envs: o.stop()
+        self.awake = False
+
+    def trigger(self, freq, amp, dur):
+        self.tune(freq)
         attack, decay, sustain, release = self.env_params
         self.env.attack = attack * dur * 0.3
         self.env.decay = decay * dur
@@ -432,7 +483,7 @@ class BallVoice:
         self.tail_env.play()
     
     def trigger_wall_hit(self, freq, amp, dur):
-        self.f_sig.value = freq
+        self.tune(freq)
         attack, decay, sustain, release = self.env_params
         self.env.attack = attack * 0.5
         self.env.decay = decay * dur * 0.8
@@ -451,13 +502,111 @@ class BallVoice:
     def set_fm(self, mod_freq): self.m_f_sig.value, self.m_i_sig.value = mod_freq, mod_freq * 1.5 
     def stop_fm(self): self.m_i_sig.value = 0
 
-voices = [BallVoice(i) for i in range(MAX_BALLS)]
+class SamplerVoice(BallVoice):
+    """BallVoice playing its pre-rendered instrument: a wavetable Osc and a tail loop, no live filters"""
+    def make_tone(self, total_freq, brightness):
+        self.notes, self.bodies, self.tails, self.periodic, meta = samples.tables(self.instrument)
+        self.cutoff, self.filter_q, self.tail_filter_q = meta
+        if self.periodic:
+            self.osc = Osc(self.bodies[0], freq=total_freq)  # one filtered period, FM still applies
+        else:
+            self.osc = TableRead(self.bodies[0], freq=self.bodies[0].getRate(), loop=1)
+        self.osc_env = self.osc * self.env
+        # Ring modulation comes after the (pre-rendered) filter here
+        self.ring_modulated = self.osc_env * self.ring_mod_osc
+        return self.ring_modulated
+
+    def make_tail(self):
+        self.tail_read = TableRead(self.tails[0], freq=self.tails[0].getRate(), loop=1)
+        return self.tail_read
+
+    def tune(self, freq):
+        """Nearest rendered pitch; the tail loop is read faster or slower to land on freq"""
+        self.f_sig.value = freq
+        k = min(range(len(self.notes)), key=lambda i: abs(math.log(freq / self.notes[i])))
+        if self.periodic: self.osc.table = self.bodies[k]
+        self.tail_read.table = self.tails[k]
+        self.tail_read.freq = self.tails[k].getRate() * freq / self.notes[k]
+
+voice_class = SamplerVoice if SAMPLER else BallVoice
+voices = [voice_class(i) for i in range(MAX_BALLS)]  # warm pool, all parked until a being spawns
 bus = Mix([v.output for v in voices], voices=4)
 
+# --- Early Reflections ---
+# One delay line per voice, written once, read by K taps: a ring buffer table written at
+# ring_pos and read by the K taps behind it. Tap times and quad gains come from the tap
+# table of the cell its being is in; the ring holds the longest tap of the world.
+reflect = EarlyReflections(field.x_min, field.x_max, field.y_min, field.y_max, REFLECT_TAPS)
+K = reflect.taps
+tap_pos = [None] * MAX_BALLS  # cell whose taps each voice uses
+tap_times = [0.001] * (MAX_BALLS * K)
+tap_levels = [[0.0] * (MAX_BALLS * K) for _ in range(4)]
+reflection_objs = []  # played only while a voice is awake (wake_effects)
+if REFLECTIONS:
+    ring = NewTable(length=reflect.max_delay + 0.01, chnls=MAX_BALLS)
+    ring_len = ring.getSize(False) / s.getSamplingRate()  # seconds held by each ring
+    ring_pos = Phasor(freq=1.0 / ring_len)
+    ring_in = Mix([v.mixed for v in voices], voices=MAX_BALLS)  # dry (unpanned) voices
+    ring_write = TableWrite(ring_in, pos=ring_pos, table=ring, mode=0)
+    tap_back = SigTo([-t / ring_len for t in tap_times], time=0.05, init=-0.001 / ring_len)
+    tap_read = tap_back + ring_pos
+    tap_index = Wrap(tap_read, 0, 1)
+    taps = Pointer([ring[v] for v in range(MAX_BALLS) for _ in range(K)], tap_index)
+    tap_gain = [SigTo(tap_levels[c], time=0.05) for c in range(4)]
+    tap_quad = [taps * tap_gain[c] for c in range(4)]
+    tap_sums = [tap_quad[c].mix(1) for c in range(4)]
+    early = Mix(tap_sums, voices=4)
+    reflection_objs = [ring_pos, ring_in, ring_write, tap_back, tap_read, tap_index, taps,
+                       *tap_gain, *tap_quad, *tap_sums, early]
+    for o in reflection_objs: o.stop()
+    bus = bus + early
+    print(f"--- Early reflections: {K} taps per voice from {MAX_BALLS} delay lines of {ring_len * 1e3:.0f} ms ---")
+
+def place_reflections(v, pos):
+    """Audio thread: point the taps of voice v at the table of grid cell pos"""
+    if not REFLECTIONS: return
+    tap_pos[v] = pos
+    delays, gains = reflect.at(pos)
+    tap_times[v * K:(v + 1) * K] = delays.tolist()
+    for c in range(4):
+        tap_levels[c][v * K:(v + 1) * K] = (gains[:, c] * REFLECT_MIX).tolist()
+    tap_back.value = [-t / ring_len for t in tap_times]
+    for c in range(4): tap_gain[c].value = tap_levels[c]
+
+def relayout(cells):
+    """Audio thread: switch tap tables (cached per layout) and re-point the placed voices"""
+    reflect.set_layout(cells)
+    for v, pos in enumerate(tap_pos):
+        if pos is not None: place_reflections(v, pos)
+
+def relayout_reflections():
+    """Obstacles changed: relayout on the audio thread, the only writer of the taps"""
+    if REFLECTIONS: on_audio_thread(relayout, list(obstacles))
+
+def park_idle_voices():
+    """Main loop housekeeping: stop the voices whose being expired and whose tail has rung out"""
+    now = time.time()
+    for v in voices:
+        if v.park_at is not None and now >= v.park_at: v.park()
+
+cpu_use = {}  # awake voices: [process CPU time (s), wall time (s)], audio thread included
+cpu_mark = [time.process_time(), time.perf_counter()]
+
+def measure_cpu():
+    """Main loop: charge the CPU used since the last call to the current number of awake voices"""
+    now = [time.process_time(), time.perf_counter()]
+    use = cpu_use.setdefault(sum(v.awake for v in voices), [0.0, 0.0])
+    use[0] += now[0] - cpu_mark[0]; use[1] += now[1] - cpu_mark[1]
+    cpu_mark[:] = now
+
+def cpu_report():
+    for n, (cpu, wall) in sorted(cpu_use.items()):
+        if wall > 1.0: print(f"--- CPU: {n} voices awake, {cpu / wall * 100:.1f}% over {wall:.0f}s ---")
+
 # --- Granulator (Particle) ---
 # Serial Processing: Bus -> Granulator -> Reverb
 gran_table = NewTable(length=1.0, chnls=4)
-gran_rec = TableRec(bus, table=gran_table).play()
+gran_rec = TableRec(bus, table=gran_table)  # (re)records the first second of each wake
 
 # Selectors for parameters
 # Position: 0=Linear, 1=Random
@@ -466,12 +615,14 @@ gran_pos_rnd = Randh(min=0, max=1, freq=4)
 gran_pos_sel = Selector([gran_pos_lin, gran_pos_rnd], voice=0)
 
 # Duration: 0=Static, 1=Random
-gran_dur_base = 0.1 + Noise(mul=0.03)
+gran_dur_noise = Noise(mul=0.03)
+gran_dur_base = 0.1 + gran_dur_noise
 gran_dur_rnd = Randi(min=0.05, max=0.5, freq=1)
 gran_dur_sel = Selector([gran_dur_base, gran_dur_rnd], voice=0)
 
 # Density: 0=Static, 1=Random
-gran_dens_base = 120 + Noise(mul=30)
+gran_dens_noise = Noise(mul=30)
+gran_dens_base = 120 + gran_dens_noise
 gran_dens_rnd = Randi(min=20, max=150, freq=0.5)
 gran_dens_sel = Selector([gran_dens_base, gran_dens_rnd], voice=0)
 
@@ -528,6 +679,31 @@ limited = Compress(gained_mix, thresh=-6, ratio=20, knee=0.5, risetime=0.001, fa
 
 final_output = limited.out()
 
+# Idle field: the generators and processors above (and the reflections) only run from
+# the first voice wake until EFFECTS_TAIL after the last park. What keeps running is
+# the arithmetic and mixing between them (Sig, Port, Selector, Mix nodes) on silence.
+effects = [gran_rec, gran_pos_lin, gran_pos_rnd, gran_dur_noise, gran_dur_rnd, gran_dens_noise, gran_dens_rnd,
+           gran, rev, *delays]
+effects_idle = [time.time()]  # time the last voice parked, None while a voice is awake
+
+def wake_effects():
+    """Main thread: resume reflections and effects before a voice sounds"""
+    effects_idle[0] = None
+    if limited.isPlaying(): return
+    for o in reflection_objs + effects: o.play()
+    limited.out()  # stop() also dropped the output routing
+
+def idle_effects():
+    """Main loop: stop reflections and effects once no voice has been awake for EFFECTS_TAIL"""
+    if any(v.awake for v in voices):
+        effects_idle[0] = None
+    elif effects_idle[0] is None:
+        effects_idle[0] = time.time()
+    elif limited.isPlaying() and time.time() - effects_idle[0] > EFFECTS_TAIL:
+        for o in reflection_objs + effects + [limited]: o.stop()
+
+for o in effects + [limited]: o.stop()
+
 def update_gran_state():
     """Update granulator parameters based on gran_mode"""
     if gran_mode == 0:
@@ -577,17 +753,46 @@ def update_delay_matrix():
         delay_matrix_sigs[3][2].value = 1.0
 
 # --- 7. Pyo-based Ball with Metro timing ---
+def pick_note(index):
+    """Random note of one of the being's scale families, in its MIDI range"""
+    # Select note from the current musical scale
+    #note = get_random_note_in_scale(MIDI_RANGES[index][0], MIDI_RANGES[index][1], selected_scale)
+    ball_scale_name = random.choice(BALL_SCALE_FAMILIES[index])
+    ball_scale = SCALES[ball_scale_name]
+    print(f"--- Ball {index}: Using scale {ball_scale_name} ---")
+    return get_random_note_in_scale(MIDI_RANGES[index][0], MIDI_RANGES[index][1], ball_scale)
+
+def enter_cell(ball, pos, hit_obstacle):
+    """Grid bookkeeping, FM collision and note of a being reaching a new cell (audio thread)"""
+    try:
+        # FM collision check
+        other = board.mate(ball.index, pos) if fm_enabled else None
+        if other is not None:
+            voices[ball.index].set_fm(ball_freqs[other])
+            voices[other].set_fm(ball.freq_val)
+        
+        # Publish new position (replaces the old one)
+        board.set(ball.index, pos)
+        place_reflections(ball.index, pos)
+    except:
+        pass
+    
+    # Trigger sound
+    try:
+        if hit_obstacle:
+            clock.defer(voices[ball.index].trigger_wall_hit, ball.freq_val, ball.amp_val, ball.dur)
+        else:
+            clock.defer(voices[ball.index].trigger, ball.freq_val, ball.amp_val, ball.dur)
+    except:
+        pass
+    
+    ball.last_grid_pos = pos
+
 class MetroBall:
     """Ball physics driven by Pyo Metro for sample-accurate timing"""
     def __init__(self, index, r, g, lp_handle, start_pos=None):
         self.index, self.r, self.g, self.lp = index, r, g, lp_handle
-        # Select note from the current musical scale
-        #note = get_random_note_in_scale(MIDI_RANGES[index][0], MIDI_RANGES[index][1], selected_scale)
-        
-        ball_scale_name = random.choice(BALL_SCALE_FAMILIES[index])
-        ball_scale = SCALES[ball_scale_name]
-        note = get_random_note_in_scale(MIDI_RANGES[index][0], MIDI_RANGES[index][1], ball_scale)
-        print(f"--- Ball {index}: Using scale {ball_scale_name} ---")
+        note = pick_note(index)
 
         self.freq_val = midiToHz(note)
         ball_freqs[index] = self.freq_val
@@ -617,6 +822,7 @@ class MetroBall:
     def update(self):
         """Called by Pyo Metro - runs at metro frequency"""
         try:
+            run_audio_calls()
             self._do_update()
         except Exception as e:
             print(f"--- Ball {self.index}: Error in update: {e} ---")
@@ -672,33 +878,7 @@ class MetroBall:
         
         gx, gy = int(round(self.x)), int(round(self.y))
         if (gx, gy) != self.last_grid_pos:
-            try:
-                with lock:
-                    # Clear old position
-                    if self.last_grid_pos in grid_map and grid_map[self.last_grid_pos] == self.index: 
-                        del grid_map[self.last_grid_pos]
-                    
-                    # FM collision check
-                    if fm_enabled and (gx, gy) in grid_map:
-                        other = grid_map[(gx, gy)]
-                        voices[self.index].set_fm(ball_freqs[other])
-                        voices[other].set_fm(self.freq_val)
-                    
-                    # Register new position
-                    grid_map[(gx, gy)] = self.index
-            except:
-                pass  # Don't crash on lock failure
-            
-            # Trigger sound
-            try:
-                if hit_obstacle:
-                    voices[self.index].trigger_wall_hit(self.freq_val, self.amp_val, self.dur)
-                else:
-                    voices[self.index].trigger(self.freq_val, self.amp_val, self.dur)
-            except:
-                pass
-            
-            self.last_grid_pos = (gx, gy)
+            enter_cell(self, (gx, gy), hit_obstacle)
         
         if hit:
             voices[self.index].stop_fm()
@@ -721,44 +901,217 @@ class MetroBall:
             self.metro.stop()
             self.trig.stop()
             
-            with lock:
-                if self.last_grid_pos in grid_map:
-                    del grid_map[self.last_grid_pos]
+            board.set(self.index, None)
+            voices[self.index].release(self.dur * 2.0)
             
             # LED cleanup will be handled by led_update_loop
             print(f"--- Ball {self.index}: Expired ---")
         except Exception as e:
             print(f"--- Ball {self.index}: Error in stop: {e} ---")
 
+# --- 7b. Master Clock Beings (ENGINE_MODE 'master') ---
+class FieldBeing:
+    """Being whose physics state lives in the shared `field` arrays, moved by master_tick"""
+    def __init__(self, index, r, g, lp_handle, start_pos=None):
+        self.index, self.r, self.g, self.lp = index, r, g, lp_handle
+        note = pick_note(index)
+
+        self.freq_val = midiToHz(note)
+        ball_freqs[index] = self.freq_val
+        self.amp_val = 0.06 + (index * 0.025)
+        self.dur = random.uniform(0.1, 2.5)
+        self.last_grid_pos = None
+        x, y = start_pos if start_pos else view_random_pos()
+        on_audio_thread(spawn_being, index, x, y, random.uniform(0, 2*math.pi), 0.08)
+        print(f"--- Ball {self.index}: Launch (Pos: {int(x)}/{int(y)}), on the master clock ---")
+
+    # Same attributes as MetroBall, read from / written to the field arrays
+    # (the audio thread writes them, active turns True once the queued spawn ran)
+    active = property(lambda self: bool(field.active[self.index]))
+    fast_decay = property(lambda self: bool(field.fast_decay[self.index]),
+                          lambda self, v: on_audio_thread(field.fast_decay.__setitem__, self.index, v))
+    x = property(lambda self: float(field.x[self.index]), lambda self, v: field.x.__setitem__(self.index, v))
+    y = property(lambda self: float(field.y[self.index]), lambda self, v: field.y.__setitem__(self.index, v))
+
+    def stop(self):
+        """Stop the being cleanly"""
+        field.kill(self.index)
+        board.set(self.index, None)
+        voices[self.index].release(self.dur * 2.0)  # longest tail: trigger_wall_hit
+        print(f"--- Ball {self.index}: Expired ---")
+
+master_clock = [0.0]  # seconds of master ticks, the field's time base
+
+# Crowd: field beings MAX_BALLS.. without a side button or a voice of their own.
+# voice_of maps every field being to the voice that plays it (-1 = silent);
+# side-button beings always own theirs, idle voices are lent to the crowd
+voice_of = np.full(field.n, -1, dtype=np.int64)
+voice_of[:MAX_BALLS] = np.arange(MAX_BALLS)
+lent = [None] * MAX_BALLS  # crowd being played by each voice
+lent_freqs = [0.0] * MAX_BALLS  # its note, in the voice's own range
+
+def spawn_being(i, x, y, angle, sleep):
+    """Audio thread: (re)start field being i now on the master clock"""
+    field.spawn(i, x, y, angle, sleep, master_clock[0])
+
+def spawn_crowd(i):
+    x, y = random.uniform(field.x_min, field.x_max), random.uniform(field.y_min, field.y_max)
+    spawn_being(i, x, y, random.uniform(0, 2*math.pi), random.uniform(0.05, 0.2))
+
+def lend(v, i, freq=0.0):
+    """Audio thread: voice v plays crowd being i at freq (None: back to idle)"""
+    if i is not None and field.active[v]: return  # its own being spawned since the lending was decided
+    if lent[v] is not None: voice_of[lent[v]] = -1
+    lent[v] = i
+    if i is not None:
+        lent_freqs[v] = freq
+        voice_of[i] = v
+
+def unlend(v):
+    on_audio_thread(lend, v, None)
+
+def lend_voices():
+    """Main loop: give the voices no side-button being uses to the crowd beings nearest the viewport
+
+    Decides from the current lending and queues the changes, the audio thread
+    (which reads voice_of every tick) is the only writer of voice_of and lent.
+    """
+    free = [v for v in range(MAX_BALLS)
+            if not (balls[v] and balls[v].active) and (lent[v] is not None or not voices[v].awake)]
+    if not free: return
+    crowd = np.zeros(field.n, dtype=bool)
+    crowd[MAX_BALLS:] = True
+    nearest = field.nearest(view[0] + 3.5, view[1] + 4.5, len(free), among=crowd).tolist()
+    keep = set(nearest)
+    plan = {v: lent[v] for v in free}
+    for v in free:
+        if plan[v] is not None and plan[v] not in keep:
+            unlend(v)
+            plan[v] = None
+    taken = set(i for i in plan.values() if i is not None)
+    for v in free:
+        if plan[v] is not None: continue
+        todo = [i for i in nearest if i not in taken]
+        if not todo:  # fewer crowd beings than voices: let it ring out and park
+            if voices[v].awake: voices[v].release(0.6)
+            continue
+        i = todo[0]
+        taken.add(i)
+        scale = SCALES[random.choice(BALL_SCALE_FAMILIES[v])]
+        voices[v].wake()
+        on_audio_thread(lend, v, i, midiToHz(get_random_note_in_scale(MIDI_RANGES[v][0], MIDI_RANGES[v][1], scale)))
+
+def crowd_enter(i, v, hit_obstacle):
+    """Note of a lent voice when its crowd being reaches a new cell, FM with a cell mate"""
+    amp, dur = 0.06 + (v * 0.025), 0.3
+    place_reflections(v, tuple(field.cell[i].tolist()))
+    if fm_enabled:
+        j = field.hash.mate(i)
+        if j >= 0 and voice_of[j] >= 0:
+            w = voice_of[j]
+            voices[v].set_fm(ball_freqs[w] if j < MAX_BALLS else lent_freqs[w])
+    if hit_obstacle: clock.defer(voices[v].trigger_wall_hit, lent_freqs[v], amp, dur)
+    else: clock.defer(voices[v].trigger, lent_freqs[v], amp, dur)
+
+def master_tick():
+    """One master clock tick: every due being moves, in a few array operations"""
+    try:
+        run_audio_calls()
+        master_clock[0] += MASTER_TICK
+        ev = field.step(master_clock[0], wrap_enabled, FRICTION_VALUES[lifetime_mode])
+        for i in ev['expired'].tolist():
+            if i >= MAX_BALLS: spawn_crowd(i)  # the crowd never dies out
+            elif balls[i]: balls[i].stop()
+        moved = ev['moved']
+        if len(moved) == 0: return
+        moved = moved[voice_of[moved] >= 0]  # only voiced beings are heard
+        for v, gains in zip(voice_of[moved].tolist(), view_gains(field.x[moved], field.y[moved]).tolist()):
+            voices[v].update_panning(gains)
+        bounced = set(ev['obstacle'].tolist())
+        for i in ev['entered'].tolist():
+            if i < MAX_BALLS:
+                if balls[i]: enter_cell(balls[i], tuple(field.cell[i].tolist()), i in bounced)
+            elif voice_of[i] >= 0: crowd_enter(i, int(voice_of[i]), i in bounced)
+        for v in voice_of[ev['hit']].tolist():
+            if v >= 0: voices[v].stop_fm()
+    except Exception as e:
+        print(f"--- Master clock: Error in tick: {e} ---")
+
+def run_master_clock():
+    """Main loop: the master clock only ticks while a being (crowd included) is alive or changes are queued"""
+    alive = bool(field.active.any()) or bool(audio_calls)
+    if alive and not master_metro.isPlaying(): master_metro.play()
+    elif not alive and master_metro.isPlaying(): master_metro.stop()
+
+master_metro = Metro(time=MASTER_TICK)
+master_trig = TrigFunc(master_metro, master_tick)
+if ENGINE_MODE == 'master':
+    for i in range(MAX_BALLS, field.n): spawn_crowd(i)
+    run_master_clock()
+    print(f"--- Engine: master clock, {1 / MASTER_TICK:.0f} Hz for all beings (while any is alive) ---")
+    if field.n > MAX_BALLS or (WORLD_W, WORLD_H) != (SIZE, SIZE):
+        print(f"--- World: {WORLD_W}x{WORLD_H}, {CROWD} crowd beings, flocking {FLOCK} ---")
+
 # --- 8. LED Update Thread (separate from audio) ---
+CROWD_COLOR = (0, 1)  # dim green: crowd beings in the viewport
+
+def follow_view():
+    """Re-center the viewport on the side-button beings once they drift 2 cells off, True if it moved"""
+    on = np.flatnonzero(field.active[:MAX_BALLS])
+    if not len(on): return False
+    tx = min(max(int(round(field.x[on].mean() - 3.5)), 0), max(WORLD_W - SIZE, 0))
+    ty = min(max(int(round(field.y[on].mean() - 4.5)), 0), max(WORLD_H - SIZE, 0))
+    if abs(tx - view[0]) < 2 and abs(ty - view[1]) < 2: return False
+    view[0], view[1] = tx, ty
+    print(f"--- Viewport: {tx}, {ty} ---")
+    return True
+
+def view_state():
+    """Color of every lit Launchpad cell: crowd, then side-button beings, obstacles on top"""
+    players = board.front  # published by the audio thread, no lock
+    state = {}
+    if field.n > MAX_BALLS:
+        crowd = np.flatnonzero(field.active[MAX_BALLS:]) + MAX_BALLS
+        px = np.rint(field.x[crowd]).astype(int) - view[0]
+        py = np.rint(field.y[crowd]).astype(int) - view[1]
+        seen = (px >= 0) & (px <= 7) & (py >= 1) & (py <= 8)
+        for pad in zip(px[seen].tolist(), py[seen].tolist()): state[pad] = CROWD_COLOR
+    for ball_idx, pos in enumerate(players):
+        pad = pos and to_pad(pos)
+        if pad: state[pad] = COLOR_PAIRS[ball_idx]
+    for pos in list(obstacles):
+        pad = to_pad(pos)
+        if pad: state[pad] = (3, 3)
+    return state
+
+leds_off = threading.Event()
+led_writes = [0, 0.0, 0.0]  # LED frames with MIDI writes, total and max write time (s)
+
 def led_update_loop():
-    """Update LEDs based on grid_map - runs in separate thread"""
+    """Update LEDs from the published cells, the field and the feature states - the only MIDI writer"""
+    follow = VIEW_FOLLOW and (WORLD_W, WORLD_H) != (SIZE, SIZE)
     last_grid_state = {}
     last_ball_active = [False] * MAX_BALLS
     
-    while True:
+    while not leds_off.is_set():
         try:
-            with lock:
-                current_state = dict(grid_map)  # Copy current state
-                current_ball_active = [balls[i] and balls[i].active for i in range(MAX_BALLS)]
-            
-            # Update grid LEDs
-            for pos, ball_idx in current_state.items():
-                if pos not in last_grid_state:
-                    # New position - light it up
-                    gx, gy = pos
-                    if (gx, gy) not in obstacles:
-                        r, g = COLOR_PAIRS[ball_idx]
-                        lp_led(gx, gy, r, g)
+            t0 = time.perf_counter()
+            if ui_dirty.is_set():
+                ui_dirty.clear()
+                paint_top()
+            if follow and follow_view():
+                # Everything shifted: repaint the whole grid
+                last_grid_state = {(x, y): None for x in range(8) for y in range(1, 9)}
+            current_state = view_state()
+            current_ball_active = [bool(balls[i] and balls[i].active) for i in range(MAX_BALLS)]
             
+            # Update grid LEDs: changed cells lit, vacated cells cleared
+            for pos, color in current_state.items():
+                if last_grid_state.get(pos) != color:
+                    lp_led(*pos, *color)
             for pos in last_grid_state:
                 if pos not in current_state:
-                    # Position cleared - turn off LED
-                    gx, gy = pos
-                    if (gx, gy) in obstacles:
-                        lp_led(gx, gy, 3, 3)  # Restore obstacle
-                    else:
-                        lp_led(gx, gy, 0, 0)  # Clear
+                    lp_led(*pos, 0, 0)
             
             # Update side button indicators
             for i in range(MAX_BALLS):
@@ -771,15 +1124,15 @@ def led_update_loop():
             
             last_grid_state = current_state
             last_ball_active = current_ball_active
+            spent = time.perf_counter() - t0
+            if spent > 1e-4:
+                led_writes[0] += 1; led_writes[1] += spent; led_writes[2] = max(led_writes[2], spent)
             time.sleep(0.02)  # 50 Hz update rate
         except Exception as e:
             # print(f"LED update error: {e}")
             time.sleep(0.05)
 
-# Start LED update thread
 led_thread = threading.Thread(target=led_update_loop, daemon=True)
-led_thread.start()
-print("--- LED update thread started ---")
 
 # --- 9. Resets & Triggers ---
 def reset_fm():
@@ -820,9 +1173,7 @@ def remove_obstacles_sequence():
     for pos in obstacle_list:
         with lock:
             if pos in obstacles:
-                obstacles.remove(pos)
-                gx, gy = pos
-                lp_led(gx, gy, 0, 0)
+                remove_obstacle(pos)
         time.sleep(delay)
     
     print("--- Obstacle removal complete ---")
@@ -844,46 +1195,50 @@ def relocate_obstacles_sequence():
     for old_pos in obstacle_list:
         # Find new random position (not occupied by ball or another obstacle)
         for _ in range(50):  # Try up to 50 times
-            new_x = random.randint(0, 7)
-            new_y = random.randint(1, 8)
+            new_x = view[0] + random.randint(0, 7)
+            new_y = view[1] + random.randint(1, 8)
             new_pos = (new_x, new_y)
             
             with lock:
                 # Check if position is free
-                if new_pos not in obstacles and new_pos not in grid_map:
+                if new_pos not in obstacles and new_pos not in board.front:
                     # Remove from old position
                     if old_pos in obstacles:
-                        obstacles.remove(old_pos)
-                        ox, oy = old_pos
-                        lp_led(ox, oy, 0, 0)
+                        remove_obstacle(old_pos)
                     
                     # Add to new position
-                    obstacles.add(new_pos)
-                    lp_led(new_x, new_y, 3, 3)
+                    add_obstacle(new_pos)
                     break
         
         time.sleep(delay)
     
     print("--- Obstacle relocation complete ---")
 
+def warp_being(ball, nx, ny):
+    """Audio thread: jump a being to (nx, ny) with a warp note, if it is still alive"""
+    i = ball.index
+    if balls[i] is ball and ball.active:
+        ball.x, ball.y = nx, ny
+        voices[i].update_panning(view_gains(nx, ny).tolist())
+        clock.defer(voices[i].trigger, midiToHz(random.randint(40,80)), 0.15, 2.0)
+
 def warp_sequence():
     global warp_running
     warp_running = True; update_ui()
     print("--- Top Button 2: Warp Jump Initialized ---")
     for i in range(MAX_BALLS):
-        nx, ny = random.uniform(0, 7), random.uniform(1, 8)
-        with lock:
-            if balls[i] and balls[i].active:
-                balls[i].x, balls[i].y = nx, ny
-                voices[i].update_panning(get_quad_gains(nx, ny))
-                voices[i].trigger(midiToHz(random.randint(40,80)), 0.15, 2.0)
+        if balls[i] and balls[i].active:
+            on_audio_thread(warp_being, balls[i], *view_random_pos())
         time.sleep(1.0)
     warp_running = False; update_ui()
 
 def trigger_ball(idx):
     with lock:
         if balls[idx] is None or not balls[idx].active:
-            balls[idx] = MetroBall(idx, *COLOR_PAIRS[idx], lp)
+            being = MetroBall if ENGINE_MODE == 'metro' else FieldBeing
+            unlend(idx)
+            voices[idx].wake()
+            balls[idx] = being(idx, *COLOR_PAIRS[idx], lp)
         else:
             print(f"--- Ball {idx}: 2-Second Fast Kill Triggered ---")
             balls[idx].fast_decay = True
@@ -891,29 +1246,15 @@ def trigger_ball(idx):
 def toggle_obstacle(x, y):
     with lock:
         if (x, y) in obstacles:
-            obstacles.remove((x, y))
-            lp_led(x, y, 0, 0)
+            remove_obstacle((x, y))
         else:
-            obstacles.add((x, y))
-            lp_led(x, y, 3, 3)
-
-# --- 9. Ableton Link Setup (via MIDI Clock) ---
-def setup_link():
-    """Setup Ableton Link sync via MIDI clock output"""
-    global link_metro
-    # Create a master metro at current tempo
-    link_metro = Metro(time=60.0/GLOBAL_TEMPO/24).play()  # MIDI clock = 24 ppqn
-    
-    # Send MIDI clock messages
-    def send_clock():
-        # This would send MIDI clock - requires MIDI output setup
-        # For now, just print tempo info
-        pass
-    
-    # TrigFunc(link_metro, send_clock)
-    print(f"--- Ableton Link: Tempo = {GLOBAL_TEMPO} BPM ---")
+            add_obstacle((x, y))
 
-setup_link()
+# --- 9. Tempo Clock (MIDI clock out, quantize grid) ---
+# Runs on its own timing thread (beings_clock): a pyo Metro ticks on audio buffer
+# boundaries, far from the sub-millisecond spacing other rigs expect
+if MIDI_CLOCK or QUANTIZE:
+    clock.start()
 
 # --- 10. Scalar Start ---
 scalar = random.randint(1, 8)
@@ -924,10 +1265,13 @@ FRICTION_VALUES = [base_f * 1.12, base_f, base_f * 0.96]
 
 while not lp.ButtonStateRaw(): time.sleep(0.01)
 lp.Reset(); update_ui()
+led_thread.start()  # from here on all LED output goes through this thread
+print("--- LED update thread started ---")
 
 # --- 11. Main Loop ---
 try:
     launched = False
+    next_lend = 0.0
     while True:
         ev = lp.ButtonStateRaw()
         if ev and ev[1]:
@@ -941,13 +1285,13 @@ try:
                 gy = (bid // 16) + 1
                 if 0 <= gx <= 7 and 1 <= gy <= 8:
                     print(f"--- Obstacle toggle at {gx}, {gy} ---")
-                    toggle_obstacle(gx, gy)
+                    toggle_obstacle(gx + view[0], gy + view[1])
             else:
                 gx = (bid % 10) - 1
                 gy = 9 - (bid // 10)
                 if 0 <= gx <= 7 and 1 <= gy <= 8:
                     print(f"--- Obstacle toggle at {gx}, {gy} ---")
-                    toggle_obstacle(gx, gy)
+                    toggle_obstacle(gx + view[0], gy + view[1])
 
             if mode == "Mk1" and bid in SIDE_MK1: idx = SIDE_MK1.index(bid)
             elif mode == "Mk2" and bid in SIDE_MK2: idx = SIDE_MK2.index(bid)
@@ -1010,6 +1354,13 @@ try:
                 print(f"--- Master Volume: {master_vol.value:.2f} ---")
                 update_ui()
 
+        park_idle_voices()
+        idle_effects()
+        measure_cpu()
+        if ENGINE_MODE == 'master': run_master_clock()
+        if CROWD and time.time() >= next_lend:
+            lend_voices()
+            next_lend = time.time() + CROWD_REASSIGN
         active_count = sum(1 for b in balls if b and b.active)
         if active_count > 0: launched = True
         if launched and active_count == 0: break
@@ -1019,9 +1370,19 @@ except KeyboardInterrupt: pass
 finally:
     for t in [lt_timer, fm_timer, gran_timer, wrap_timer, obstacle_timer, delay_timer]:
         if t: t.cancel()
+    master_metro.stop()
+    clock.stop()
+    leds_off.set()
+    led_thread.join(1.0)
     for b in balls:
         if b and b.active: b.stop()
     s.stop()
     s.shutdown()
+    clock.report()
+    cpu_report()
+    if led_writes[0]:
+        print(f"--- LED thread: {led_writes[0]} frames written, mean {led_writes[1] / led_writes[0] * 1e3:.2f} ms, "
+              f"max {led_writes[2] * 1e3:.2f} ms (outside any lock, off the audio thread) ---")
+    lock.report()  # control threads only: the audio thread never waits on it
     time.sleep(0.5); lp.Reset(); lp.Close()
     print("--- System Shutdown: Goodbye ---")
\ No newline at end of file
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+import numpy as np
+from beings_core import quad_gains, X_MIN, X_MAX, Y_MIN, Y_MAX
+
+"""
+Living beings early reflections
+================================================================
+Image-source taps (delay and quad gains) of a being at any grid
+cell, for the walls of the field and its obstacles. Plain NumPy;
+beings_field plays them from one delay line per voice, read by
+multiple taps.
+
+================================================================
+The field is a room of CELL_M metre cells, walls half a cell past
+the outer cells, the listener in the middle. For a source cell:
+- 4 wall taps: first-order image sources, panned from the point
+  where the reflection meets the wall
+- up to `obstacle_taps` obstacle taps: each obstacle cell scatters
+  (source -> obstacle -> listener), the strongest ones are kept,
+  panned from the obstacle
+Delays and gains are relative to the direct sound (the dry voice):
+delay = (path - direct) / c, gain = r * direct / path.
+Tables cover every cell at once. An obstacle column (all sources)
+is computed the first time that cell holds an obstacle; a layout
+table only picks the strongest columns, and is cached per layout,
+so toggling an obstacle costs microseconds.
+"""
+
+CELL_M = 1.0  # metres per grid cell
+SOUND_C = 343.0  # m/s
+WALL_R = 0.6  # wall reflection coefficient
+OBSTACLE_R = 0.35  # obstacle scattering coefficient
+MIN_DELAY = 0.001  # shortest tap (s)
+LAYOUT_CACHE = 32  # layouts kept
+
+class EarlyReflections:
+    """Tap tables of every source cell for the current obstacle layout"""
+    def __init__(self, x_min=X_MIN, x_max=X_MAX, y_min=Y_MIN, y_max=Y_MAX, obstacle_taps=4):
+        self.bounds = (x_min, x_max, y_min, y_max)
+        self.width, self.height = x_max - x_min + 1, y_max - y_min + 1
+        self.obstacle_taps = obstacle_taps
+        self.taps = 4 + obstacle_taps
+        gx, gy = np.meshgrid(np.arange(x_min, x_max + 1), np.arange(y_min, y_max + 1), indexing='ij')
+        self.sx, self.sy = gx.ravel().astype(float), gy.ravel().astype(float)  # source cells, x-major
+        self.lx, self.ly = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+        self.direct = np.maximum(np.hypot(self.sx - self.lx, self.sy - self.ly), 0.5) * CELL_M
+        self.walls = self._wall_taps()
+        # Longest tap of any layout: an obstacle path is at most two room diagonals
+        self.max_delay = max(float(self.walls[0].max()), 2 * np.hypot(self.width, self.height) * CELL_M / SOUND_C)
+        self.columns = {}  # obstacle cell -> (delay, gain) over all sources
+        self.layouts = OrderedDict()
+        self.set_layout(())
+
+    def _wall_taps(self):
+        """Delays (n, 4) and gains (n, 4, 4) of the first-order wall images"""
+        x_min, x_max, y_min, y_max = self.bounds
+        sx, sy, lx, ly = self.sx, self.sy, self.lx, self.ly
+        delays, gains = [], []
+        for axis, wall in ((0, x_min - 0.5), (0, x_max + 0.5), (1, y_min - 0.5), (1, y_max + 0.5)):
+            ix, iy = (2 * wall - sx, sy) if axis == 0 else (sx, 2 * wall - sy)
+            path = np.hypot(ix - lx, iy - ly) * CELL_M
+            # Where the image -> listener line crosses the wall
+            t = (wall - ix) / (lx - ix) if axis == 0 else (wall - iy) / (ly - iy)
+            px, py = ix + t * (lx - ix), iy + t * (ly - iy)
+            delays.append(np.maximum((path - self.direct) / SOUND_C, MIN_DELAY))
+            gains.append((WALL_R * self.direct / path)[:, None] * quad_gains(px, py, *self.bounds))
+        return np.stack(delays, axis=1), np.stack(gains, axis=1)
+
+    def _column(self, cell):
+        """Scattering tap of one obstacle cell for every source: delay (n,), gain (n,)"""
+        if cell not in self.columns:
+            ox, oy = cell
+            d1 = np.hypot(self.sx - ox, self.sy - oy) * CELL_M
+            d2 = max(np.hypot(ox - self.lx, oy - self.ly), 0.5) * CELL_M
+            path = d1 + d2
+            gain = np.where(d1 > 0, OBSTACLE_R * self.direct / path, 0.0)  # a being inside it: no tap
+            self.columns[cell] = (np.maximum((path - self.direct) / SOUND_C, MIN_DELAY), gain)
+        return self.columns[cell]
+
+    def set_layout(self, cells):
+        """Switch to an obstacle layout (iterable of (x, y) cells), from the cache when seen before"""
+        key = frozenset(cells)
+        if key in self.layouts:
+            self.layouts.move_to_end(key)
+            self.delays, self.gains = self.layouts[key]
+            return
+        n, m = len(self.sx), self.obstacle_taps
+        delays = np.full((n, self.taps), MIN_DELAY)
+        gains = np.zeros((n, self.taps, 4))
+        delays[:, :4], gains[:, :4] = self.walls
+        cells = sorted(key)
+        if cells and m:
+            cols = [self._column(c) for c in cells]
+            d = np.stack([c[0] for c in cols], axis=1)  # (n, obstacles)
+            g = np.stack([c[1] for c in cols], axis=1)
+            pick = np.argsort(-g, axis=1)[:, :m] if len(cells) <= m else np.argpartition(-g, m - 1, axis=1)[:, :m]
+            rows = np.arange(n)[:, None]
+            pans = quad_gains(*np.array(cells, dtype=float).T, *self.bounds)  # (obstacles, 4)
+            k = pick.shape[1]
+            delays[:, 4:4 + k] = d[rows, pick]
+            gains[:, 4:4 + k] = g[rows, pick][:, :, None] * pans[pick]
+        self.delays, self.gains = delays, gains
+        self.layouts[key] = (delays, gains)
+        if len(self.layouts) > LAYOUT_CACHE:
+            self.layouts.popitem(last=False)
+
+    def at(self, pos):
+        """Delays (taps,) and quad gains (taps, 4) of a source at grid cell pos"""
+        x_min, x_max, y_min, y_max = self.bounds
+        x = min(max(int(pos[0]), x_min), x_max) - x_min
+        y = min(max(int(pos[1]), y_min), y_max) - y_min
+        i = x * self.height + y
+        return self.delays[i], self.gains[i]
@@ -0,0 +1,267 @@
+import os, csv, time, shutil, hashlib, argparse, tempfile
+import numpy as np
+from pyo import *
+
+"""
+Living beings sample cache
+================================================================
+Renders every instrument of INSTRUMENT_FAMILIES offline once, at
+SAMPLE_NOTES pitches, so beings_field can play them with cheap
+table-reading sampler voices (SAMPLER = True) instead of the live
+oscillator + Biquad + noise Biquad graph of BallVoice:
+
+    python beings_samples.py            # render what is missing or changed
+    python beings_samples.py --force    # render everything again
+
+================================================================
+Per instrument and pitch, from one offline pyo render:
+- body: oscillator through the instrument filter; its steady state
+  is periodic, so one period is kept as a TABLE_SIZE wavetable
+  (noise instruments keep one filtered noise loop for all pitches)
+- tail: noise through the resonant bandpass at the pitch, a loop
+  crossfaded at its ends, pitch-shifted by the reading speed
+The filter cutoff and the Q values get the BallVoice random spread
+once per instrument (seeded). Envelopes, ring modulation, FM and
+quad gains stay live in the voice. Files: SAMPLE_DIR/<instrument>_
+<params digest>/{notes,body,tail}.npy and SAMPLE_DIR/manifest.csv.
+"""
+
+SAMPLE_DIR = '.beings_samples'
+SAMPLE_RATE = 48000
+SAMPLE_NOTES = list(range(18, 109, 6))  # MIDI notes rendered, covers every MIDI_RANGES
+TABLE_SIZE = 2048  # wavetable points (one period)
+BODY_S = 0.5  # body render length, the filter has settled at the end
+TAIL_S = 1.0  # tail loop length
+LOOP_FADE = 0.05  # tail loop crossfade (s)
+SAMPLE_SEED = 1
+SAMPLE_VERSION = 1  # bump when the render changes
+FILTER_TYPES = {'lp': 0, 'hp': 1, 'bp': 2}
+
+# 1. Instruments
+# Envelope format: (attack, decay, sustain, release, osc_type, filter_type, brightness)
+# osc_type: 'sine', 'saw', 'square', 'noise', 'pulse'
+# filter_type: 'lp' (lowpass), 'hp' (highpass), 'bp' (bandpass), 'none'
+# brightness: 0.0-1.0 (affects filter cutoff)
+INSTRUMENT_FAMILIES = {
+    'lows': {
+        'bass': (0.08, 0.15, 0.7, 0.5, 'saw', 'lp', 0.3),
+        'cello': (0.06, 0.12, 0.75, 0.45, 'saw', 'lp', 0.4),
+        'piano': (0.003, 0.3, 0.2, 0.6, 'saw', 'lp', 0.7),
+        'harp': (0.002, 0.2, 0.15, 0.7, 'sine', 'lp', 0.8),
+        'bass_tuba': (0.08, 0.15, 0.75, 0.4, 'square', 'lp', 0.25),
+        'bass_trombone': (0.06, 0.12, 0.7, 0.35, 'square', 'lp', 0.35),
+        'baritone_sax': (0.04, 0.12, 0.7, 0.35, 'square', 'bp', 0.4),
+        'tenor_sax': (0.035, 0.1, 0.7, 0.3, 'square', 'bp', 0.5),
+        'contra_bassoon': (0.06, 0.15, 0.7, 0.4, 'sine', 'lp', 0.2),
+        'bass_clarinet': (0.05, 0.12, 0.75, 0.35, 'sine', 'lp', 0.3),
+   },
+   
+    'mids': {
+        'viola': (0.05, 0.1, 0.75, 0.4, 'saw', 'lp', 0.5),
+        'vibraphone': (0.005, 0.4, 0.3, 1.2, 'sine', 'none', 0.9),
+        'celeste': (0.004, 0.25, 0.25, 0.8, 'sine', 'lp', 0.85),
+        'tenor_trombone': (0.05, 0.1, 0.7, 0.3, 'square', 'lp', 0.45),
+        'soprano_sax': (0.03, 0.08, 0.65, 0.28, 'square', 'bp', 0.6),
+        'alto_clarinet': (0.04, 0.1, 0.75, 0.3, 'sine', 'lp', 0.4),
+        'clarinet': (0.035, 0.08, 0.75, 0.28, 'sine', 'lp', 0.5),
+        'english_horn': (0.04, 0.1, 0.7, 0.3, 'sine', 'lp', 0.45),
+    },
+    'highs': {
+        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
+        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
+        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
+        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
+        'sopranino_sax': (0.025, 0.07, 0.65, 0.25, 'square', 'bp', 0.7),
+        'oboe': (0.03, 0.08, 0.7, 0.25, 'sine', 'lp', 0.6),
+        'alto_flute': (0.04, 0.1, 0.65, 0.3, 'sine', 'lp', 0.65),
+    },
+
+    'veryhighs': {
+        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
+        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
+        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
+        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
+        'piccolo': (0.02, 0.06, 0.5, 0.2, 'sine', 'hp', 0.9),
+    },    
+    'strings': {
+        'bass': (0.08, 0.15, 0.7, 0.5, 'saw', 'lp', 0.3),
+        'cello': (0.06, 0.12, 0.75, 0.45, 'saw', 'lp', 0.4),
+        'viola': (0.05, 0.1, 0.75, 0.4, 'saw', 'lp', 0.5),
+        'violin': (0.04, 0.08, 0.8, 0.35, 'saw', 'lp', 0.6),
+    }, 
+   'keyboard_perc': {
+        'piano': (0.003, 0.3, 0.2, 0.6, 'saw', 'lp', 0.7),
+        'harp': (0.002, 0.2, 0.15, 0.7, 'sine', 'lp', 0.8),
+        'vibraphone': (0.005, 0.4, 0.3, 1.2, 'sine', 'none', 0.9),
+        'celeste': (0.004, 0.25, 0.25, 0.8, 'sine', 'lp', 0.85),
+        'xylophone': (0.001, 0.08, 0.1, 0.25, 'sine', 'hp', 0.95),
+        'glockenspiel': (0.001, 0.15, 0.1, 0.4, 'sine', 'hp', 1.0),
+    },
+    'brass': {
+        'bass_tuba': (0.08, 0.15, 0.75, 0.4, 'square', 'lp', 0.25),
+        'bass_trombone': (0.06, 0.12, 0.7, 0.35, 'square', 'lp', 0.35),
+        'tenor_trombone': (0.05, 0.1, 0.7, 0.3, 'square', 'lp', 0.45),
+        'trumpet': (0.03, 0.08, 0.65, 0.25, 'square', 'lp', 0.6),
+    },
+    'saxophones': {
+        'baritone_sax': (0.04, 0.12, 0.7, 0.35, 'square', 'bp', 0.4),
+        'tenor_sax': (0.035, 0.1, 0.7, 0.3, 'square', 'bp', 0.5),
+        'soprano_sax': (0.03, 0.08, 0.65, 0.28, 'square', 'bp', 0.6),
+        'sopranino_sax': (0.025, 0.07, 0.65, 0.25, 'square', 'bp', 0.7),
+    },
+    'woodwinds': {
+        'contra_bassoon': (0.06, 0.15, 0.7, 0.4, 'sine', 'lp', 0.2),
+        'bass_clarinet': (0.05, 0.12, 0.75, 0.35, 'sine', 'lp', 0.3),
+        'alto_clarinet': (0.04, 0.1, 0.75, 0.3, 'sine', 'lp', 0.4),
+        'clarinet': (0.035, 0.08, 0.75, 0.28, 'sine', 'lp', 0.5),
+        'english_horn': (0.04, 0.1, 0.7, 0.3, 'sine', 'lp', 0.45),
+        'oboe': (0.03, 0.08, 0.7, 0.25, 'sine', 'lp', 0.6),
+        'alto_flute': (0.04, 0.1, 0.65, 0.3, 'sine', 'lp', 0.65),
+        'flute': (0.03, 0.08, 0.6, 0.25, 'sine', 'lp', 0.75),
+        'piccolo': (0.02, 0.06, 0.5, 0.2, 'sine', 'hp', 0.9),
+    },
+    'drums': {
+        'bass_drum': (0.001, 0.15, 0.0, 0.3, 'noise', 'lp', 0.15),
+        'snare_drum': (0.001, 0.05, 0.0, 0.12, 'noise', 'bp', 0.6),
+        'closed_hihat': (0.001, 0.03, 0.0, 0.08, 'noise', 'hp', 0.95),
+        'open_hihat': (0.001, 0.08, 0.1, 0.25, 'noise', 'hp', 0.9),
+        'ride': (0.002, 0.12, 0.15, 0.4, 'noise', 'hp', 0.7),
+        'cymbals': (0.003, 0.3, 0.2, 1.5, 'noise', 'hp', 0.75),
+    },
+    'percussion': {
+        'triangle': (0.001, 0.1, 0.1, 1.2, 'sine', 'hp', 1.0),
+        'claves': (0.001, 0.02, 0.0, 0.05, 'noise', 'bp', 0.8),
+        'maracas': (0.002, 0.05, 0.0, 0.15, 'noise', 'hp', 0.85),
+        'gong': (0.01, 0.5, 0.3, 2.0, 'noise', 'lp', 0.3),
+        'woodblock': (0.001, 0.03, 0.0, 0.08, 'noise', 'bp', 0.7),
+        'cowbell': (0.001, 0.08, 0.05, 0.2, 'square', 'bp', 0.75),
+        'bongos': (0.002, 0.08, 0.0, 0.15, 'noise', 'bp', 0.5),
+    }
+}
+
+def instruments():
+    """Unique instruments (name: params) over all families"""
+    return {name: params for family in INSTRUMENT_FAMILIES.values() for name, params in family.items()}
+
+def params_key(name, params):
+    """Digest of everything a render depends on"""
+    parts = (SAMPLE_VERSION, name, params, SAMPLE_NOTES, SAMPLE_RATE, TABLE_SIZE, BODY_S, TAIL_S, SAMPLE_SEED)
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+# 2. Offline Render
+def one_period(x, freq, sr=SAMPLE_RATE, size=TABLE_SIZE):
+    """Last period of a periodic signal, resampled to `size` points"""
+    period = sr / freq
+    pos = len(x) - 1 - period + np.arange(size) * period / size
+    return np.interp(pos, np.arange(len(x)), x).astype(np.float32)
+
+def make_loop(x, fade=LOOP_FADE, sr=SAMPLE_RATE):
+    """Loop without a click: the end is crossfaded into the start"""
+    n = int(fade * sr)
+    ramp = np.linspace(0, 1, n)
+    loop = x[:len(x) - n].copy()
+    loop[:n] = x[:n] * ramp + x[len(x) - n:] * (1 - ramp)
+    return loop.astype(np.float32)
+
+def render_instrument(server, name, params, tmp_wav):
+    """Body and tail tables of one instrument at every SAMPLE_NOTES pitch"""
+    rng = np.random.default_rng([SAMPLE_SEED, int(params_key(name, params), 16)])
+    osc_type, filt_type, brightness = params[4:]
+    # BallVoice spread, drawn once per instrument
+    cutoff = float(np.clip(500 + brightness * 14000 + rng.uniform(-1000, 1000), 200, 18000))
+    q, tail_q, sharp = rng.uniform(0.7, 2.5), rng.uniform(8, 15), rng.uniform(0.3, 0.7)
+
+    server.boot()
+    server.recordOptions(dur=max(BODY_S, TAIL_S) + 0.01, filename=tmp_wav, fileformat=0, sampletype=1)
+    keep, bodies, tails = [], [], []
+    notes = SAMPLE_NOTES if osc_type != 'noise' else SAMPLE_NOTES[:1]  # noise body is the same at all pitches
+    for note in SAMPLE_NOTES:
+        freq = midiToHz(note)
+        if note in notes:
+            if osc_type == 'sine': osc = Sine(freq=freq)
+            elif osc_type == 'saw': osc = LFO(freq=freq, sharp=1, type=0)
+            elif osc_type == 'square': osc = LFO(freq=freq, sharp=1, type=2)
+            elif osc_type == 'pulse': osc = LFO(freq=freq, sharp=sharp, type=4)
+            else: osc = Noise()
+            body = Biquad(osc, freq=cutoff, q=q, type=FILTER_TYPES[filt_type]) if filt_type in FILTER_TYPES else osc
+            bodies.append(NewTable(length=BODY_S if osc_type != 'noise' else TAIL_S))
+            keep += [osc, body, TableRec(body, bodies[-1]).play()]
+        tail = Biquad(Noise(), freq=freq, q=tail_q, type=2)
+        tails.append(NewTable(length=TAIL_S))
+        keep += [tail, TableRec(tail, tails[-1]).play()]
+    server.start()  # offline: returns when the render is done
+
+    read = lambda t: np.asarray(t.getTable(), dtype=np.float64)
+    if osc_type == 'noise': body = make_loop(read(bodies[0]))[None]
+    else: body = np.stack([one_period(read(t), midiToHz(n)) for t, n in zip(bodies, notes)])
+    tail = np.stack([make_loop(read(t)) for t in tails])
+    server.shutdown()
+    return {'notes': np.array(SAMPLE_NOTES), 'body': body, 'tail': tail,
+            'meta': np.array([cutoff, q, tail_q])}
+
+def render_cache(path=SAMPLE_DIR, force=False):
+    """Render the missing or changed instruments, write the manifest"""
+    os.makedirs(path, exist_ok=True)
+    server = Server(sr=SAMPLE_RATE, nchnls=1, duplex=0, audio='offline')
+    server.deactivateMidi()
+    tmp_wav = os.path.join(path, 'render.wav')
+    rows = []
+    for name, params in sorted(instruments().items()):
+        entry = os.path.join(path, f"{name}_{params_key(name, params)}")
+        t0 = time.perf_counter()
+        if force or not os.path.isdir(entry):
+            arrays = render_instrument(server, name, params, tmp_wav)
+            tmp = tempfile.mkdtemp(dir=path)
+            for key, arr in arrays.items():
+                np.save(os.path.join(tmp, key + '.npy'), arr)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+            print(f"--- Rendered {name} ({params[4]}/{params[5]}) in {time.perf_counter() - t0:.2f}s ---")
+        # Older renders of this instrument are stale
+        for old in os.listdir(path):
+            if old.rsplit('_', 1)[0] == name and os.path.join(path, old) != entry:
+                shutil.rmtree(os.path.join(path, old), ignore_errors=True)
+        rows.append({'instrument': name, 'key': params_key(name, params), 'osc': params[4], 'filter': params[5],
+                     'notes': len(SAMPLE_NOTES), 'sample_rate': SAMPLE_RATE})
+    if os.path.exists(tmp_wav): os.remove(tmp_wav)
+    with open(os.path.join(path, 'manifest.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+# 3. Playback Tables
+def missing_instruments(path=SAMPLE_DIR):
+    """Instruments without an up-to-date render"""
+    return [name for name, params in sorted(instruments().items())
+            if not os.path.isdir(os.path.join(path, f"{name}_{params_key(name, params)}"))]
+
+class SampleBank:
+    """pyo tables of the rendered instruments, built once and shared by every voice"""
+    def __init__(self, path=SAMPLE_DIR):
+        self.path, self.loaded = path, {}
+
+    def tables(self, name):
+        """(notes Hz, body tables, tail tables, periodic, meta [cutoff, q, tail_q]) of one instrument"""
+        if name not in self.loaded:
+            entry = os.path.join(self.path, f"{name}_{params_key(name, instruments()[name])}")
+            load = lambda key: np.load(os.path.join(entry, key + '.npy'))
+            body, tail = load('body'), load('tail')
+            self.loaded[name] = (
+                midiToHz(load('notes').tolist()),
+                [DataTable(size=len(b), init=b.tolist()) for b in body],
+                [DataTable(size=len(t), init=t.tolist()) for t in tail],
+                len(body) > 1, load('meta').tolist())
+        return self.loaded[name]
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the beings_field instruments to a sample cache")
+    parser.add_argument('--dir', default=SAMPLE_DIR, help="cache directory")
+    parser.add_argument('--force', action='store_true', help="render every instrument again")
+    opts = parser.parse_args()
+    t0 = time.perf_counter()
+    rows = render_cache(opts.dir, opts.force)
+    print(f"--- {len(rows)} instruments x {len(SAMPLE_NOTES)} notes in {opts.dir} ({time.perf_counter() - t0:.1f}s) ---")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import csv, time, argparse, itertools
+import numpy as np
+from beings_core import BeingField, STOP_THRESHOLD, X_MIN, X_MAX, Y_MIN, Y_MAX
+
+"""
+Living beings life expectancy
+================================================================
+Headless Monte-Carlo runs of the beings_field physics (beings_core,
+the same moves as MetroBall._do_update), no audio, no Launchpad:
+
+    python beings_sim.py
+    python beings_sim.py --runs 5000 --scalars 1,4,8 --layouts none,ring --wrap both
+    python beings_sim.py --thresholds 1.2,1.8,2.5 --csv lifetimes.csv
+
+================================================================
+A run is one performance: --beings beings launched together with
+sleep 0.08 at random positions and angles, which ends when the last
+one stops. Every configuration (scalar, lifetime mode, threshold,
+obstacle layout, wrap) plays --runs runs; all runs and scalars of a
+layout share one field and move together, one array step per move,
+fast-forwarded (a being's lifetime is the sum of its sleeps).
+Reported per configuration:
+- being lifetime: mean and 10/50/90th percentiles (s)
+- performance length (last being): mean and 10/50/90th percentiles (s)
+- wall and obstacle hits per second, and per move
+Beings still alive after --max-time are counted as censored.
+"""
+
+SLEEP_START = 0.08  # MetroBall / FieldBeing start sleep
+MODE_NAMES = ['short', 'normal', 'long']  # lifetime_mode 0..2 (beings_field uses 1)
+MAX_TIME = 3600.0  # censoring limit of one being (s)
+
+# 1. Configurations
+def friction_values(scalar):
+    """beings_field Scalar Start: FRICTION_VALUES for a scalar 1..8"""
+    base_f = 1.01 + (0.12 / scalar)
+    return [base_f * 1.12, base_f, base_f * 0.96]
+
+def layout_cells(name, seed=0):
+    """Obstacle cells (x, y) of a named layout on the 8x8 field"""
+    if name == 'none': return []
+    if name == 'center': return [(3, 4), (4, 4), (3, 5), (4, 5)]
+    if name == 'cross': return [(3, y) for y in range(2, 8)] + [(x, 5) for x in range(1, 7) if x != 3]
+    if name == 'ring': return [(x, y) for x in range(2, 6) for y in range(3, 7) if x in (2, 5) or y in (3, 6)]
+    if name.startswith('random'):  # randomN: N cells, fixed by the seed
+        rng = np.random.default_rng(seed)
+        cells = [(x, y) for x in range(X_MIN, X_MAX + 1) for y in range(Y_MIN, Y_MAX + 1)]
+        return [cells[i] for i in rng.choice(len(cells), int(name[6:] or 8), replace=False)]
+    # explicit list: "x,y;x,y"
+    return [tuple(int(v) for v in cell.split(',')) for cell in name.split(';') if cell]
+
+LAYOUTS = ['none', 'center', 'cross', 'ring', 'random8']
+
+# 2. Simulation
+def simulate(runs, beings, scalars, mode, threshold, layout, wrap, seed=0, max_time=MAX_TIME):
+    """Lifetimes (scalars, runs, beings) and per-being move/hit counts of one layout"""
+    rng = np.random.default_rng(seed)
+    n = len(scalars) * runs * beings
+    field = BeingField(n, seed=seed)
+    field.stop_threshold = threshold
+    for cell in layout_cells(layout, seed):
+        field.obstacles[cell] = True
+    friction = np.repeat([friction_values(s)[mode] for s in scalars], runs * beings)
+
+    # Spawn all at once (as field.spawn, vectorized)
+    field.x[:] = rng.uniform(X_MIN, X_MAX, n)
+    field.y[:] = rng.uniform(Y_MIN, Y_MAX, n)
+    field.angle[:] = rng.uniform(0, 2 * np.pi, n)
+    field.sleep[:] = SLEEP_START
+    field.due[:] = 0.0
+    field.active[:] = True
+
+    life, moves = np.zeros(n), np.zeros(n, dtype=np.int64)
+    walls, obst = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    censored = np.zeros(n, dtype=bool)
+    while field.active.any():
+        ev = field.step(np.inf, wrap, friction)
+        moved = ev['moved']
+        life[moved] += field.sleep[moved]  # time until the next move (or the expiry tick)
+        moves[moved] += 1
+        obst[ev['obstacle']] += 1
+        walls[np.setdiff1d(ev['hit'], ev['obstacle'], assume_unique=True)] += 1
+        late = moved[life[moved] > max_time]
+        censored[late] = True
+        field.active[late] = False
+
+    shape = (len(scalars), runs, beings)
+    return {'life': life.reshape(shape), 'moves': moves.reshape(shape), 'walls': walls.reshape(shape),
+            'obstacles': obst.reshape(shape), 'censored': censored.reshape(shape)}
+
+def summarize(sim, k):
+    """Report fields of scalar k of one simulate() result"""
+    life, moves = sim['life'][k], sim['moves'][k]
+    total_s = max(life.sum(), 1e-9)
+    p = lambda a, q: round(float(np.percentile(a, q)), 2)
+    session = life.max(axis=1)
+    return {
+        'life_mean': round(float(life.mean()), 2), 'life_p10': p(life, 10), 'life_p50': p(life, 50), 'life_p90': p(life, 90),
+        'session_mean': round(float(session.mean()), 2), 'session_p10': p(session, 10),
+        'session_p50': p(session, 50), 'session_p90': p(session, 90),
+        'wall_hits_s': round(float(sim['walls'][k].sum() / total_s), 3),
+        'obstacle_hits_s': round(float(sim['obstacles'][k].sum() / total_s), 3),
+        'hits_per_move': round(float((sim['walls'][k].sum() + sim['obstacles'][k].sum()) / max(moves.sum(), 1)), 3),
+        'moves_mean': round(float(moves.mean()), 1),
+        'censored': int(sim['censored'][k].sum()),
+    }
+
+# 3. Run
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo life expectancy of beings_field beings")
+    parser.add_argument('--runs', type=int, default=1000, help="runs (performances) per configuration")
+    parser.add_argument('--beings', type=int, default=8, help="beings launched per run")
+    parser.add_argument('--scalars', default='1,2,3,4,5,6,7,8', help="startup scalars (comma list)")
+    parser.add_argument('--modes', default='1', help="lifetime modes 0..2 (comma list, beings_field uses 1)")
+    parser.add_argument('--thresholds', default=str(STOP_THRESHOLD), help="STOP_THRESHOLD values (comma list)")
+    parser.add_argument('--layouts', default=','.join(LAYOUTS),
+                        help="obstacle layouts: none, center, cross, ring, randomN or 'x,y;x,y' cells (comma list; "
+                             "use --layout for one explicit list)")
+    parser.add_argument('--layout', action='append', default=[], help="one explicit layout 'x,y;x,y' (repeatable)")
+    parser.add_argument('--wrap', choices=['off', 'on', 'both'], default='both', help="wrap (no walls) mode")
+    parser.add_argument('--max-time', type=float, default=MAX_TIME, help="censoring limit of one being (s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', help="also write the results to this CSV file")
+    opts = parser.parse_args()
+
+    scalars = [int(v) for v in opts.scalars.split(',')]
+    modes = [int(v) for v in opts.modes.split(',')]
+    thresholds = [float(v) for v in opts.thresholds.split(',')]
+    layouts = [v for v in opts.layouts.split(',') if v] + opts.layout
+    wraps = {'off': [False], 'on': [True], 'both': [False, True]}[opts.wrap]
+
+    rows = []
+    t0 = time.perf_counter()
+    for mode, threshold, layout, wrap in itertools.product(modes, thresholds, layouts, wraps):
+        sim = simulate(opts.runs, opts.beings, scalars, mode, threshold, layout, wrap, opts.seed, opts.max_time)
+        for k, scalar in enumerate(scalars):
+            row = dict(scalar=scalar, friction=round(friction_values(scalar)[mode], 4), mode=MODE_NAMES[mode],
+                       threshold=threshold, layout=layout, wrap=wrap, **summarize(sim, k))
+            rows.append(row)
+            print(f"--- Scalar {scalar} ({row['mode']}, x{row['friction']}), threshold {threshold}, {layout}, "
+                  f"wrap {'on' if wrap else 'off'}: being {row['life_mean']}s "
+                  f"[{row['life_p10']}/{row['life_p50']}/{row['life_p90']}], "
+                  f"session {row['session_mean']}s [{row['session_p10']}/{row['session_p50']}/{row['session_p90']}], "
+                  f"walls {row['wall_hits_s']}/s, obstacles {row['obstacle_hits_s']}/s"
+                  + (f", {row['censored']} censored" if row['censored'] else "") + " ---")
+    print(f"--- {len(rows)} configurations x {opts.runs} runs in {time.perf_counter() - t0:.1f}s ---")
+    if opts.csv and rows:
+        with open(opts.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == '__main__':
+    main()
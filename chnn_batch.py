@@ -0,0 +1,146 @@
+import os, csv, time, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pyo import *
+from chnn_maps import load_cached, load_features, head_orders, SCAN_ORDERS, column_spectra, iter_spectral_render, write_wav
+from chnn_engine import TableScan
+from chnn_report import write_report, CHANNEL_NAMES
+
+"""
+ChNN batch sonifier
+================================================================
+Headless version of chnn_scan: renders every image of a folder to
+a 4-channel WAV file, with no GUI and no audio device. Each worker
+process owns one offline pyo Server, which renders faster than
+real time; images are spread across a process pool.
+
+    python chnn_batch.py images/ renders/ --speed 40 --workers 8
+    python chnn_batch.py images/ renders/ --mode spectral --size 1024
+
+================================================================
+Same auditory display as chnn_scan (audio-rate scan):
+- Pitch from grayscale, Blit harmonics from RGB ratio
+- Quad panning from pixel X/Y, one or more scan heads
+- Freeverb -> Compress -> master gain
+--mode spectral renders the column-wise additive scan with an
+inverse FFT in NumPy instead (no pyo, no effects), streaming to
+disk so very large rasters fit in memory.
+A manifest.csv with durations and render times is written to
+the output folder; --report adds per-channel RMS and crest factor
+and saves spectrogram/RMS arrays and PNGs next to each WAV
+(chnn_report).
+"""
+
+SAMPLE_RATE = 48000
+IMAGE_EXT = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp')
+TAIL = 2.0  # seconds of reverb tail after the last pixel
+
+server = None
+
+def init_worker():
+    """One offline server per worker process"""
+    global server
+    server = Server(sr=SAMPLE_RATE, nchnls=4, duplex=0, audio='offline')
+    server.deactivateMidi()
+
+def render_spectral(img_path, wav_path, opts):
+    """Inverse-FFT render of the column spectra, returns a manifest row"""
+    t0 = time.perf_counter()
+    pixels, width, height, _, _ = load_cached(img_path, size=(opts.size, opts.size))
+    freqs, amps, gains = column_spectra(pixels)
+    gains = gains * 10 ** (opts.gain / 20.0)
+    dur = write_wav(wav_path, iter_spectral_render(freqs, amps, gains, opts.column / 1000.0, SAMPLE_RATE), SAMPLE_RATE)
+    render_s = time.perf_counter() - t0
+    return {'image': img_path, 'wav': wav_path, 'pixels': width * height,
+            'duration_s': round(dur, 3), 'render_s': round(render_s, 3),
+            'realtime_x': round(dur / render_s, 1), 'status': 'ok'}
+
+def render_image(img_path, wav_path, opts):
+    """Render one image, returns a manifest row"""
+    if opts.mode == 'spectral':
+        return render_spectral(img_path, wav_path, opts)
+    t0 = time.perf_counter()
+    _, width, height, _, params = load_cached(img_path, size=(opts.size, opts.size))
+    orders = head_orders(width, height, opts.heads, opts.layout, opts.order)
+    pixel_time = opts.speed / 1000.0
+    dur = orders.shape[1] * pixel_time + TAIL
+
+    server.boot()
+    server.recordOptions(dur=dur, filename=wav_path, fileformat=0, sampletype=1)
+
+    features = load_features(img_path, size=(opts.size, opts.size)) if opts.features else None
+    scan = TableScan(params, pixel_time, orders, features=features)
+    reverb = Freeverb(scan.out, size=0.8, damp=0.5, bal=Clip(scan.send * opts.send + opts.reverb, 0, 1))
+    comp = Compress(reverb, thresh=opts.thresh, ratio=opts.ratio, risetime=0.01, falltime=0.1)
+    # out keeps the graph referenced until the render is done
+    out = (comp * DBToA(opts.gain)).out()
+    # Stop at the last step, so the tail is reverb only (the counter would wrap)
+    scan_end = TrigFunc(scan.end, scan.stop)
+
+    scan.play()
+    server.start()  # offline: returns when dur has been rendered
+    server.shutdown()
+
+    render_s = time.perf_counter() - t0
+    return {'image': img_path, 'wav': wav_path, 'pixels': width * height,
+            'duration_s': round(dur, 3), 'render_s': round(render_s, 3),
+            'realtime_x': round(dur / render_s, 1), 'status': 'ok'}
+
+def render_job(img_path, wav_path, opts):
+    """Render, then analyze the WAV if asked (in the same worker)"""
+    row = render_image(img_path, wav_path, opts)
+    if opts.report:
+        row.update(write_report(wav_path))
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a folder of images to 4-channel WAV files")
+    parser.add_argument('images', help="folder of images")
+    parser.add_argument('out', help="output folder for WAV files and manifest.csv")
+    parser.add_argument('--mode', choices=['pixel', 'spectral'], default='pixel', help="pixel scan or column spectra")
+    parser.add_argument('--size', type=int, default=64, help="scan raster side (pixels)")
+    parser.add_argument('--speed', type=float, default=40, help="ms per pixel")
+    parser.add_argument('--column', type=float, default=250, help="ms per column (spectral)")
+    parser.add_argument('--heads', type=int, default=1, help="scan heads playing at once")
+    parser.add_argument('--layout', choices=['spaced', 'tiles'], default='spaced', help="scan head layout")
+    parser.add_argument('--order', choices=SCAN_ORDERS, default='rowmajor', help="pixel scan order")
+    parser.add_argument('--features', action='store_true', help="edge accents, contrast sweep, saliency reverb send")
+    parser.add_argument('--send', type=float, default=0.4, help="extra reverb mix at full saliency (--features)")
+    parser.add_argument('--reverb', type=float, default=0.3, help="reverb mix 0..1")
+    parser.add_argument('--thresh', type=float, default=-20, help="compressor threshold (dB)")
+    parser.add_argument('--ratio', type=float, default=4, help="compressor ratio")
+    parser.add_argument('--gain', type=float, default=6, help="master gain (dB)")
+    parser.add_argument('--report', action='store_true', help="analyze each render (chnn_report)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    opts = parser.parse_args()
+
+    os.makedirs(opts.out, exist_ok=True)
+    images = sorted(f for f in os.listdir(opts.images) if f.lower().endswith(IMAGE_EXT))
+    print(f"--- Batch: {len(images)} images, {opts.workers} workers ---")
+
+    rows, t0 = [], time.perf_counter()
+    with ProcessPoolExecutor(max_workers=opts.workers, initializer=init_worker) as pool:
+        jobs = {}
+        for name in images:
+            img_path = os.path.join(opts.images, name)
+            wav_path = os.path.join(opts.out, os.path.splitext(name)[0] + '.wav')
+            jobs[pool.submit(render_job, img_path, wav_path, opts)] = img_path
+        for fut in as_completed(jobs):
+            try:
+                row = fut.result()
+                print(f"--- Rendered {row['wav']}: {row['duration_s']}s in {row['render_s']}s ---")
+            except Exception as e:
+                row = {'image': jobs[fut], 'status': f"error: {e}"}
+                print(f"--- Failed {jobs[fut]}: {e} ---")
+            rows.append(row)
+
+    fields = ['image', 'wav', 'pixels', 'duration_s', 'render_s', 'realtime_x', 'status']
+    if opts.report:
+        fields += [f"{k}_db_{ch}" for ch in CHANNEL_NAMES for k in ('rms', 'crest')]
+    with open(os.path.join(opts.out, 'manifest.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda r: r['image']))
+    print(f"--- Batch done in {time.perf_counter() - t0:.1f}s ---")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,506 @@
+import os, sys, stat, time, socket, itertools, threading
+import numpy as np
+from chnn_maps import midi_to_hz, quad_gains, cached_arrays
+
+"""
+ChNN data maps
+================================================================
+Dataset reading and row-to-parameter mapping for the ChNN data
+sonifier (chnn_datascan). Plain NumPy like chnn_maps: a dataset is
+read in chunks of rows, so multi-GB files never sit in memory.
+
+================================================================
+Sources:
+- .npy: memory-mapped, chunks are slices of the map
+- CSV/TSV: read CHUNK_ROWS lines at a time; a non-numeric first
+  line is taken as the header (column names)
+- live: stdin, a named pipe or a UDP port, one text record per
+  line, through a lock-free RingBuffer (StreamIngest)
+
+Long series are reduced to a target number of rows before playback
+(LTTB or min-max buckets over one column), in one streaming pass.
+
+Multivariate rows can be placed instead of using x/y columns: an
+incremental PCA (batched SVD) projects them to 2-D and the result
+is quantized to the GRID x GRID cells of the quad field and the
+Launchpad; the fitted projection is cached per file.
+
+Auditory display (one note per row, columns chosen by the user,
+each normalized by its min/max over the whole file):
+- pitch: column -> MIDI DATA_MIDI range -> Hz
+- harms: column -> number of Blit harmonics (DATA_HARMS)
+- amp:   column -> envelope level (0..DATA_AMP)
+- x, y:  columns -> [FL, FR, RL, RR] quad gains (bilinear, as
+         get_quad_gains / chnn_maps.quad_gains)
+Unmapped roles get a fixed value (mid pitch, center position).
+"""
+
+# 1. Dataset Readers
+CHUNK_ROWS = 1 << 16  # rows per chunk, bounds working memory
+
+class Dataset:
+    """Row-chunked view of a .npy or CSV file"""
+    def __init__(self, path):
+        self.path = path
+        if path.lower().endswith('.npy'):
+            self.array = np.load(path, mmap_mode='r')
+            if self.array.ndim == 1:
+                self.array = self.array.reshape(-1, 1)
+            self.rows, self.num_cols = self.array.shape
+            self.columns = [str(i) for i in range(self.num_cols)]
+            self.header = False
+            return
+
+        self.array = None
+        with open(path) as f:
+            first = f.readline().strip()
+        self.delimiter = ',' if ',' in first else ('\t' if '\t' in first else None)
+        fields = [c.strip().strip('"') for c in first.split(self.delimiter)]
+        try:
+            [float(c) for c in fields]
+            self.header = False
+            self.columns = [str(i) for i in range(len(fields))]
+        except ValueError:
+            self.header = True
+            self.columns = fields
+        self.num_cols = len(fields)
+        self.rows = None  # known after a full pass, see stats()
+
+    def column(self, key):
+        """Column index from a name or a number, None passes through"""
+        if key is None or isinstance(key, int):
+            return key
+        if key in self.columns:
+            return self.columns.index(key)
+        if key.isdigit() and int(key) < self.num_cols:
+            return int(key)
+        raise KeyError(f"no column {key!r} in {self.path} (columns: {', '.join(self.columns)})")
+
+    def _parse(self, lines):
+        try:
+            return np.loadtxt(lines, delimiter=self.delimiter, ndmin=2, dtype=np.float64)
+        except ValueError:
+            # Missing or malformed fields: slower parser, NaN for bad values
+            return np.atleast_2d(np.genfromtxt(lines, delimiter=self.delimiter, dtype=np.float64))
+
+    def chunks(self, chunk_rows=CHUNK_ROWS, start=0):
+        """Yield float64 arrays of up to chunk_rows rows, from row `start`"""
+        if self.array is not None:
+            for i in range(start, self.rows, chunk_rows):
+                yield np.asarray(self.array[i:i + chunk_rows], dtype=np.float64)
+            return
+        with open(self.path) as f:
+            lines = itertools.islice(f, int(self.header) + start, None)
+            while True:
+                block = [ln for ln in itertools.islice(lines, chunk_rows) if ln.strip()]
+                if not block:
+                    return
+                yield self._parse(block)
+
+    def stats(self, cache_dir=None):
+        """Row count and per-column min/max over the whole file, cached per file content"""
+        def compute():
+            lo, hi, rows = np.full(self.num_cols, np.inf), np.full(self.num_cols, -np.inf), 0
+            for chunk in self.chunks():
+                lo = np.fmin(lo, np.nanmin(chunk, axis=0))
+                hi = np.fmax(hi, np.nanmax(chunk, axis=0))
+                rows += len(chunk)
+            return {'lo': lo, 'hi': hi, 'rows': np.array([rows])}
+
+        arrays = cached_arrays(self.path, ('stats', self.num_cols), compute, cache_dir)
+        self.rows = int(arrays['rows'][0])
+        return np.asarray(arrays['lo']), np.asarray(arrays['hi'])
+
+# 2. Row Mapping
+DATA_MIDI = (36.0, 96.0)   # pitch column min..max
+DATA_HARMS = (1.0, 45.0)   # harms column min..max
+DATA_AMP = 0.2             # amp column max, as the pixel scan
+ROLES = ('pitch', 'harms', 'amp', 'x', 'y')
+DEFAULTS = {'pitch': 0.5, 'harms': 0.25, 'amp': 1.0, 'x': 0.5, 'y': 0.5}
+
+def normalize(values, lo, hi):
+    """Scale to 0..1 by a min/max, NaN and constant columns map to 0"""
+    span = hi - lo
+    out = (values - lo) / span if span > 0 else np.zeros_like(values)
+    return np.clip(np.nan_to_num(out, nan=0.0), 0.0, 1.0)
+
+def row_params(rows, mapping, lo, hi, xy=None):
+    """Map a chunk of rows to freq, harms, amp and quad gains (pixel_params layout)
+
+    mapping: role -> column index (or None for the role's default).
+    xy: optional (n, 2) position in 0..1 replacing the x/y columns (projection).
+    """
+    n = len(rows)
+    norm = {}
+    for role in ROLES:
+        col = mapping.get(role)
+        norm[role] = np.full(n, DEFAULTS[role]) if col is None else normalize(rows[:, col], lo[col], hi[col])
+    if xy is not None:
+        norm['x'], norm['y'] = xy[:, 0], xy[:, 1]
+    return {
+        'freq': midi_to_hz(DATA_MIDI[0] + norm['pitch'] * (DATA_MIDI[1] - DATA_MIDI[0])).astype(np.float32),
+        'harms': (DATA_HARMS[0] + norm['harms'] * (DATA_HARMS[1] - DATA_HARMS[0])).astype(np.float32),
+        'amp': (norm['amp'] * DATA_AMP).astype(np.float32),
+        'gains': quad_gains(norm['x'], norm['y'], 2, 2).astype(np.float32),
+    }
+
+def iter_params(dataset, mapping, chunk_rows=CHUNK_ROWS, indices=None, projection=None, cache_dir=None):
+    """Stream row_params() chunks over a whole dataset, or only the rows in `indices`
+
+    With a Projection, rows are placed by their grid cell and each chunk
+    also carries 'cells' (n, 2).
+    """
+    lo, hi = dataset.stats(cache_dir)
+    cols = {role: dataset.column(key) for role, key in mapping.items()}
+    chunks = dataset.chunks(chunk_rows) if indices is None else iter_rows(dataset, indices, chunk_rows)
+    for chunk in chunks:
+        if projection is None:
+            yield row_params(chunk, cols, lo, hi)
+            continue
+        cells = projection.cells(chunk)
+        params = row_params(chunk, cols, lo, hi, xy=cells / (GRID - 1.0))
+        params['cells'] = cells
+        yield params
+
+# 3. Live Streams
+# Reader thread -> RingBuffer -> audio control path (Metro callback). One writer
+# and one reader: each side only advances its own counter, so no lock is taken.
+RING_SIZE = 4096        # records held between the reader and the scan
+POLICIES = ('drop-oldest', 'decimate', 'block')
+DECIMATE_AT = 0.5       # fill level where 'decimate' starts thinning the input
+
+class RingBuffer:
+    """Fixed-size single-producer/single-consumer record queue, lock-free
+
+    head (writer) and tail (reader) only ever grow; slot = counter % capacity.
+    On overflow: 'drop-oldest' overwrites the oldest records (the reader skips
+    what it missed), 'decimate' keeps 1 in 2, 4, 8... incoming records as the
+    buffer fills and drops new ones when full, 'block' waits for room.
+    """
+    def __init__(self, capacity=RING_SIZE, width=1, policy='drop-oldest'):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.capacity, self.width, self.policy = capacity, width, policy
+        self.slots = np.zeros((capacity, width), dtype=np.float64)
+        self.head = self.tail = 0
+        self.reserve = 0  # head + 1 while a slot is being written (seqlock for drop-oldest)
+        # Counters, each written by one side only
+        self.pushed = self.decimated = 0      # writer
+        self.blocked_s = 0.0                  # writer
+        self.popped = self.overrun = 0        # reader
+        self._phase = 0
+
+    def fill(self):
+        return min(self.head - self.tail, self.capacity)
+
+    def push(self, record, poll=0.0005):
+        """Writer side, returns False if the record was dropped"""
+        fill = self.head - self.tail
+        if self.policy == 'decimate' and fill >= self.capacity * DECIMATE_AT:
+            if fill >= self.capacity:
+                self.decimated += 1
+                return False
+            step = 2 ** (1 + int(3 * (fill / self.capacity - DECIMATE_AT) / (1 - DECIMATE_AT)))
+            self._phase += 1
+            if self._phase % step:
+                self.decimated += 1
+                return False
+        elif self.policy == 'block' and fill >= self.capacity:
+            t0 = time.perf_counter()
+            while self.head - self.tail >= self.capacity: time.sleep(poll)
+            self.blocked_s += time.perf_counter() - t0
+        row = np.full(self.width, np.nan)
+        row[:min(len(record), self.width)] = record[:self.width]
+        self.reserve = self.head + 1  # claim the slot before overwriting it
+        self.slots[self.head % self.capacity] = row
+        self.head += 1  # publish after the slot is written
+        self.pushed += 1
+        return True
+
+    def pop(self):
+        """Reader side, next record (copy) or None when empty"""
+        while True:
+            reserve = self.reserve
+            if reserve - self.tail > self.capacity:  # overwritten (or being) by drop-oldest
+                self.overrun += reserve - self.capacity - self.tail
+                self.tail = reserve - self.capacity
+            if self.tail >= self.head:
+                return None
+            record = self.slots[self.tail % self.capacity].copy()
+            if self.reserve - self.tail <= self.capacity:  # not overwritten during the copy
+                self.tail += 1
+                self.popped += 1
+                return record
+
+    def dropped(self):
+        return self.decimated + self.overrun
+
+def parse_record(line):
+    """Numbers of one text record (comma, tab or space separated), None if not numeric"""
+    try:
+        return np.array([float(v) for v in line.replace(',', ' ').split()])
+    except ValueError:
+        return None
+
+def is_live(source):
+    """'-' (stdin), 'udp:PORT' or a named pipe"""
+    return source == '-' or source.startswith('udp:') or (os.path.exists(source) and stat.S_ISFIFO(os.stat(source).st_mode))
+
+def read_records(source, running=lambda: True):
+    """Yield records from a live source until it closes or running() is False"""
+    if source.startswith('udp:'):
+        host, _, port = source[4:].rpartition(':')
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((host or '127.0.0.1', int(port)))
+        sock.settimeout(0.2)
+        try:
+            while running():
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                for line in data.decode(errors='replace').splitlines():
+                    rec = parse_record(line)
+                    if rec is not None and len(rec): yield rec
+        finally:
+            sock.close()
+        return
+    f = sys.stdin if source == '-' else open(source)
+    try:
+        for line in f:
+            if not running(): break
+            rec = parse_record(line)
+            if rec is not None and len(rec): yield rec
+    finally:
+        if f is not sys.stdin: f.close()
+
+class StreamIngest:
+    """Reader thread filling a RingBuffer from a live source, with rate/lag counters"""
+    def __init__(self, source, width, capacity=RING_SIZE, policy='drop-oldest'):
+        self.source = source
+        self.ring = RingBuffer(capacity, width, policy)
+        self.running = True
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self._last = (time.perf_counter(), 0, 0)
+
+    def run(self):
+        try:
+            for rec in read_records(self.source, lambda: self.running):
+                self.ring.push(rec)
+        finally:
+            self.closed = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def stats(self):
+        """Ingest and consume rates (records/s) since the last call, lag (s) and drops"""
+        now, ring = time.perf_counter(), self.ring
+        t, pushed, popped = self._last
+        dt = max(now - t, 1e-9)
+        in_rate, out_rate = (ring.pushed - pushed) / dt, (ring.popped - popped) / dt
+        self._last = (now, ring.pushed, ring.popped)
+        lag = ring.fill() / out_rate if out_rate > 0 else float('inf') if ring.fill() else 0.0
+        return {'in_rate': in_rate, 'out_rate': out_rate, 'fill': ring.fill(), 'lag_s': lag,
+                'dropped': ring.dropped(), 'blocked_s': ring.blocked_s}
+
+# 4. Decimation
+# Both methods use fixed-size buckets and read the column in chunks, so a
+# memory-mapped series of any length is reduced with O(chunk) memory.
+DECIMATE_METHODS = ('lttb', 'minmax')
+
+def _bucket_blocks(chunks, start, stop, bs):
+    """(first index, values (k, bs)) blocks of whole buckets over [start, stop), last NaN-padded"""
+    carry, first, pos = np.empty(0), start, 0
+    for chunk in chunks:
+        lo, hi = max(start - pos, 0), min(stop - pos, len(chunk))
+        pos += len(chunk)
+        if hi <= lo: continue
+        carry = np.concatenate([carry, chunk[lo:hi]])
+        k = len(carry) // bs
+        if k:
+            yield first, carry[:k * bs].reshape(k, bs)
+            first, carry = first + k * bs, carry[k * bs:]
+    if len(carry):
+        yield first, np.concatenate([carry, np.full(bs - len(carry), np.nan)]).reshape(1, bs)
+
+def _lttb_block(first, vals, anchor, nxt, out):
+    """Select one row per bucket of a block, returns the anchor for the next block"""
+    k, bs = vals.shape
+    xs = first + np.arange(k * bs, dtype=np.float64).reshape(k, bs)
+    valid = ~np.isnan(vals)
+    cnt = valid.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        my = np.where(valid, vals, 0).sum(axis=1) / cnt
+        mx = np.where(valid, xs, 0).sum(axis=1) / cnt
+    ax, ay = np.append(anchor[0], mx[:-1]), np.append(anchor[1], my[:-1])
+    cx, cy = np.append(mx[1:], nxt[0]), np.append(my[1:], nxt[1])
+    area = np.abs((ax - cx)[:, None] * (vals - ay[:, None]) - (ax[:, None] - xs) * (cy - ay)[:, None])
+    sel = np.nan_to_num(area, nan=-1.0).argmax(axis=1)
+    out.append((first + np.arange(k) * bs + sel)[cnt > 0])
+    return mx[-1], my[-1]
+
+def lttb_indices(chunks, n, n_out):
+    """Largest-Triangle-Three-Buckets over a chunked series of length n, <= n_out row indices
+
+    Vectorized variant: the triangle's first corner is the previous bucket's
+    mean instead of its selected point, so every bucket is solved at once.
+    """
+    if n_out >= n: return np.arange(n)
+    if n_out < 3: return np.array([0, n - 1][:n_out])
+    bs = -(-(n - 2) // (n_out - 2))
+    ends = {}
+    def tap():
+        for c in chunks:
+            c = np.asarray(c, dtype=np.float64).ravel()
+            if len(c):
+                ends.setdefault('first', c[0])
+                ends['last'] = c[-1]
+            yield c
+
+    out, pending, anchor = [np.array([0])], None, None
+    for first, vals in _bucket_blocks(tap(), 1, n - 1, bs):
+        if pending is not None:
+            head = vals[0][~np.isnan(vals[0])]
+            nxt = (first + (len(head) - 1) / 2.0, head.mean()) if len(head) else (first, np.nan)
+            anchor = _lttb_block(*pending, anchor or (0.0, ends['first']), nxt, out)
+        pending = (first, vals)
+    if pending is not None:
+        _lttb_block(*pending, anchor or (0.0, ends['first']), (n - 1.0, ends['last']), out)
+    out.append(np.array([n - 1]))
+    return np.concatenate(out)
+
+def minmax_indices(chunks, n, n_out):
+    """Row indices of the min and max of every bucket, <= n_out of them, keeps all peaks"""
+    if n_out >= n: return np.arange(n)
+    bs = -(-n // max(n_out // 2, 1))
+    out = []
+    for first, vals in _bucket_blocks((np.asarray(c, dtype=np.float64).ravel() for c in chunks), 0, n, bs):
+        nan = np.isnan(vals)
+        lo = np.where(nan, np.inf, vals).argmin(axis=1)
+        hi = np.where(nan, -np.inf, vals).argmax(axis=1)
+        idx = first + np.arange(len(vals))[:, None] * bs + np.sort(np.stack([lo, hi], axis=1), axis=1)
+        out.append(idx[~nan.all(axis=1)].ravel())
+    return np.unique(np.concatenate(out)) if out else np.arange(0)
+
+def decimate(dataset, column, n_out, method='lttb', chunk_rows=CHUNK_ROWS, cache_dir=None):
+    """Row indices reducing a dataset to about n_out rows, by the shape of one column
+
+    Computed in one pass over the file and cached per file content.
+    """
+    if method not in DECIMATE_METHODS:
+        raise ValueError(f"method must be one of {DECIMATE_METHODS}")
+    dataset.stats(cache_dir)
+    col = dataset.column(column)
+    if n_out >= dataset.rows:
+        return np.arange(dataset.rows)
+    select = lttb_indices if method == 'lttb' else minmax_indices
+    compute = lambda: {'indices': select((c[:, col] for c in dataset.chunks(chunk_rows)), dataset.rows, n_out)}
+    arrays = cached_arrays(dataset.path, ('decimate', method, col, n_out), compute, cache_dir)
+    return np.asarray(arrays['indices'])
+
+def iter_rows(dataset, indices, chunk_rows=CHUNK_ROWS):
+    """Yield the rows at sorted `indices`, chunk_rows at a time"""
+    pending, pos, i = [], 0, 0
+    for chunk in dataset.chunks(chunk_rows):
+        j = np.searchsorted(indices, pos + len(chunk), side='left')
+        if j > i:
+            pending.append(chunk[indices[i:j] - pos])
+            i = j
+        pos += len(chunk)
+        if sum(len(p) for p in pending) >= chunk_rows:
+            rows = np.concatenate(pending)
+            yield rows[:chunk_rows]
+            pending = [rows[chunk_rows:]]
+    rows = np.concatenate(pending) if pending else np.empty((0, dataset.num_cols))
+    for k in range(0, len(rows), chunk_rows):
+        yield rows[k:k + chunk_rows]
+
+# 5. Projection
+GRID = 8  # cells per side, as the Launchpad field and get_quad_gains
+PCA_KEEP = 32  # components carried between batches
+
+class IncrementalPCA:
+    """PCA by SVD, fitted batch by batch (Ross et al. incremental update)
+
+    Each batch is stacked with the kept components scaled by their singular
+    values and a mean-shift row, so the SVD stays (keep + batch) x d. Keeping
+    more components than requested makes the update exact for narrow data.
+    """
+    def __init__(self, n_components=2, keep=PCA_KEEP):
+        self.k, self.keep = n_components, max(n_components, keep)
+        self.n, self.mean = 0, None
+        self.singular, self.basis = None, None
+
+    def partial_fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        n_b, mean_b = len(X), X.mean(axis=0)
+        if self.n == 0:
+            stack, mean = X - mean_b, mean_b
+        else:
+            n_tot = self.n + n_b
+            mean = self.mean + (mean_b - self.mean) * n_b / n_tot
+            shift = np.sqrt(self.n * n_b / n_tot) * (self.mean - mean_b)
+            stack = np.vstack([self.singular[:, None] * self.basis, X - mean_b, shift])
+        _, S, Vt = np.linalg.svd(stack, full_matrices=False)
+        # Deterministic signs: largest loading of each component positive
+        signs = np.sign(Vt[np.arange(len(Vt)), np.abs(Vt).argmax(axis=1)])
+        Vt *= np.where(signs == 0, 1, signs)[:, None]
+        self.singular, self.basis = S[:self.keep], Vt[:self.keep]
+        self.n, self.mean = self.n + n_b, mean
+        return self
+
+    @property
+    def components(self):
+        return self.basis[:self.k]
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean) @ self.components.T
+
+class Projection:
+    """Fitted 2-D projection of a dataset's columns, quantized to the GRID"""
+    def __init__(self, columns, lo, hi, mean, components, xy_lo, xy_hi):
+        self.columns, self.lo, self.hi = columns, lo, hi
+        self.mean, self.components = mean, components
+        self.xy_lo, self.xy_hi = xy_lo, xy_hi
+
+    def scaled(self, rows):
+        sel = rows[:, self.columns]
+        span = np.where(self.hi > self.lo, self.hi - self.lo, 1.0)
+        return np.nan_to_num((sel - self.lo) / span, nan=0.5)  # missing -> column middle
+
+    def xy(self, rows):
+        """Projected coordinates, shape (n, 2)"""
+        return (self.scaled(rows) - self.mean) @ self.components.T
+
+    def cells(self, rows):
+        """Grid cells (x, y) in 0..GRID-1, shape (n, 2)"""
+        span = np.where(self.xy_hi > self.xy_lo, self.xy_hi - self.xy_lo, 1.0)
+        norm = (self.xy(rows) - self.xy_lo) / span
+        return np.clip((norm * GRID).astype(np.int64), 0, GRID - 1)
+
+def load_projection(dataset, columns=None, chunk_rows=CHUNK_ROWS, cache_dir=None):
+    """Fit (two passes over the file) or load the cached projection of `columns` (default all)"""
+    lo, hi = dataset.stats(cache_dir)
+    cols = np.array([dataset.column(c) for c in columns] if columns else range(dataset.num_cols))
+    def compute():
+        pca = IncrementalPCA(2)
+        proj = Projection(cols, lo[cols], hi[cols], None, None, None, None)
+        for chunk in dataset.chunks(chunk_rows):
+            pca.partial_fit(proj.scaled(chunk))
+        comps = pca.components if len(pca.components) == 2 else np.vstack([pca.components, np.zeros(len(cols))])
+        proj.mean, proj.components = pca.mean, comps
+        xy_lo, xy_hi = np.full(2, np.inf), np.full(2, -np.inf)
+        for chunk in dataset.chunks(chunk_rows):
+            xy = proj.xy(chunk)
+            xy_lo, xy_hi = np.minimum(xy_lo, xy.min(axis=0)), np.maximum(xy_hi, xy.max(axis=0))
+        return {'mean': pca.mean, 'components': comps, 'xy_lo': xy_lo, 'xy_hi': xy_hi}
+
+    a = cached_arrays(dataset.path, ('projection', tuple(cols.tolist()), GRID), compute, cache_dir)
+    return Projection(cols, lo[cols], hi[cols], np.asarray(a['mean']), np.asarray(a['components']),
+                      np.asarray(a['xy_lo']), np.asarray(a['xy_hi']))
@@ -0,0 +1,247 @@
+import time, argparse, threading
+import numpy as np
+from pyo import *
+from chnn_data import Dataset, StreamIngest, iter_params, row_params, decimate, load_projection, is_live
+from chnn_data import CHUNK_ROWS, RING_SIZE, POLICIES, DECIMATE_METHODS, GRID
+from chnn_engine import ChunkPlayer
+
+AUDIO_DEVICE = 10
+AUDIO_HOST = 'asio'
+BUFFER_SIZE = 512
+LED_RATE = 30  # Launchpad grid refresh (Hz)
+LED_TRAIL = 4  # cells kept lit behind the current one
+
+"""
+ChNN data sonifier
+================================================================
+Plays a CSV or .npy dataset one row per note, with the chnn_scan
+voice (Blit, pixel envelope) and quad panner:
+
+    python chnn_datascan.py data.csv --pitch temp --x lon --y lat --rate 200
+    python chnn_datascan.py big.npy --pitch 0 --amp 3 --rate 4000
+    python chnn_datascan.py big.npy --pitch 0 --rate 50 --duration 120
+    python chnn_datascan.py survey.csv --pitch depth --project all --launchpad
+    sensor_feed | python chnn_datascan.py - --pitch 0 --x 1 --y 2
+    python chnn_datascan.py udp:9000 --pitch 0 --policy decimate
+
+================================================================
+- Columns are chosen by name (CSV header) or number and mapped to
+  pitch, harmonics, amplitude and X/Y quad position (chnn_data).
+- The file is read CHUNK_ROWS rows at a time (memory-mapped for
+  .npy) and streamed through two TableScans: one plays while the
+  next chunk is written, so memory stays bounded for any file size.
+- Column ranges come from one pass over the file, cached in
+  .chnn_cache next to it; replays start at once.
+- --duration reduces the file to rate x duration rows first (LTTB
+  or min-max buckets over the --by column, pitch by default), so
+  peaks survive at a speed the voice can play.
+- --project places rows by a 2-D PCA of the chosen columns instead
+  of x/y, quantized to the 8x8 field; --launchpad lights the cell of
+  the current row. The fitted projection is cached with the ranges.
+- Live sources (stdin '-', a named pipe or udp:[HOST:]PORT) are read
+  by a thread into a fixed-size lock-free ring buffer; each Metro
+  tick plays the next record, ranges adapt to the values seen.
+  When the feed is faster than --rate the --policy applies:
+  drop-oldest (stay current), decimate (thin out) or block.
+"""
+
+# 1. Feeder
+def feed(player, dataset, mapping, chunk_rows, indices=None, projection=None):
+    """Read, map and stage chunks until the file ends"""
+    try:
+        for params in iter_params(dataset, mapping, chunk_rows, indices, projection):
+            player.stage(params)
+    except Exception as e:
+        print(f"--- Feeder stopped: {e} ---")
+    finally:
+        player.finished = True
+
+# 2. Launchpad Grid
+def open_launchpad():
+    """Launchpad Mk1/S/Mini or Mk2 as (lp, mode), exits if none is connected"""
+    import launchpad_py as launchpad
+    lp = launchpad.Launchpad()
+    if lp.Check(0, "Mini") and lp.Open():
+        mode = "Mk1"
+    elif lp.Check(0, "Mk2"):
+        lp = launchpad.LaunchpadMk2()
+        mode = "Mk2" if lp.Open() else None
+    else:
+        mode = None
+    if mode is None:
+        exit("Launchpad not detected. Please connect device.")
+    print(f"--- System: Launchpad {mode} detected ---")
+    lp.Reset()
+    return lp, mode
+
+def lp_led_grid(lp, mode, x, y, r, g):
+    bid = y * 16 + x if mode == "Mk1" else (7 - y) * 10 + x + 11
+    if mode == "Mk2": lp.LedCtrlRaw(bid, int(r * 21), int(g * 21), 0)
+    else: lp.LedCtrl(bid, r, g)
+
+def led_loop(lp, mode, player, running):
+    """Light the grid cell of the current row with a fading trail (only MIDI writer)"""
+    trail = []
+    while running():
+        time.sleep(1.0 / LED_RATE)
+        params, row = player.current()
+        if params is None or 'cells' not in params: continue
+        cell = tuple(int(v) for v in params['cells'][min(row, len(params['cells']) - 1)])
+        if trail and trail[-1] == cell: continue
+        trail = [c for c in trail if c != cell] + [cell]
+        if len(trail) > LED_TRAIL + 1:
+            lp_led_grid(lp, mode, *trail.pop(0), 0, 0)
+        for i, (x, y) in enumerate(reversed(trail)):
+            level = 3 if i == 0 else max(1, 3 - i)
+            lp_led_grid(lp, mode, x, y, level if i else 0, level)
+    lp.Reset()
+
+# 3. Live Path
+class LivePlayer:
+    """Callback scan of a live feed: one record per Metro tick, popped from the ring"""
+    def __init__(self, ingest, mapping, row_time):
+        self.ingest, self.mapping = ingest, mapping
+        width = ingest.ring.width
+        self.lo, self.hi = np.full(width, np.inf), np.full(width, -np.inf)
+        self.env = Adsr(attack=0.002, decay=0.03, sustain=0.1, release=0.01, dur=0.05)
+        self.freq_ctrl, self.harm_ctrl = Sig(440), Sig(10)
+        self.pan_ctrl = Sig([0.25, 0.25, 0.25, 0.25])
+        self.wave = Blit(freq=[self.freq_ctrl, self.freq_ctrl*1.005], harms=self.harm_ctrl, mul=self.env).mix(1)
+        self.out = self.wave * self.pan_ctrl
+        self.metro = Metro(time=row_time)
+        self.trig = TrigFunc(self.metro, self.tick)
+        self.played = self.underruns = 0
+
+    def tick(self):
+        rec = self.ingest.ring.pop()
+        if rec is None:
+            self.underruns += 1
+            return
+        self.lo, self.hi = np.fmin(self.lo, rec), np.fmax(self.hi, rec)
+        p = row_params(rec[None], self.mapping, self.lo, self.hi)
+        self.pan_ctrl.value = p['gains'][0].tolist()
+        self.freq_ctrl.value = float(p['freq'][0])
+        self.harm_ctrl.value = float(p['harms'][0])
+        self.env.mul = float(p['amp'][0])
+        self.env.play()
+        self.played += 1
+
+    def done(self):
+        return self.ingest.closed and self.ingest.ring.fill() == 0
+
+def run_live(opts, mapping):
+    """Play a live source until it closes or Ctrl-C"""
+    try:
+        cols = {role: None if key is None else int(key) for role, key in mapping.items()}
+    except ValueError:
+        exit("Live sources have no header, give columns by number.")
+    width = opts.width or max([c for c in cols.values() if c is not None] + [0]) + 1
+    ingest = StreamIngest(opts.data, width, opts.ring, opts.policy).start()
+    player = LivePlayer(ingest, cols, 1.0 / opts.rate)
+    print(f"--- Live: {opts.data}, {width} columns, ring {opts.ring}, policy {opts.policy} ---")
+    return ingest, player
+
+# 4. Run
+def main():
+    parser = argparse.ArgumentParser(description="Sonify the rows of a CSV or .npy dataset")
+    parser.add_argument('data', help="CSV/TSV file (optional header), .npy array (rows x columns), "
+                                     "or a live source: '-' (stdin), a named pipe, udp:[HOST:]PORT")
+    parser.add_argument('--pitch', help="column mapped to pitch")
+    parser.add_argument('--harms', help="column mapped to Blit harmonics (timbre)")
+    parser.add_argument('--amp', help="column mapped to amplitude")
+    parser.add_argument('--x', help="column mapped to left/right position")
+    parser.add_argument('--y', help="column mapped to front/rear position")
+    parser.add_argument('--rate', type=float, default=100, help="rows per second")
+    parser.add_argument('--chunk', type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument('--duration', type=float, help="target length (s): decimate to rate x duration rows")
+    parser.add_argument('--decimate', choices=DECIMATE_METHODS, default='lttb', help="decimation method (--duration)")
+    parser.add_argument('--by', help="column whose shape the decimation keeps (default: --pitch)")
+    parser.add_argument('--project', help="place rows by a 2-D PCA of these columns (comma list or 'all') "
+                                          "quantized to the 8x8 grid, instead of --x/--y")
+    parser.add_argument('--launchpad', action='store_true', help="show the grid cell of the current row (--project)")
+    parser.add_argument('--width', type=int, help="live: columns per record (default: highest mapped + 1)")
+    parser.add_argument('--ring', type=int, default=RING_SIZE, help="live: ring buffer size (records)")
+    parser.add_argument('--policy', choices=POLICIES, default='drop-oldest', help="live: overflow policy")
+    parser.add_argument('--reverb', type=float, default=0.3, help="reverb mix 0..1")
+    parser.add_argument('--gain', type=float, default=6, help="master gain (dB)")
+    opts = parser.parse_args()
+
+    mapping = {role: getattr(opts, role) for role in ('pitch', 'harms', 'amp', 'x', 'y')}
+    live = is_live(opts.data)
+    if not live:
+        dataset = Dataset(opts.data)
+        for key in mapping.values(): dataset.column(key)  # fail early on a bad name
+        print(f"--- Dataset: {opts.data}, columns: {', '.join(dataset.columns)} ---")
+        dataset.stats()
+        indices, rows = None, dataset.rows
+        if rows == 0:
+            exit(f"{opts.data}: no rows to play.")
+        if opts.duration and opts.duration * opts.rate < dataset.rows:
+            if int(opts.duration * opts.rate) < 1:
+                exit(f"--duration {opts.duration:g}s at {opts.rate:g} rows/s leaves no rows to play.")
+            by = opts.by or opts.pitch or '0'
+            indices = decimate(dataset, by, int(opts.duration * opts.rate), opts.decimate)
+            rows = len(indices)
+            print(f"--- Decimated ({opts.decimate} on column {by}): {dataset.rows} -> {rows} rows ---")
+        print(f"--- Rows: {rows}, {rows / opts.rate:.1f}s at {opts.rate:g} rows/s ---")
+        projection = None
+        if opts.project:
+            columns = None if opts.project == 'all' else opts.project.split(',')
+            projection = load_projection(dataset, columns)
+            print(f"--- Projection: {len(projection.columns)} columns -> {GRID}x{GRID} grid ---")
+        launchpad = open_launchpad() if opts.launchpad and projection is not None else None
+    elif opts.project:
+        exit("--project needs a file, live sources cannot be fitted ahead.")
+
+    s = Server(sr=48000, nchnls=4, duplex=0, buffersize=BUFFER_SIZE, winhost=AUDIO_HOST)
+    s.setOutputDevice(AUDIO_DEVICE)
+    s.deactivateMidi()
+    s.boot().start()
+
+    if live:
+        ingest, player = run_live(opts, mapping)
+    else:
+        chunk_rows = min(opts.chunk, rows)
+        player = ChunkPlayer(chunk_rows, 1.0 / opts.rate)
+    reverb = Freeverb(player.out, size=0.8, damp=0.5, bal=opts.reverb)
+    comp = Compress(reverb, thresh=-20, ratio=4, risetime=0.01, falltime=0.1)
+    out = (comp * DBToA(opts.gain)).out()
+
+    if live:
+        player.metro.play()
+    else:
+        feeder = threading.Thread(target=feed, args=(player, dataset, mapping, chunk_rows, indices, projection), daemon=True)
+        feeder.start()
+        if launchpad:
+            leds_off = threading.Event()
+            running = lambda: not (leds_off.is_set() or player.done())
+            leds = threading.Thread(target=led_loop, args=(*launchpad, player, running), daemon=True)
+            leds.start()
+    try:
+        t0 = time.perf_counter()
+        while not player.done():
+            time.sleep(1.0)
+            if live:
+                st = ingest.stats()
+                print(f"--- In {st['in_rate']:.0f}/s, out {st['out_rate']:.0f}/s, lag {st['lag_s']:.2f}s "
+                      f"({st['fill']} queued), dropped {st['dropped']}, underruns {player.underruns} ---")
+                continue
+            sc = player.scans[player.active]
+            row = (player.played - 1) * chunk_rows + sc.position()
+            print(f"--- Row {max(row, 0)}/{rows}, {time.perf_counter() - t0:.0f}s, "
+                  f"underruns {player.underruns} ---")
+        time.sleep(0.5)  # last envelope and reverb tail
+    except KeyboardInterrupt: pass
+    finally:
+        if live: ingest.stop(); player.metro.stop()
+        else: player.stop()
+        if not live and launchpad:
+            leds_off.set()
+            leds.join(1.0)
+            launchpad[0].Close()
+        s.stop()
+        s.shutdown()
+        print("--- System Shutdown: Goodbye ---")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+import time, threading
+import numpy as np
+from pyo import *
+
+"""
+ChNN scan engine
+================================================================
+Audio-rate image scan shared by the ChNN scripts. The per-pixel
+parameter arrays from chnn_maps.pixel_params() are written into
+DataTables once, then read by a sample-accurate index:
+
+    Metro --> Counter --+--> head 0: TableIndex(order) --> freq/harms/amp/gains --> Blit
+      |                 +--> head 1: ...
+      +--> TrigEnv (pixel envelope, one per head)
+
+No Python runs per pixel; the GUI only polls the positions.
+Optional feature maps (chnn_maps.load_features) add edge accents,
+a contrast-driven lowpass sweep and a saliency reverb send, all
+read from tables as well.
+Heads come from a fixed pool of MAX_HEADS voices built once, idle
+heads are stopped so CPU grows linearly with the active ones.
+SpectralScan plays a whole column per step instead of a pixel,
+PaletteScan crossfades between pre-tuned palette voices.
+ChunkPlayer streams arbitrarily long row data through two
+TableScans, one playing while the next chunk is written.
+Pixel orders (row-major, serpentine, Hilbert, ...) come from
+chnn_maps.scan_order() and are just another table lookup.
+set_active(False) stops every audio object of an engine, so the
+engines not being listened to cost almost no CPU.
+Objects are created on instantiation, so boot a Server first.
+"""
+
+MAX_HEADS = 8
+ACCENT = 1.5  # envelope boost on edges
+SWEEP_MIN, SWEEP_MAX = 800, 14000  # lowpass cutoff from low to high local contrast
+
+# Envelope shape of the callback scan: Adsr(0.002, 0.03, 0.1, 0.01, dur=0.05)
+ENV_DUR = 0.05
+ENV_SIZE = 8192
+
+def make_env_table():
+    """Attack/decay/sustain/release shape as a LinTable lasting ENV_DUR"""
+    pts = [0.0, 0.002, 0.032, ENV_DUR - 0.01, ENV_DUR]
+    vals = [0.0, 1.0, 0.1, 0.1, 0.0]
+    return LinTable([(int(t / ENV_DUR * (ENV_SIZE - 1)), v) for t, v in zip(pts, vals)], size=ENV_SIZE)
+
+class ScanHead:
+    """One pooled scan voice reading its own slice of the order table"""
+    def __init__(self, scan):
+        self.offset = Sig(0)
+        self.pixel = TableIndex(scan.order_table, scan.count + self.offset)
+        self.freq = TableIndex(scan.freq_table, self.pixel)
+        self.harms = TableIndex(scan.harms_table, self.pixel)
+        self.amp = TableIndex(scan.amp_table, self.pixel)
+        self.gains = TableIndex(scan.gain_tables, self.pixel)
+        self.objs = [self.offset, self.pixel, self.freq, self.harms, self.amp, self.gains]
+        level = self.amp
+        if scan.features:
+            # Precomputed maps: edges accent the envelope, contrast sweeps a lowpass
+            self.edge = TableIndex(scan.edge_table, self.pixel, mul=ACCENT, add=1)
+            self.contrast = TableIndex(scan.contrast_table, self.pixel, mul=SWEEP_MAX - SWEEP_MIN, add=SWEEP_MIN)
+            self.saliency = TableIndex(scan.saliency_table, self.pixel)
+            level = self.amp * self.edge
+            self.objs += [self.edge, self.contrast, self.saliency, level]
+        # Every node is kept in objs (arithmetic results included), so stop() idles the whole head
+        self.env = TrigEnv(scan.metro, table=scan.env_table, dur=ENV_DUR, mul=level)
+        self.detune = self.freq * 1.005
+        self.blit = Blit(freq=[self.freq, self.detune], harms=self.harms, mul=self.env)
+        self.wave = self.blit.mix(1)
+        self.objs += [self.env, self.detune, self.blit, self.wave]
+        if scan.features:
+            cutoff = Port(self.contrast, 0.005, 0.02)
+            self.wave = Biquad(self.wave, freq=cutoff, q=1, type=0)
+            self.objs += [cutoff, self.wave]
+        self.out = self.wave * self.gains  # 4 channels, panned before the effects
+        self.objs.append(self.out)
+
+    def play(self):
+        for o in self.objs: o.play()
+
+    def stop(self):
+        for o in self.objs: o.stop()
+
+class TableScan:
+    """Sample-accurate pixel scan reading precomputed parameter tables"""
+    def __init__(self, params, pixel_time=0.01, orders=None, max_heads=MAX_HEADS, features=None, order_size=None):
+        n = len(params['freq'])
+        self.num_pixels = n
+        self.max_heads = max_heads
+        self.features = features is not None
+        if self.features:
+            self.edge_table = DataTable(size=n, init=features['edge'].tolist())
+            self.contrast_table = DataTable(size=n, init=features['contrast'].tolist())
+            self.saliency_table = DataTable(size=n, init=features['saliency'].tolist())
+        self.freq_table = DataTable(size=n, init=params['freq'].tolist())
+        self.harms_table = DataTable(size=n, init=params['harms'].tolist())
+        self.amp_table = DataTable(size=n, init=params['amp'].tolist())
+        self.gain_tables = [DataTable(size=n, init=params['gains'][:, c].tolist()) for c in range(4)]
+        # Flattened (heads, steps) pixel indices, sized for the largest orders
+        # set later (head_orders_size), 'spaced' heads need at most n + max_heads
+        size = max(order_size or n + max_heads, sum(len(o) for o in orders) if orders is not None else n)
+        self.order_table = DataTable(size=size, init=[0.0] * size)
+        self.env_table = make_env_table()
+
+        # Index stream: one Counter step per Metro trigger, both audio-rate
+        self.time = Sig(pixel_time)
+        self.metro = Metro(time=self.time)
+        self.count = Counter(self.metro, min=0, max=n)
+        self.end = Select(self.count, value=n - 1)
+
+        self.enabled = True  # False: every head idle (set_active)
+        self.heads = [ScanHead(self) for _ in range(max_heads)]
+        self.out = Mix([h.out for h in self.heads], voices=4)
+        # Mean saliency of the active heads, to drive a reverb send
+        self.send = Mix([h.saliency for h in self.heads], voices=1) if self.features else Sig(0)
+        self.set_orders(orders if orders is not None else [list(range(n))])
+
+    def set_orders(self, orders):
+        """Assign pixel orders (heads x steps) to the first heads, stop the others"""
+        orders = [[int(i) for i in o] for o in orders]
+        self.active, self.steps = len(orders), len(orders[0])
+        flat = [float(i) for o in orders for i in o]
+        if len(flat) > self.order_table.getSize():
+            raise ValueError(f"{len(flat)} order steps exceed the order table ({self.order_table.getSize()}), pass order_size")
+        self.order_table.replace(flat + [0.0] * (self.order_table.getSize() - len(flat)))
+        self.count.max = self.steps
+        self.end.value = self.steps - 1
+        self.orders = orders
+        self.out.mul = self.active ** -0.5
+        self.send.mul = 1.0 / self.active
+        for k, h in enumerate(self.heads):
+            h.offset.value = k * self.steps
+            if k < self.active and self.enabled: h.play()
+            else: h.stop()
+
+    def set_active(self, active):
+        """Run the active heads, or idle them all while another engine is playing"""
+        self.enabled = active
+        for k, h in enumerate(self.heads):
+            if k < self.active and active: h.play()
+            else: h.stop()
+
+    def play(self, delay=0):
+        """Start from the first step, `delay` seconds from now"""
+        self.count.reset()
+        self.metro.play(delay=delay)
+        return self
+
+    def stop(self):
+        self.metro.stop()
+        return self
+
+    def position(self):
+        """Current step of the scan, safe to poll from the GUI thread"""
+        return int(self.count.get())
+
+    def positions(self):
+        """Current pixel index of every active head"""
+        step = min(self.position(), self.steps - 1)
+        return [o[step] for o in self.orders]
+
+class SpectralScan:
+    """Column-wise additive scan: every column plays at once as a bank of partials
+
+    Amplitudes (W x H) live column-major in one DataTable; the Counter steps
+    through columns and one multi-stream Sine reads a whole column per step.
+    A Fader gates the bank, so it only sounds while scanning.
+    """
+    def __init__(self, freqs, amps, gains, col_time=0.25):
+        width, height = amps.shape
+        self.num_cols, self.num_rows = width, height
+        self.amp_table = DataTable(size=width * height, init=amps.ravel().tolist())
+        self.gain_tables = [DataTable(size=width, init=gains[:, c].tolist()) for c in range(4)]
+
+        self.time = Sig(col_time)
+        self.metro = Metro(time=self.time)
+        self.count = Counter(self.metro, min=0, max=width)
+        self.end = Select(self.count, value=width - 1)
+
+        self.index = Sig(self.count, mul=height, add=list(range(height)))  # one stream per row
+        self.rows = TableIndex(self.amp_table, self.index)
+        self.amps = Port(self.rows, 0.005, 0.005)
+        self.partials = Sine(freq=freqs.tolist(), mul=self.amps)
+        # Silent until play(), released by stop() (end of scan included)
+        self.gate = Fader(fadein=0.01, fadeout=0.05)
+        self.bank = Mix(self.partials, voices=1, mul=self.gate)
+        self.pan = TableIndex(self.gain_tables, self.count)
+        self.gains = Port(self.pan, 0.005, 0.005)
+        self.out = self.bank * self.gains
+        self.objs = [self.index, self.rows, self.amps, self.partials, self.bank, self.pan, self.gains, self.out]
+
+    def set_active(self, active):
+        """Run the bank, or idle it while another engine is playing"""
+        for o in self.objs:
+            if active: o.play()
+            else: o.stop()
+
+    def play(self):
+        self.count.reset()
+        self.metro.play()
+        self.gate.play()
+        return self
+
+    def stop(self):
+        self.metro.stop()
+        self.gate.stop()
+        return self
+
+    def position(self):
+        """Current column, safe to poll from the GUI thread"""
+        return int(self.count.get())
+
+class PaletteScan:
+    """Palette voice bank: one pre-tuned Blit per palette entry, the scan picks one
+
+    Voices never retune; each pixel step reads its palette index and the
+    matching voice's gate opens while the others close over `xfade` seconds.
+    """
+    def __init__(self, palette, gains, pixel_time=0.01, xfade=0.01, order=None):
+        n, k = len(palette['labels']), len(palette['freq'])
+        self.num_pixels = n
+        self.order_table = DataTable(size=n, init=[0.0] * n)
+        self.label_table = DataTable(size=n, init=palette['labels'].astype(float).tolist())
+        self.amp_table = DataTable(size=k, init=palette['amp'].tolist())
+        self.gain_tables = [DataTable(size=n, init=gains[:, c].tolist()) for c in range(4)]
+        self.env_table = make_env_table()
+
+        self.time = Sig(pixel_time)
+        self.metro = Metro(time=self.time)
+        self.count = Counter(self.metro, min=0, max=n)
+        self.end = Select(self.count, value=n - 1)
+
+        self.pixel = TableIndex(self.order_table, self.count)
+        self.label = TableIndex(self.label_table, self.pixel)
+        self.gates = Port(Compare(self.label, comp=list(range(k)), mode="=="), xfade, xfade)
+        freqs = palette['freq'].tolist()
+        self.voices = Blit(freq=freqs + [f * 1.005 for f in freqs], harms=palette['harms'].tolist() * 2,
+                           mul=[self.gates[i] for i in range(k)] * 2)
+        self.level = TableIndex(self.amp_table, self.label)
+        self.env = TrigEnv(self.metro, table=self.env_table, dur=ENV_DUR, mul=self.level)
+        self.mix = Mix(self.voices, voices=1, mul=self.env)
+        self.gains = TableIndex(self.gain_tables, self.pixel)
+        self.out = self.mix * self.gains
+        self.objs = [self.pixel, self.label, self.gates, self.voices, self.level, self.env, self.mix, self.gains, self.out]
+        self.set_order(order if order is not None else range(n))
+
+    def set_active(self, active):
+        """Run the voice bank, or idle it while another engine is playing"""
+        for o in self.objs:
+            if active: o.play()
+            else: o.stop()
+
+    def set_order(self, order):
+        """Replace the pixel visiting order (a permutation of the pixels)"""
+        self.order = [int(i) for i in order]
+        self.order_table.replace([float(i) for i in self.order])
+
+    def play(self):
+        self.count.reset()
+        self.metro.play()
+        return self
+
+    def stop(self):
+        self.metro.stop()
+        return self
+
+    def position(self):
+        """Current pixel index, safe to poll from the GUI thread"""
+        return self.order[min(int(self.count.get()), self.num_pixels - 1)]
+
+class ChunkPlayer:
+    """Gapless playback of a stream of parameter chunks through two TableScans
+
+    A feeder thread calls stage() with each chunk (pixel_params layout); it is
+    written into the idle scan and swapped in, in the audio thread, when the
+    active scan reaches its last step; the new scan starts one row later, so
+    the last row keeps its full row_time. stage() blocks while a chunk is already
+    waiting, so at most two chunks are ever held, and waits ENV_DUR after a
+    swap so the last envelope of the scan it overwrites has ended.
+    """
+    def __init__(self, chunk_rows, row_time=0.01):
+        self.chunk_rows = chunk_rows
+        blank = {'freq': np.full(chunk_rows, 440.0), 'harms': np.ones(chunk_rows),
+                 'amp': np.zeros(chunk_rows), 'gains': np.zeros((chunk_rows, 4))}
+        self.scans = [TableScan(blank, row_time, max_heads=1), TableScan(blank, row_time, max_heads=1)]
+        self.out = Mix([sc.out for sc in self.scans], voices=4)
+        self.ends = [TrigFunc(sc.end, self.on_boundary) for sc in self.scans]
+        self.lock = threading.Lock()
+        self.free = threading.Event()
+        self.free.set()
+        self.active, self.staged, self.idle = 0, False, True
+        self.swapped_at = 0.0  # perf_counter of the last swap, the stopped scan still rings for ENV_DUR
+        self.next_at = 0.0     # perf_counter the next chunk is due (the last row has ended)
+        self.finished = False  # set by the feeder after its last chunk
+        self.params = [None, None]  # chunk held by each scan, for the displays
+        self.played = self.underruns = 0
+
+    def set_time(self, row_time):
+        for sc in self.scans: sc.time.value = row_time
+
+    def stage(self, params):
+        """Write the next chunk into the idle scan (feeder thread), blocks until there is room"""
+        self.free.wait()
+        ring = self.swapped_at + ENV_DUR - time.perf_counter()
+        if ring > 0: time.sleep(ring)
+        n = len(params['freq'])
+        pad = [0.0] * (self.chunk_rows - n)
+        scan = self.scans[1 - self.active]
+        scan.freq_table.replace(np.asarray(params['freq'], dtype=float).tolist() + pad)
+        scan.harms_table.replace(np.asarray(params['harms'], dtype=float).tolist() + pad)
+        scan.amp_table.replace(np.asarray(params['amp'], dtype=float).tolist() + pad)
+        for c in range(4): scan.gain_tables[c].replace(np.asarray(params['gains'][:, c], dtype=float).tolist() + pad)
+        scan.set_orders([range(n)])
+        self.params[1 - self.active] = params
+        with self.lock:
+            self.free.clear()
+            self.staged = True
+            if self.idle:  # nothing playing (start or underrun): swap now
+                self._swap()
+
+    def _swap(self):
+        self.scans[self.active].stop()
+        self.swapped_at = time.perf_counter()
+        if self.staged:
+            self.active = 1 - self.active
+            self.staged, self.idle = False, False
+            self.played += 1
+            self.scans[self.active].play(delay=max(self.next_at - self.swapped_at, 0))
+            self.free.set()
+        else:
+            self.idle = True
+
+    def on_boundary(self):
+        """Audio thread, last row of the active chunk starts: swap in the next one, never wait"""
+        with self.lock:
+            self.next_at = time.perf_counter() + self.scans[self.active].time.value
+            if not self.staged and not self.finished: self.underruns += 1
+            self._swap()
+
+    def current(self):
+        """(chunk params, row) playing now, safe to poll from another thread"""
+        k = self.active
+        return self.params[k], self.scans[k].position()
+
+    def done(self):
+        """True once the feeder is finished and the last chunk has played"""
+        return self.finished and self.idle and not self.staged
+
+    def stop(self):
+        for sc in self.scans: sc.stop()
@@ -0,0 +1,187 @@
+import os, time, argparse, threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pyo import *
+from chnn_maps import ImagePyramid, pixel_params
+from chnn_engine import TableScan, ENV_DUR
+
+AUDIO_DEVICE = 10
+AUDIO_HOST = 'asio'
+BUFFER_SIZE = 512
+
+"""
+ChNN frame sequence
+================================================================
+Scans a folder of frames (e.g. a timelapse exported as JPEG/PNG)
+one after the other with the chnn_scan audio-rate engine.
+
+    python chnn_frames.py frames/ --rate 4096 --prefetch 8
+
+================================================================
+- Worker processes decode, resize and map the next PREFETCH frames
+  into shared memory slots, the scan never waits on I/O.
+- Two TableScans play in turn: while one scans, the next frame is
+  written into the other's tables; the swap happens in one audio
+  callback when the last pixel starts, and the next frame starts one
+  pixel time later.
+- A frame not ready at its boundary counts as late (the current
+  frame is scanned again); frames that arrive after their turn
+  are dropped to keep the schedule.
+"""
+
+IMAGE_EXT = ('.jpg', '.jpeg', '.png', '.tif', '.tiff', '.bmp')
+FIELDS = 7  # freq, harms, amp, 4 gains
+
+# 1. Decode Workers (shared memory slots)
+worker_shm = None
+
+def init_worker(shm_name):
+    global worker_shm
+    worker_shm = shared_memory.SharedMemory(name=shm_name)
+
+def decode_frame(path, slot, slots, size):
+    """Decode and map one frame into its shared memory slot"""
+    n = size[0] * size[1]
+    pixels = np.asarray(ImagePyramid(path).tile(None, size), dtype=np.uint8)
+    params = pixel_params(pixels)
+    view = np.ndarray((slots, n, FIELDS), dtype=np.float32, buffer=worker_shm.buf)
+    view[slot, :, 0], view[slot, :, 1], view[slot, :, 2] = params['freq'], params['harms'], params['amp']
+    view[slot, :, 3:] = params['gains']
+    return slot
+
+# 2. Frame Player
+class FramePlayer:
+    """Ping-pong TableScans fed by a prefetching process pool"""
+    def __init__(self, frames, size, pixel_time, prefetch, loop):
+        self.frames, self.size, self.loop = frames, size, loop
+        n = size[0] * size[1]
+        self.slots = prefetch
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * n * FIELDS * 4)
+        self.view = np.ndarray((self.slots, n, FIELDS), dtype=np.float32, buffer=self.shm.buf)
+        self.pool = ProcessPoolExecutor(max_workers=min(prefetch, os.cpu_count()),
+                                        initializer=init_worker, initargs=(self.shm.name,))
+
+        blank = {'freq': np.full(n, 440.0), 'harms': np.ones(n), 'amp': np.zeros(n), 'gains': np.zeros((n, 4))}
+        self.scans = [TableScan(blank, pixel_time, max_heads=1), TableScan(blank, pixel_time, max_heads=1)]
+        self.out = Mix([sc.out for sc in self.scans], voices=4)
+        self.ends = [TrigFunc(sc.end, self.on_boundary) for sc in self.scans]
+        self.active = 0
+        self.staged = None  # frame index written into the idle scan, set by the loader
+        self.swapped_at = 0.0
+        self.played = self.late = self.dropped = self.decoded = 0
+        self.running = True
+
+    def load_tables(self, scan, slot):
+        """Copy a shared memory slot into a scan's tables (idle scan only)"""
+        data = self.view[slot]
+        scan.freq_table.replace(data[:, 0].tolist())
+        scan.harms_table.replace(data[:, 1].tolist())
+        scan.amp_table.replace(data[:, 2].tolist())
+        for c in range(4): scan.gain_tables[c].replace(data[:, 3 + c].tolist())
+
+    def loader(self):
+        """Keep `slots` frames in flight, stage the next one into the idle scan"""
+        pending, submitted = {}, 0
+        free = list(range(self.slots))
+        while self.running:
+            while free and (self.loop or submitted < len(self.frames)):
+                slot = free.pop()
+                path = self.frames[submitted % len(self.frames)]
+                pending[submitted] = (slot, self.pool.submit(decode_frame, path, slot, self.slots, self.size))
+                submitted += 1
+            if not pending:
+                break
+            k = min(pending)
+            slot, fut = pending[k]
+            if not fut.done() or self.staged is not None or time.perf_counter() - self.swapped_at < ENV_DUR:
+                time.sleep(0.002)
+                continue
+            del pending[k]
+            free.append(slot)
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"--- Frame {k}: decode failed ({e}) ---")
+                self.dropped += 1
+                continue
+            self.decoded += 1
+            if k < self.played + self.late:
+                self.dropped += 1  # frame k was due at boundary k, already passed
+                continue
+            self.load_tables(self.scans[1 - self.active], slot)
+            self.staged = k
+
+    def on_boundary(self):
+        """Audio thread, last pixel of the active frame starts: swap or repeat, never wait"""
+        self.advance(self.scans[self.active].time.value)
+
+    def advance(self, delay):
+        """Stop the active scan, start the staged frame (or repeat) `delay` seconds later"""
+        current = self.scans[self.active]
+        current.stop()
+        if self.staged is not None:
+            self.active = 1 - self.active
+            self.staged = None
+            self.played += 1
+            self.swapped_at = time.perf_counter()
+        else:
+            self.late += 1
+        self.scans[self.active].play(delay)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.loader, daemon=True)
+        self.thread.start()
+        while self.staged is None and self.thread.is_alive(): time.sleep(0.01)
+        self.advance(0)  # first frame
+
+    def stop(self):
+        self.running = False
+        for sc in self.scans: sc.stop()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.shm.close()
+        self.shm.unlink()
+
+# 3. Run
+def main():
+    parser = argparse.ArgumentParser(description="Scan a folder of frames continuously")
+    parser.add_argument('frames', help="folder of frames, played in name order")
+    parser.add_argument('--size', type=int, default=64, help="scan raster side (pixels)")
+    parser.add_argument('--rate', type=float, default=4096, help="pixels per second")
+    parser.add_argument('--prefetch', type=int, default=8, help="frames decoded ahead")
+    parser.add_argument('--no-loop', action='store_true', help="stop after the last frame")
+    parser.add_argument('--gain', type=float, default=6, help="master gain (dB)")
+    opts = parser.parse_args()
+
+    frames = sorted(os.path.join(opts.frames, f) for f in os.listdir(opts.frames) if f.lower().endswith(IMAGE_EXT))
+    if not frames: exit("No frames found.")
+    print(f"--- Frames: {len(frames)} in {opts.frames} ---")
+
+    s = Server(sr=48000, nchnls=4, duplex=0, buffersize=BUFFER_SIZE, winhost=AUDIO_HOST)
+    s.setOutputDevice(AUDIO_DEVICE)
+    s.deactivateMidi()
+    s.boot().start()
+
+    player = FramePlayer(frames, (opts.size, opts.size), 1.0 / opts.rate, opts.prefetch, not opts.no_loop)
+    reverb = Freeverb(player.out, size=0.8, damp=0.5, bal=0.3)
+    comp = Compress(reverb, thresh=-20, ratio=4, risetime=0.01, falltime=0.1)
+    out = (comp * DBToA(opts.gain)).out()
+    player.start()
+
+    try:
+        t0 = time.perf_counter()
+        while player.thread.is_alive() or player.staged is not None:
+            time.sleep(2.0)
+            el = time.perf_counter() - t0
+            print(f"--- Played {player.played}, late {player.late}, dropped {player.dropped}, "
+                  f"decoded {player.decoded / el:.1f} fps ---")
+        time.sleep(opts.size * opts.size / opts.rate)  # last frame
+    except KeyboardInterrupt: pass
+    finally:
+        player.stop()
+        s.stop()
+        s.shutdown()
+        print("--- System Shutdown: Goodbye ---")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,543 @@
+import os, json, wave, shutil, hashlib, tempfile
+from functools import lru_cache
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+
+"""
+ChNN image maps
+================================================================
+Image loading and pixel-to-parameter mapping shared by the ChNN
+sonifier scripts. Everything here is plain NumPy/PIL: no audio
+server, no GUI, so it can be imported from any process.
+
+================================================================
+Auditory display (one row per pixel, row-major; scan orders such as
+serpentine or Hilbert are index permutations over these rows):
+- freq:  grayscale -> MIDI 0..127 -> Hz
+- harms: RGB ratio -> number of Blit harmonics
+- amp:   grayscale -> envelope level (0..0.2)
+- gains: X/Y -> [FL, FR, RL, RR] quad gains
+
+Palette voices: median-cut palette of the raster, each pixel is
+mapped to the nearest entry and plays that entry's voice.
+
+Feature maps (per raster pixel, 0..1): Sobel edge magnitude, local
+contrast and center-surround saliency, computed once on a finer
+pyramid level (or the scan level, down to the source) tile by tile and
+pooled to the raster.
+
+Column spectra (one partial per row, one step per column):
+- row -> log-spaced frequency (top row highest)
+- brightness -> partial amplitude, column X -> left/right pan
+"""
+
+# 1. Image Loading
+# Archive scans are 50-200 MP and trusted, lift PIL's decompression bomb guard
+Image.MAX_IMAGE_PIXELS = None
+MAX_LEVEL_SIDE = 4096  # largest pyramid level decoded whole, finer levels are tiled
+MIN_LEVEL_SIDE = 64    # coarsest pyramid level
+TILE_SIDE = 1024       # tile side (level pixels) of the tiled levels
+DECODE_BUDGET = 1 << 26  # most pixels one unstriped decode may produce, finer JPEG levels are clamped
+
+class ImagePyramid:
+    """Multi-resolution view of a large image, levels decoded on demand
+
+    Level 0 is the source resolution, level k is 1/2**k of it. A level is
+    decoded with JPEG draft mode (DCT-domain 1/2, 1/4, 1/8 scaling), so a
+    200 MP scan is never fully decoded unless asked for. Levels up to
+    max_side are decoded whole and LRU-cached; finer levels, down to the
+    native resolution, are only read over the requested region, in
+    TILE_SIDE tiles kept in an LRU. Striped/tiled files (TIFF) decode only
+    the strips under the region. A JPEG has no strips: any region decodes
+    the whole frame at the draft scale of the level, so levels whose draft
+    decode exceeds DECODE_BUDGET pixels are refused and clamped to the
+    finest level within it (`finest`; level 1 of a 200 MP scan).
+    """
+    def __init__(self, img_path, max_side=MAX_LEVEL_SIDE, cached_levels=2, cached_tiles=32):
+        self.path = img_path
+        self.cached_levels, self.cached_tiles = cached_levels, cached_tiles
+        with Image.open(img_path) as img:  # header only
+            self.size = img.size
+            whole_frame = img.format == 'JPEG' and len(img.tile) <= 1
+        w, h = self.size
+        self.levels = [(w, h)]
+        while max(self.levels[-1]) > MIN_LEVEL_SIDE:
+            k = len(self.levels)
+            self.levels.append((max(1, -(-w >> k)), max(1, -(-h >> k))))
+        self.whole = next((k for k, lv in enumerate(self.levels) if max(lv) <= max_side), len(self.levels) - 1)
+        # Draft decodes scale by at most 1/8 per side
+        self.finest = next((k for k in range(self.whole) if (w >> min(k, 3)) * (h >> min(k, 3)) <= DECODE_BUDGET),
+                           self.whole) if whole_frame else 0
+        self._cache = OrderedDict()
+        self._tiles = OrderedDict()
+
+    def _open(self, k, box=None):
+        """File opened at the draft scale of level k, only the strips under box (level pixels) loaded"""
+        img = Image.open(self.path)
+        img.draft('RGB', self.levels[k])
+        if box is not None and len(img.tile) > 1 and img.size == self.size:
+            sx, sy = self.size[0] / self.levels[k][0], self.size[1] / self.levels[k][1]
+            x0, y0, x1, y1 = box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy
+            img.tile = [t for t in img.tile if t[1][0] < x1 and t[1][2] > x0 and t[1][1] < y1 and t[1][3] > y0]
+        return img
+
+    def clamp(self, k):
+        """Level k limited to the levels this file can decode within budget"""
+        if k < self.finest:
+            print(f"--- Level {k} would decode {self.size[0]}x{self.size[1]} px whole, using level {self.finest} ---")
+        return min(max(k, self.finest), len(self.levels) - 1)
+
+    def level(self, k):
+        """Decoded level k (k >= whole) as H x W x 3 uint8, LRU-cached"""
+        k = min(max(k, self.whole), len(self.levels) - 1)
+        if k in self._cache:
+            self._cache.move_to_end(k)
+            return self._cache[k]
+        lw, lh = self.levels[k]
+        with self._open(k) as img:
+            img = img.convert('RGB')
+            if img.size != (lw, lh):
+                img = img.resize((lw, lh), Image.BOX)
+            arr = np.asarray(img, dtype=np.uint8)
+        self._cache[k] = arr
+        while len(self._cache) > self.cached_levels:
+            self._cache.popitem(last=False)
+        return arr
+
+    def region(self, k, box):
+        """Pixels of level k (k >= finest) over box (x0, y0, x1, y1, level pixels) as H x W x 3 uint8"""
+        x0, y0, x1, y1 = box
+        if k >= self.whole:
+            return self.level(k)[y0:y1, x0:x1]
+        t, (lw, lh) = TILE_SIDE, self.levels[k]
+        keys = [(k, tx, ty) for ty in range(y0 // t, (y1 - 1) // t + 1) for tx in range(x0 // t, (x1 - 1) // t + 1)]
+        missing = [key for key in keys if key not in self._tiles]
+        if missing:
+            span = (min(key[1] for key in missing) * t, min(key[2] for key in missing) * t,
+                    min((max(key[1] for key in missing) + 1) * t, lw), min((max(key[2] for key in missing) + 1) * t, lh))
+            with self._open(k, span) as img:
+                fx, fy = img.size[0] / lw, img.size[1] / lh
+                for key in missing:
+                    tb = (key[1] * t, key[2] * t, min((key[1] + 1) * t, lw), min((key[2] + 1) * t, lh))
+                    tile = img.crop((round(tb[0] * fx), round(tb[1] * fy), round(tb[2] * fx), round(tb[3] * fy))).convert('RGB')
+                    if tile.size != (tb[2] - tb[0], tb[3] - tb[1]):
+                        tile = tile.resize((tb[2] - tb[0], tb[3] - tb[1]), Image.BOX)
+                    self._tiles[key] = np.asarray(tile, dtype=np.uint8)
+        out = np.empty((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        for key in keys:
+            self._tiles.move_to_end(key)
+            tx, ty = key[1] * t, key[2] * t
+            a = self._tiles[key]
+            ax0, ay0 = max(x0, tx), max(y0, ty)
+            ax1, ay1 = min(x1, tx + a.shape[1]), min(y1, ty + a.shape[0])
+            out[ay0 - y0:ay1 - y0, ax0 - x0:ax1 - x0] = a[ay0 - ty:ay1 - ty, ax0 - tx:ax1 - tx]
+        while len(self._tiles) > max(self.cached_tiles, len(keys)):
+            self._tiles.popitem(last=False)
+        return out
+
+    def level_for(self, size, box=None):
+        """Coarsest level that still gives `size` pixels over `box`"""
+        x0, y0, x1, y1 = box or (0, 0) + self.size
+        bw, bh = x1 - x0, y1 - y0
+        k = len(self.levels) - 1
+        while k > self.finest and (bw >> k < size[0] or bh >> k < size[1]):
+            k -= 1
+        return k
+
+    def tile(self, box=None, size=(64, 64), level=None):
+        """Resample a box in source pixels to `size`, returns a PIL image"""
+        box = box or (0, 0) + self.size
+        k = self.level_for(size, box) if level is None else self.clamp(level)
+        return Image.fromarray(self.region(k, self.level_box(k, box))).resize(size)
+
+    def level_box(self, k, box):
+        """Box in source pixels mapped to level k pixels, at least one pixel"""
+        lw, lh = self.levels[k]
+        sx, sy = lw / self.size[0], lh / self.size[1]
+        x0, y0 = min(int(box[0] * sx), lw - 1), min(int(box[1] * sy), lh - 1)
+        return x0, y0, min(max(x0 + 1, int(round(box[2] * sx))), lw), min(max(y0 + 1, int(round(box[3] * sy))), lh)
+
+def load_image_data(img_path, size=(64, 64), display_size=(400, 400), region=None, level=None):
+    """Load the scan raster (H x W x 3 uint8) and the display image
+
+    region: (left, top, right, bottom) in source pixels, None = whole image
+    level:  pyramid level to scan from, None = coarsest adequate level
+    """
+    pyramid = ImagePyramid(img_path)
+    pixels = np.asarray(pyramid.tile(region, size, level), dtype=np.uint8)
+    img_display = pyramid.tile(region, display_size)
+    return pixels, size[0], size[1], img_display
+
+# 2. Pixel Parameters
+def midi_to_hz(midi):
+    """Vectorized pyo midiToHz"""
+    return 440.0 * np.power(2.0, (np.asarray(midi, dtype=np.float64) - 69.0) / 12.0)
+
+def quad_gains(x_idx, y_idx, width, height):
+    """Quad gains [FL, FR, RL, RR] for pixel coordinates, shape (..., 4)"""
+    f_gain = 1.0 - (y_idx / (height - 1)) if height > 1 else np.ones_like(y_idx, dtype=np.float64)
+    r_side = x_idx / (width - 1) if width > 1 else np.full_like(x_idx, 0.5, dtype=np.float64)
+    l_side, r_gain = 1.0 - r_side, 1.0 - f_gain
+    return np.stack([l_side * f_gain, r_side * f_gain, l_side * r_gain, r_side * r_gain], axis=-1)
+
+def pixel_params(pixels):
+    """Precompute freq, harms, amp and quad gains for every pixel, in scan order"""
+    height, width = pixels.shape[:2]
+    rgb = pixels.reshape(-1, 3).astype(np.float64)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    gray = 0.299*r + 0.587*g + 0.114*b
+    total = r + g + b + 1
+    idx = np.arange(width * height)
+    return {
+        'freq': midi_to_hz((gray / 255.0) * 127.0).astype(np.float32),
+        'harms': np.maximum(1, (r/total)*45 + (g/total)*20 + (b/total)*5).astype(np.float32),
+        'amp': ((gray / 255.0) * 0.2).astype(np.float32),
+        'gains': quad_gains(idx % width, idx // width, width, height).astype(np.float32),
+    }
+
+# 3. Scan Orders & Heads
+SCAN_ORDERS = ['rowmajor', 'serpentine', 'hilbert', 'morton', 'spiral', 'random']
+
+def _hilbert_d2xy(n, d):
+    """Hilbert curve index -> (x, y) on an n x n grid (n power of two), vectorized"""
+    x, y = np.zeros_like(d), np.zeros_like(d)
+    t, s = d.copy(), 1
+    while s < n:
+        rx = 1 & (t // 2)
+        ry = 1 & (t ^ rx)
+        # Rotate the quadrant
+        flip = (ry == 0) & (rx == 1)
+        x, y = np.where(flip, s - 1 - x, x), np.where(flip, s - 1 - y, y)
+        swap = ry == 0
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        x, y = x + s * rx, y + s * ry
+        t //= 4
+        s *= 2
+    return x, y
+
+def _spread_bits(v):
+    """Insert a zero bit between the bits of v (Morton helper)"""
+    v = v.astype(np.uint64)
+    out = np.zeros_like(v)
+    for b in range(32):
+        out |= ((v >> np.uint64(b)) & np.uint64(1)) << np.uint64(2 * b)
+    return out
+
+@lru_cache(maxsize=32)
+def _scan_order(name, width, height, seed):
+    n = width * height
+    idx = np.arange(n, dtype=np.int64)
+    x, y = idx % width, idx // width
+    if name == 'rowmajor':
+        order = idx
+    elif name == 'serpentine':
+        order = np.where(y % 2 == 1, y * width + (width - 1 - x), idx)
+    elif name == 'hilbert':
+        side = 1 << max(0, int(np.ceil(np.log2(max(width, height)))))
+        hx, hy = _hilbert_d2xy(side, np.arange(side * side, dtype=np.int64))
+        inside = (hx < width) & (hy < height)
+        order = hy[inside] * width + hx[inside]
+    elif name == 'morton':
+        order = np.argsort(_spread_bits(x) | (_spread_bits(y) << np.uint64(1)), kind='stable')
+    elif name == 'spiral':
+        # Clockwise from the outer ring inwards: sort by ring, then by position on the ring
+        ring = np.minimum.reduce([x, y, width - 1 - x, height - 1 - y])
+        w, h = width - 2 * ring, height - 2 * ring
+        rx, ry = x - ring, y - ring
+        pos = np.select([ry == 0, rx == w - 1, ry == h - 1],
+                        [rx, (w - 1) + ry, 2 * (w - 1) + (h - 1) - rx],
+                        2 * (w - 1) + 2 * (h - 1) - ry)
+        order = np.lexsort((pos, ring))
+    elif name == 'random':
+        order = np.random.default_rng(seed).permutation(n)
+    else:
+        raise ValueError(f"Unknown scan order: {name}")
+    order = order.astype(np.int32)
+    order.flags.writeable = False
+    return order
+
+def scan_order(name, width, height, seed=0):
+    """Pixel index permutation for a scan order, cached per raster size"""
+    return _scan_order(name, width, height, seed)
+
+def _head_tiles(width, height, heads):
+    """Row and column edges of the 'tiles' layout, rows x cols = heads"""
+    rows = max(d for d in range(1, int(heads ** 0.5) + 1) if heads % d == 0)
+    cols = heads // rows
+    return np.linspace(0, height, rows + 1).astype(int), np.linspace(0, width, cols + 1).astype(int)
+
+def head_orders_size(width, height, max_heads):
+    """Largest flattened head_orders() length for up to max_heads heads, any layout"""
+    n = width * height
+    size = 0
+    for heads in range(1, max_heads + 1):
+        dy, dx = (np.diff(e) for e in _head_tiles(width, height, heads))
+        tiles = np.count_nonzero(dy) * np.count_nonzero(dx) * int(dy.max()) * int(dx.max())
+        size = max(size, heads * -(-n // heads), tiles)
+    return size
+
+def head_orders(width, height, heads=1, layout='spaced', order='rowmajor', seed=0):
+    """Pixel indices read by each scan head, shape (heads, steps)
+
+    layout 'spaced': heads start evenly along the scan order
+    layout 'tiles':  raster split in rows x cols blocks (4 heads = quadrants),
+                     each head scans its block in the scan order
+    Heads with fewer pixels than `steps` repeat their first pixels.
+    """
+    n = width * height
+    if layout == 'spaced':
+        steps = -(-n // heads)
+        perm = scan_order(order, width, height, seed)
+        return perm[(np.arange(heads)[:, None] * steps + np.arange(steps)[None, :]) % n]
+
+    ys, xs = _head_tiles(width, height, heads)
+    rows, cols = len(ys) - 1, len(xs) - 1
+    blocks = []
+    for r in range(rows):
+        for c in range(cols):
+            bw, bh = xs[c + 1] - xs[c], ys[r + 1] - ys[r]
+            if bw * bh == 0: continue
+            local = scan_order(order, bw, bh, seed)
+            blocks.append((ys[r] + local // bw) * width + xs[c] + local % bw)
+    steps = max(len(b) for b in blocks)
+    return np.stack([np.resize(b, steps) for b in blocks]).astype(np.int32)
+
+# 4. Disk Cache
+# Entries live next to the image in CACHE_DIR/<content digest>_<params digest>/,
+# one .npy per array, memory-mapped on load. A changed file gets a new digest
+# and its stale entries are removed.
+CACHE_DIR = '.chnn_cache'
+CACHE_VERSION = 2  # bump when a mapping changes
+
+def _cache_root(img_path, cache_dir=None):
+    return cache_dir or os.path.join(os.path.dirname(os.path.abspath(img_path)), CACHE_DIR)
+
+def file_digest(img_path, cache_dir=None):
+    """SHA-1 of the file content, memoized by path, size and mtime"""
+    root = _cache_root(img_path, cache_dir)
+    index_path = os.path.join(root, 'digests.json')
+    apath, st = os.path.abspath(img_path), os.stat(img_path)
+    try:
+        with open(index_path) as f: index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    known = index.get(apath)
+    if known and known[:2] == [st.st_size, st.st_mtime_ns]:
+        return known[2]
+
+    h = hashlib.sha1()
+    with open(img_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''): h.update(chunk)
+    digest = h.hexdigest()
+
+    # Content changed: drop the entries of the old digest
+    os.makedirs(root, exist_ok=True)
+    if known and known[2] != digest:
+        for name in os.listdir(root):
+            if name.startswith(known[2][:16] + '_'):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    index[apath] = [st.st_size, st.st_mtime_ns, digest]
+    fd, tmp = tempfile.mkstemp(dir=root, suffix='.json')
+    with os.fdopen(fd, 'w') as f: json.dump(index, f)
+    os.replace(tmp, index_path)
+    return digest
+
+def cached_arrays(img_path, parts, compute, cache_dir=None):
+    """Arrays for (file content, parts) from the cache, or compute() and store
+
+    compute() returns a dict of name -> array. Hits are memory-mapped read-only.
+    """
+    root = _cache_root(img_path, cache_dir)
+    digest = file_digest(img_path, cache_dir)
+    p_digest = hashlib.sha1(repr((CACHE_VERSION,) + tuple(parts)).encode()).hexdigest()
+    entry = os.path.join(root, f"{digest[:16]}_{p_digest[:12]}")
+    if os.path.isdir(entry):
+        try:
+            return {n[:-4]: np.load(os.path.join(entry, n), mmap_mode='r')
+                    for n in os.listdir(entry) if n.endswith('.npy')}
+        except (OSError, ValueError):
+            shutil.rmtree(entry, ignore_errors=True)
+
+    arrays = compute()
+    tmp = tempfile.mkdtemp(dir=root)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(arr))
+    try:
+        os.replace(tmp, entry)  # atomic publish, another process may have won
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return arrays
+
+def load_cached(img_path, size=(64, 64), display_size=(400, 400), region=None, level=None, cache_dir=None):
+    """load_image_data() and pixel_params() through the disk cache"""
+    def compute():
+        pixels, _, _, img_display = load_image_data(img_path, size, display_size, region, level)
+        arrays = pixel_params(pixels)
+        arrays['raster'], arrays['display'] = pixels, np.asarray(img_display, dtype=np.uint8)
+        return arrays
+
+    arrays = cached_arrays(img_path, ('scan', size, display_size, region, level), compute, cache_dir)
+    pixels = arrays.pop('raster')
+    img_display = Image.fromarray(np.asarray(arrays.pop('display')))
+    return pixels, size[0], size[1], img_display, arrays
+
+# 5. Column Spectra
+SPECTRAL_FMIN, SPECTRAL_FMAX = 55.0, 7040.0
+SPECTRAL_GAIN = 0.5  # overall level of a fully white column
+
+def column_spectra(pixels, f_min=SPECTRAL_FMIN, f_max=SPECTRAL_FMAX):
+    """Partial frequencies (H,), amplitudes (W, H) and quad gains (W, 4) per column"""
+    height, width = pixels.shape[:2]
+    gray = pixels.reshape(height, width, 3).astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    freqs = np.geomspace(f_max, f_min, height).astype(np.float32)
+    amps = (gray.T / 255.0) * (SPECTRAL_GAIN / np.sqrt(height))
+    cols = np.arange(width)
+    gains = quad_gains(cols, np.full(width, 0.5 * (height - 1)), width, height).astype(np.float32)
+    return freqs, amps.astype(np.float32), gains
+
+def iter_spectral_render(freqs, amps, gains, col_time, sr=48000, chunk=256):
+    """Inverse-FFT overlap-add render of the column spectra, yields (samples, 4) blocks
+
+    Each column is one Hann frame of 2*hop samples (hop = col_time), partials
+    sit on the nearest FFT bin with phase continued from frame to frame.
+    Columns are processed `chunk` at a time, so memory does not depend on
+    the image width.
+    """
+    hop = max(1, int(round(col_time * sr)))
+    n_fft = 2 * hop
+    n_bins = n_fft // 2 + 1
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)  # periodic Hann sums to 1 at 50% overlap
+    bins = np.clip(np.round(np.asarray(freqs) * n_fft / sr).astype(int), 1, n_bins - 1)
+    to_bins = np.zeros((len(bins), n_bins), dtype=np.float32)
+    to_bins[np.arange(len(bins)), bins] = n_fft / 2.0  # irfft scale for unit amplitude
+    k = np.arange(n_bins)
+
+    carry = np.zeros((hop, 4), dtype=np.float32)
+    width = len(amps)
+    for c0 in range(0, width, chunk):
+        a = np.asarray(amps[c0:c0 + chunk], dtype=np.float32)
+        n = len(a)
+        phase = np.pi * np.outer(np.arange(c0, c0 + n), k)  # bin k advances k*pi per hop
+        frames = np.fft.irfft((a @ to_bins) * np.exp(1j * phase), n=n_fft, axis=1).astype(np.float32) * window
+        out = np.zeros(((n + 1) * hop, 4), dtype=np.float32)
+        out[:hop] += carry
+        g = np.asarray(gains[c0:c0 + n], dtype=np.float32)
+        for j in range(n):
+            out[j * hop:(j + 2) * hop] += frames[j][:, None] * g[j]
+        carry = out[n * hop:].copy()
+        yield out[:n * hop]
+    yield carry
+
+def write_wav(path, blocks, sr=48000, nchnls=4):
+    """Stream float blocks (samples, nchnls) in -1..1 to a 16-bit WAV file"""
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(nchnls)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        frames = 0
+        for block in blocks:
+            w.writeframes((np.clip(block, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+            frames += len(block)
+    return frames / sr
+
+# 6. Palette Quantization
+PALETTE_SIZE = 16
+
+def median_cut(pixels, k=PALETTE_SIZE):
+    """Median-cut palette (k x 3 uint8) and per-pixel palette index in scan order"""
+    rgb = pixels.reshape(-1, 3)
+    boxes = [np.arange(len(rgb))]
+    while len(boxes) < k:
+        # Split the box with the widest channel range at its median
+        ranges = [np.ptp(rgb[b], axis=0) if len(b) > 1 else np.zeros(3) for b in boxes]
+        i = int(np.argmax([r.max() for r in ranges]))
+        if ranges[i].max() == 0: break
+        box, ch = boxes.pop(i), int(np.argmax(ranges[i]))
+        box = box[np.argsort(rgb[box, ch], kind='stable')]
+        boxes += [box[:len(box) // 2], box[len(box) // 2:]]
+    palette = np.array([rgb[b].mean(axis=0) for b in boxes])
+    return palette.round().astype(np.uint8), palette_labels(rgb, palette)
+
+def palette_labels(rgb, palette, chunk=1 << 16):
+    """Nearest palette entry for every RGB row, in chunks"""
+    pal = palette.astype(np.float32)
+    labels = np.empty(len(rgb), dtype=np.int32)
+    for i in range(0, len(rgb), chunk):
+        d = ((rgb[i:i + chunk, None, :].astype(np.float32) - pal[None]) ** 2).sum(axis=2)
+        labels[i:i + chunk] = d.argmin(axis=1)
+    return labels
+
+def load_palette(img_path, pixels, k=PALETTE_SIZE, size=(64, 64), region=None, level=None, cache_dir=None):
+    """Palette, labels and per-entry voice parameters, cached per image and raster"""
+    def compute():
+        palette, labels = median_cut(pixels, k)
+        voices = pixel_params(palette.reshape(-1, 1, 3))
+        return {'palette': palette, 'labels': labels,
+                'freq': voices['freq'], 'harms': voices['harms'], 'amp': voices['amp']}
+    return cached_arrays(img_path, ('palette', k, size, region, level), compute, cache_dir)
+
+# 7. Feature Maps
+FEATURE_SCALE = 4   # least analysis pixels per raster pixel (ZOOM_LEVEL may give more)
+FEATURE_TILE = 512  # analysis tile side (level pixels), bounds working memory
+CONTRAST_RADIUS, CENTER_RADIUS, SURROUND_RADIUS = 4, 2, 12
+FEATURE_HALO = SURROUND_RADIUS + 1
+
+def box_mean(a, r):
+    """Mean over a (2r+1)^2 window, edges padded, same shape as a"""
+    p = np.pad(a.astype(np.float64), r + 1, mode='edge').cumsum(axis=0).cumsum(axis=1)
+    n = 2 * r + 1
+    s = p[n:, n:] - p[:-n, n:] - p[n:, :-n] + p[:-n, :-n]
+    return s[:a.shape[0], :a.shape[1]] / (n * n)
+
+def sobel(a):
+    """Sobel gradient magnitude, edges padded"""
+    p = np.pad(a, 1, mode='edge')
+    gx = (p[:-2, 2:] + 2*p[1:-1, 2:] + p[2:, 2:]) - (p[:-2, :-2] + 2*p[1:-1, :-2] + p[2:, :-2])
+    gy = (p[2:, :-2] + 2*p[2:, 1:-1] + p[2:, 2:]) - (p[:-2, :-2] + 2*p[:-2, 1:-1] + p[:-2, 2:])
+    return np.hypot(gx, gy)
+
+def feature_maps(read, width, height, size, tile=FEATURE_TILE):
+    """Edge, contrast and saliency maps of a width x height RGB source, pooled to size
+
+    read(x0, y0, x1, y1) returns the source pixels of a box as uint8; the
+    source is read and analysed tile by tile (plus a halo) and each tile is
+    pooled straight into the raster cells, so memory stays flat at any
+    resolution.
+    """
+    weights = np.array([0.299, 0.587, 0.114], dtype=np.float32) / 255.0
+    cx, cy = np.arange(width) * size[0] // width, np.arange(height) * size[1] // height
+    sums = {name: np.zeros(size[0] * size[1]) for name in ('edge', 'contrast', 'saliency')}
+    halo = FEATURE_HALO
+    for y0 in range(0, height, tile):
+        for x0 in range(0, width, tile):
+            y1, x1 = min(y0 + tile, height), min(x0 + tile, width)
+            # Tile plus halo, edge-padded where it leaves the source
+            sy0, sx0, sy1, sx1 = max(0, y0 - halo), max(0, x0 - halo), min(height, y1 + halo), min(width, x1 + halo)
+            g = read(sx0, sy0, sx1, sy1).astype(np.float32) @ weights
+            g = np.pad(g, ((halo - (y0 - sy0), halo - (sy1 - y1)), (halo - (x0 - sx0), halo - (sx1 - x1))), mode='edge')
+            inner = (slice(halo, halo + y1 - y0), slice(halo, halo + x1 - x0))
+            cells = (cy[y0:y1, None] * size[0] + cx[None, x0:x1]).ravel()
+            mean = box_mean(g, CONTRAST_RADIUS)
+            for name, m in (('edge', sobel(g)),
+                            ('contrast', np.sqrt(np.maximum(box_mean(g * g, CONTRAST_RADIUS) - mean * mean, 0))),
+                            ('saliency', np.abs(box_mean(g, CENTER_RADIUS) - box_mean(g, SURROUND_RADIUS)))):
+                sums[name] += np.bincount(cells, m[inner].ravel(), minlength=size[0] * size[1])
+    count = np.outer(np.bincount(cy, minlength=size[1]), np.bincount(cx, minlength=size[0])).ravel()
+    return {name: (sm / np.maximum(count, 1)).reshape(size[1], size[0]) for name, sm in sums.items()}
+
+def load_features(img_path, size=(64, 64), region=None, level=None, cache_dir=None):
+    """Feature maps pooled to the scan raster and flattened to scan order, cached"""
+    def compute():
+        pyramid = ImagePyramid(img_path)
+        box = region or (0, 0) + pyramid.size
+        a_size = (size[0] * FEATURE_SCALE, size[1] * FEATURE_SCALE)
+        k = pyramid.level_for(a_size, box) if level is None else pyramid.clamp(level)
+        x0, y0, x1, y1 = pyramid.level_box(k, box)
+        read = lambda a, b, c, d: pyramid.region(k, (x0 + a, y0 + b, x0 + c, y0 + d))
+        out = {}
+        for name, pooled in feature_maps(read, x1 - x0, y1 - y0, size).items():
+            top = np.percentile(pooled, 99) or 1.0
+            out[name] = np.clip(pooled / top, 0, 1).ravel().astype(np.float32)
+        return out
+    return cached_arrays(img_path, ('features', size, region, level, FEATURE_SCALE), compute, cache_dir)
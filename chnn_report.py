@@ -0,0 +1,173 @@
+import os, csv, wave, argparse
+import numpy as np
+from PIL import Image, ImageDraw
+
+"""
+ChNN render report
+================================================================
+Offline check of a rendered scan (a chnn_batch WAV or any 1-4
+channel file), instead of running Scope/Spectrum live:
+
+    python chnn_report.py renders/*.wav
+    python chnn_batch.py images/ renders/ --report
+
+================================================================
+Per channel (FL, FR, RL, RR), computed with NumPy while the file
+is read in blocks:
+- spectrogram: Hann STFT pooled into REPORT_BANDS log-spaced bands (dB)
+- RMS per STFT frame (dBFS) and over the whole file
+- peak and crest factor (peak / RMS, dB)
+Saved next to the WAV as <name>_report.npz, <name>_spectrogram.png
+and <name>_rms.png; the summary goes to the console (and to the
+batch manifest with --report).
+"""
+
+REPORT_FFT = 2048
+REPORT_HOP = 512          # minimum hop, grows so a file gives <= REPORT_FRAMES frames
+REPORT_FRAMES = 4000
+REPORT_BANDS = 256
+REPORT_FMIN = 20.0
+DB_FLOOR = -120.0
+CHANNEL_NAMES = ['FL', 'FR', 'RL', 'RR']
+
+# 1. WAV Reading
+def read_wav_blocks(path, block=1 << 16):
+    """(sample rate, channels, frames, generator of float arrays (n, channels) in -1..1)"""
+    w = wave.open(path, 'rb')
+    sr, nch, width, frames = w.getframerate(), w.getnchannels(), w.getsampwidth(), w.getnframes()
+    if width not in (2, 3, 4):
+        w.close()
+        raise ValueError(f"{path}: {8 * width}-bit samples are not supported")
+
+    def blocks():
+        try:
+            while True:
+                raw = w.readframes(block)
+                if not raw: return
+                if width == 3:  # 24-bit little endian -> int32
+                    b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+                    x = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int32) << 16))
+                    x = np.where(x & 0x800000, x - (1 << 24), x) / float(1 << 23)
+                else:
+                    x = np.frombuffer(raw, dtype='<i2' if width == 2 else '<i4') / float(1 << (8 * width - 1))
+                yield x.reshape(-1, nch)
+        finally:
+            w.close()
+    return sr, nch, frames, blocks()
+
+# 2. Analysis
+def band_edges(sr, nfft=REPORT_FFT, bands=REPORT_BANDS, f_min=REPORT_FMIN):
+    """First FFT bin of each log-spaced band (duplicates removed)"""
+    freqs = np.fft.rfftfreq(nfft, 1.0 / sr)
+    edges = np.geomspace(f_min, sr / 2.0, bands + 1)[:-1]
+    return np.unique(np.searchsorted(freqs, edges)), freqs
+
+def analyze(path, nfft=REPORT_FFT):
+    """Spectrogram, RMS and crest factor of every channel, in one pass over the file"""
+    sr, nch, frames, blocks = read_wav_blocks(path)
+    hop = max(REPORT_HOP, frames // REPORT_FRAMES)
+    window = np.hanning(nfft)
+    wnorm = (window ** 2).sum()
+    starts, freqs = band_edges(sr, nfft)
+    counts = np.diff(np.append(starts, nfft // 2 + 1))
+
+    spec, frame_rms = [], []
+    peak, sumsq, total = np.zeros(nch), np.zeros(nch), 0
+    carry = np.zeros((0, nch))
+    for x in blocks:
+        peak = np.maximum(peak, np.abs(x).max(axis=0))
+        sumsq += (x ** 2).sum(axis=0)
+        total += len(x)
+        buf = np.concatenate([carry, x])
+        n = 0 if len(buf) < nfft else 1 + (len(buf) - nfft) // hop
+        if n:
+            idx = np.arange(n)[:, None] * hop + np.arange(nfft)
+            seg = buf[idx]  # (n, nfft, ch)
+            power = np.abs(np.fft.rfft(seg * window[None, :, None], axis=1)) ** 2 / wnorm
+            spec.append((np.add.reduceat(power, starts, axis=1) / counts[None, :, None]).astype(np.float32))
+            frame_rms.append(np.sqrt((seg ** 2).mean(axis=1)).astype(np.float32))
+        carry = buf[n * hop:]
+
+    spec = np.concatenate(spec) if spec else np.zeros((0, len(starts), nch), dtype=np.float32)
+    frame_rms = np.concatenate(frame_rms) if frame_rms else np.zeros((0, nch), dtype=np.float32)
+    rms = np.sqrt(sumsq / max(total, 1))
+    to_db = lambda a: np.maximum(20 * np.log10(np.maximum(a, 1e-12)), DB_FLOOR)
+    return {
+        'spectrogram_db': np.maximum(10 * np.log10(np.maximum(spec, 1e-20)), DB_FLOOR).transpose(2, 1, 0),  # (ch, band, frame)
+        'band_hz': freqs[starts],
+        'frame_s': (np.arange(len(frame_rms)) * hop + nfft / 2.0) / sr,
+        'frame_rms_db': to_db(frame_rms).T,  # (ch, frame)
+        'rms_db': to_db(rms),
+        'peak_db': to_db(peak),
+        'crest_db': to_db(peak) - to_db(rms),
+        'duration_s': np.array(total / float(sr)),
+    }
+
+# 3. Images
+HEAT = [(0, 0, 0), (40, 10, 90), (160, 30, 90), (240, 110, 30), (255, 240, 150)]
+
+def heat_lut():
+    pos = np.linspace(0, 255, len(HEAT))
+    return np.stack([np.interp(np.arange(256), pos, [c[i] for c in HEAT]) for i in range(3)], axis=1).astype(np.uint8)
+
+def spectrogram_png(report, path, range_db=90):
+    """One panel per channel, low bands at the bottom, a gray line between panels"""
+    spec = report['spectrogram_db']
+    top = spec.max() if spec.size else 0.0
+    level = np.clip((spec - (top - range_db)) / range_db, 0, 1)
+    panels = []
+    for ch in range(len(level)):
+        panels.append(heat_lut()[(level[ch][::-1] * 255).astype(np.uint8)])
+        panels.append(np.full((2, level.shape[2], 3), 128, dtype=np.uint8))
+    Image.fromarray(np.concatenate(panels[:-1]) if panels else np.zeros((1, 1, 3), np.uint8)).save(path)
+
+def rms_png(report, path, size=(1000, 300), floor_db=-80):
+    """Frame RMS of every channel over time, 0 dBFS at the top"""
+    colors = [(230, 80, 80), (80, 200, 80), (80, 140, 240), (230, 200, 60)]
+    img = Image.new('RGB', size, (20, 20, 20))
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    for db in range(0, floor_db - 1, -20):
+        y = int(-db / -floor_db * (h - 1))
+        draw.line([(0, y), (w, y)], fill=(60, 60, 60))
+    for ch, curve in enumerate(report['frame_rms_db']):
+        if len(curve) < 2: continue
+        xs = np.linspace(0, w - 1, len(curve))
+        ys = np.clip(curve / floor_db, 0, 1) * (h - 1)
+        draw.line(list(zip(xs.tolist(), ys.tolist())), fill=colors[ch % len(colors)])
+        draw.text((5 + 30 * ch, 5), CHANNEL_NAMES[ch] if ch < 4 else str(ch), fill=colors[ch % len(colors)])
+    img.save(path)
+
+# 4. Report
+def write_report(wav_path):
+    """Analyze one WAV and save the arrays and PNGs next to it, returns summary fields"""
+    report = analyze(wav_path)
+    base = os.path.splitext(wav_path)[0]
+    np.savez_compressed(base + '_report.npz', **report)
+    spectrogram_png(report, base + '_spectrogram.png')
+    rms_png(report, base + '_rms.png')
+    summary = {}
+    for ch, name in enumerate(CHANNEL_NAMES[:len(report['rms_db'])]):
+        summary[f'rms_db_{name}'] = round(float(report['rms_db'][ch]), 1)
+        summary[f'crest_db_{name}'] = round(float(report['crest_db'][ch]), 1)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Spectrogram, RMS and crest factor of rendered scans")
+    parser.add_argument('wavs', nargs='+', help="WAV files (16/24/32-bit)")
+    parser.add_argument('--csv', help="also write the summaries to this CSV file")
+    opts = parser.parse_args()
+
+    rows = []
+    for path in opts.wavs:
+        summary = write_report(path)
+        rows.append(dict(wav=path, **summary))
+        print(f"--- {path}: " + ", ".join(f"{k} {v}" for k, v in summary.items()) + " ---")
+    if opts.csv and rows:
+        with open(opts.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == '__main__':
+    main()
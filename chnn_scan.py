@@ -1,11 +1,22 @@
 import os
 import wx
-from PIL import Image
+from collections import deque
 from pyo import *
+from chnn_maps import load_cached, load_palette, load_features, scan_order, head_orders, head_orders_size, column_spectra, PALETTE_SIZE, SCAN_ORDERS
+from chnn_engine import TableScan, SpectralScan, PaletteScan, MAX_HEADS
 
 AUDIO_DEVICE = 10
 AUDIO_HOST = 'asio'
 BUFFER_SIZE = 512 
+SCAN_MODE = 0  # 0=Callback (Metro -> TrigFunc), 1=Audio-rate (TableScan), 2=Spectral (SpectralScan), 3=Palette (PaletteScan)
+CURSOR_RATE = 60  # GUI polling rate (Hz) of the scan position
+TRAIL_LENGTH = 24  # cursor positions kept on screen
+SCAN_HEADS = 1  # audio-rate scan heads playing at once (1..MAX_HEADS)
+HEAD_LAYOUT = 'spaced'  # 'spaced' along the scan order, 'tiles' one block per head (4 = quadrants)
+SCAN_ORDER = 'rowmajor'  # pixel path: rowmajor, serpentine, hilbert, morton, spiral, random
+FEATURES = True  # audio-rate scan: edge accents, contrast filter sweep, saliency reverb send
+FEATURE_SEND = 0.4  # extra reverb mix at full saliency
+ANALYZERS = False  # open Scope/Spectrum at start (toggle in the GUI), off = no FFT running
 
 """
 ChNN sonic image
@@ -28,6 +39,8 @@ Auditory display:
 path = './'
 file = '201310 ChNN Barcelona by Paolo Fassoli_09_square'
 target_file = path + file + '.jpg'
+SCAN_REGION = None  # (left, top, right, bottom) in source pixels, None = whole image
+ZOOM_LEVEL = None   # pyramid level (0 = full resolution), None = coarsest adequate
 
 # 2. Server Setup
 s = Server(sr=48000, nchnls=4, duplex=0, buffersize=BUFFER_SIZE, winhost=AUDIO_HOST)
@@ -37,62 +50,160 @@ s.boot().start()
 
 
 # 3. Image Processing
-def load_image_data(img_path, size=(64, 64)):
-    img = Image.open(img_path).convert('RGB')
-    img_res = img.resize(size)
-    pixels = list(img_res.getdata())
-    img_display = img.resize((400, 400))
-    return pixels, size[0], size[1], img_display
-
-pixel_data, width, height, display_img = load_image_data(target_file)
-num_pixels = len(pixel_data)
+# All per-pixel math is done once here, the scan callback only indexes arrays;
+# raster, display bitmap and parameters are memory-mapped from .chnn_cache on warm starts
+pixel_data, width, height, display_img, params = load_cached(target_file, region=SCAN_REGION, level=ZOOM_LEVEL)
+num_pixels = width * height
+p_freq, p_harms, p_amp = params['freq'].tolist(), params['harms'].tolist(), params['amp'].tolist()
+p_gains = params['gains'].tolist()
+scan_perm = scan_order(SCAN_ORDER, width, height).tolist()  # step -> pixel index
 
 # 4. Synth Engine
+# Callback scan: one Blit driven by Sigs/Adsr from Python, panned by pan_ctrl
 env = Adsr(attack=0.002, decay=0.03, sustain=0.1, release=0.01, dur=0.05)
 freq_ctrl = Sig(440)
 harm_ctrl = Sig(10)
-wave = Blit(freq=[freq_ctrl, freq_ctrl*1.005], harms=harm_ctrl, mul=env).mix(1)
+pan_ctrl = Sig([0.25, 0.25, 0.25, 0.25])
+detune = freq_ctrl * 1.005
+blit = Blit(freq=[freq_ctrl, detune], harms=harm_ctrl, mul=env)
+wave = blit.mix(1)
+callback_quad = wave * pan_ctrl
+
+# Audio-rate scan: pooled heads reading tables, each panned to its own pixel
+features = load_features(target_file, region=SCAN_REGION, level=ZOOM_LEVEL) if FEATURES else None
+scan = TableScan(params, orders=head_orders(width, height, SCAN_HEADS, HEAD_LAYOUT, SCAN_ORDER), features=features,
+                 order_size=head_orders_size(width, height, MAX_HEADS))
+
+# Spectral scan: one column per step, row -> partial frequency, brightness -> amplitude
+spectral = SpectralScan(*column_spectra(pixel_data))
+
+# Palette scan: PALETTE_SIZE pre-tuned voices, each pixel opens the gate of its palette entry
+palette = load_palette(target_file, pixel_data, PALETTE_SIZE, region=SCAN_REGION, level=ZOOM_LEVEL)
+palette_scan = PaletteScan(palette, params['gains'], order=scan_perm)
+quad_in = Selector([callback_quad, scan.out, spectral.out, palette_scan.out], voice=SCAN_MODE)
 
-# 5. Effects (Reverb & Compress)
+def select_mode(mode):
+    """Route one scan mode to the effects, the other engines are stopped (no CPU)"""
+    quad_in.voice = mode
+    feature_send.value = FEATURE_SEND if mode == 1 else 0
+    for o in (detune, blit, wave, callback_quad):
+        if mode == 0: o.play()
+        else: o.stop()
+    scan.set_active(mode == 1)
+    spectral.set_active(mode == 2)
+    palette_scan.set_active(mode == 3)
+
+# 5. Effects (Reverb & Compress), one channel per speaker
 rev_mix = Sig(0.3)
-reverb = Freeverb(wave, size=0.8, damp=0.5, bal=rev_mix)
+feature_send = Sig(FEATURE_SEND if SCAN_MODE == 1 else 0)
+reverb = Freeverb(quad_in, size=0.8, damp=0.5, bal=Clip(rev_mix + scan.send * feature_send, 0, 1))
 comp_thresh, comp_ratio = Sig(-20), Sig(4)
 comp = Compress(reverb, thresh=comp_thresh, ratio=comp_ratio, risetime=0.01, falltime=0.1)
 
 # 6. Quad Routing & Level Control
 db_val = Sig(6)
 master_gain = DBToA(db_val)
-pan_front, pan_rear = Sig(0.5), Sig(0.5)
-pan_left, pan_right = Sig(0.5), Sig(0.5)
-
-out_fl = (comp * pan_left * pan_front * master_gain).out(0)
-out_fr = (comp * pan_right * pan_front * master_gain).out(1)
-out_rl = (comp * pan_left * pan_rear * master_gain).out(2)
-out_rr = (comp * pan_right * pan_rear * master_gain).out(3)
+out_quad = (comp * master_gain).out()
 
 # 7. Visual Analysis
-sc = Scope(comp)
-sp = Spectrum(comp)
+# Scope/Spectrum are built the first time they are switched on and paused when off;
+# for mix checks without live DSP, render with chnn_batch --report (chnn_report)
+analyzers = []
+
+def set_analyzers(active):
+    if active and not analyzers:
+        analyzers.extend([Scope(comp), Spectrum(comp)])
+    for a in analyzers:
+        a.poll(active)
+        if active: a.play()
+        else: a.stop()
 
 # 8. wxPython Interface with Compact Sliders
+class ScanCanvas(wx.Panel):
+    """Double-buffered image view with one cursor per scan head and fading trails
+
+    Only the cells that changed since the last poll are invalidated, so the
+    repaint cost does not depend on scan speed.
+    """
+    def __init__(self, parent, bmp, cols, rows):
+        super(ScanCanvas, self).__init__(parent, pos=(0, 0), size=bmp.GetSize())
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.bmp = bmp
+        self.cell_w, self.cell_h = bmp.GetWidth() / cols, bmp.GetHeight() / rows
+        self.trail = deque(maxlen=TRAIL_LENGTH)
+        self.Bind(wx.EVT_PAINT, self.on_paint)
+
+    def cell_rect(self, x, y):
+        return wx.Rect(int(x * self.cell_w), int(y * self.cell_h), int(self.cell_w) + 2, int(self.cell_h) + 2)
+
+    def move_to(self, cells):
+        if self.trail and self.trail[-1] == cells: return
+        # Every trail cell changes shade, the dropped ones must be erased
+        dirty = [cell for step in self.trail for cell in step] + cells
+        self.trail.append(cells)
+        for cell in dirty: self.RefreshRect(self.cell_rect(*cell), eraseBackground=False)
+
+    def reset(self):
+        for step in self.trail:
+            for cell in step: self.RefreshRect(self.cell_rect(*cell), eraseBackground=False)
+        self.trail.clear()
+
+    def on_paint(self, e):
+        dc = wx.AutoBufferedPaintDC(self)
+        dc.SetClippingRegion(self.GetUpdateRegion().GetBox())
+        dc.DrawBitmap(self.bmp, 0, 0)
+        dc.SetBrush(wx.TRANSPARENT_BRUSH)
+        n = len(self.trail)
+        for i, step in enumerate(self.trail):
+            shade = int(80 + 175 * (i + 1) / n)
+            if i == n - 1:
+                dc.SetPen(wx.Pen(wx.Colour(255, 255, 255)))
+                dc.SetBrush(wx.Brush(wx.Colour(255, 255, 255)))
+            else:
+                dc.SetPen(wx.Pen(wx.Colour(shade, shade, shade)))
+            for cell in step:
+                r = self.cell_rect(*cell)
+                dc.DrawRectangle(r.x, r.y, r.width - 2, r.height - 2)
+
 class SonifierFrame(wx.Frame):
     def __init__(self, parent, title, img_obj):
-        super(SonifierFrame, self).__init__(parent, title=title, size=(420, 780))
+        super(SonifierFrame, self).__init__(parent, title=title, size=(420, 1045))
         self.panel = wx.Panel(self)
         
         # Display Image
         wx_img = wx.Image(img_obj.width, img_obj.height)
         wx_img.SetData(img_obj.tobytes())
         self.bmp = wx.Bitmap(wx_img)
-        self.canvas = wx.StaticBitmap(self.panel, -1, self.bmp, pos=(0, 0))
-        self.cursor = wx.Panel(self.panel, size=(400//width, 400//height), pos=(-10, -10))
-        self.cursor.SetBackgroundColour(wx.Colour(255, 255, 255))
+        self.canvas = ScanCanvas(self.panel, self.bmp, width, height)
         
         # Start Button
         y_pos = 410
         self.start_btn = wx.Button(self.panel, label="START SCAN", pos=(10, y_pos), size=(380, 35))
         self.start_btn.Bind(wx.EVT_BUTTON, self.on_start)
 
+        # Scan Mode
+        y_pos += 40
+        self.mode_box = wx.RadioBox(self.panel, label="Scan Mode", pos=(10, y_pos), size=(380, 45),
+                                    choices=["Callback", "Audio-rate", "Spectral", "Palette"], majorDimension=4)
+        self.mode_box.SetSelection(SCAN_MODE)
+        self.mode_box.Bind(wx.EVT_RADIOBOX, self.update_mode)
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.poll_cursor, self.timer)
+
+        # Scan Order (pixel path of every mode except Spectral)
+        y_pos += 50
+        order_lbl = wx.StaticText(self.panel, label="Scan Order", pos=(15, y_pos + 4))
+        order_lbl.SetFont(wx.Font(8, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        self.order_choice = wx.Choice(self.panel, pos=(110, y_pos), size=(280, -1), choices=SCAN_ORDERS)
+        self.order_choice.SetStringSelection(SCAN_ORDER)
+        self.order_choice.Bind(wx.EVT_CHOICE, self.update_order)
+
+        # Analyzers (Scope/Spectrum windows)
+        y_pos += 30
+        self.analyzer_box = wx.CheckBox(self.panel, label="Scope / Spectrum", pos=(15, y_pos))
+        self.analyzer_box.SetValue(ANALYZERS)
+        self.analyzer_box.Bind(wx.EVT_CHECKBOX, self.update_analyzers)
+
         # Slider Helper Function for Thinness
         def create_thin_slider(label, val, mini, maxi, y):
             lbl = wx.StaticText(self.panel, label=label, pos=(15, y))
@@ -107,8 +218,20 @@ class SonifierFrame(wx.Frame):
         self.vol_slider.Bind(wx.EVT_SLIDER, self.update_vol)
         
         y_pos += 45
-        self.speed_slider = create_thin_slider("Scan Speed", 40, 5, 200, y_pos)
+        self.speed_slider = create_thin_slider("Scan Speed", 40, 1, 200, y_pos)
         self.speed_slider.Bind(wx.EVT_SLIDER, self.update_speed)
+
+        y_pos += 45
+        self.rate_slider = create_thin_slider("Audio-rate Speed (px/s)", 100, 25, 10000, y_pos)
+        self.rate_slider.Bind(wx.EVT_SLIDER, self.update_rate)
+
+        y_pos += 45
+        self.heads_slider = create_thin_slider("Audio-rate Scan Heads", SCAN_HEADS, 1, MAX_HEADS, y_pos)
+        self.heads_slider.Bind(wx.EVT_SLIDER, self.update_heads)
+
+        y_pos += 45
+        self.col_slider = create_thin_slider("Spectral Column Time (ms)", 250, 20, 2000, y_pos)
+        self.col_slider.Bind(wx.EVT_SLIDER, self.update_col_time)
         
         y_pos += 45
         self.rev_slider = create_thin_slider("Reverb Mix", 30, 0, 100, y_pos)
@@ -124,46 +247,89 @@ class SonifierFrame(wx.Frame):
 
     def on_start(self, e):
         self.start_btn.Disable()
-        count.reset()
-        met.play()
+        self.mode_box.Disable()
+        self.order_choice.Disable()
+        self.canvas.reset()
+        mode = self.mode_box.GetSelection()
+        if mode == 0:
+            count.reset()
+            met.play()
+        elif mode == 1:
+            scan.play()
+        elif mode == 2:
+            spectral.play()
+        else:
+            palette_scan.play()
+        self.timer.Start(int(1000 / CURSOR_RATE))
+
+    def on_scan_end(self):
+        self.timer.Stop()
+        self.start_btn.Enable()
+        self.mode_box.Enable()
+        self.order_choice.Enable()
 
+    def update_mode(self, e): select_mode(self.mode_box.GetSelection())
+    def update_heads(self, e):
+        scan.set_orders(head_orders(width, height, self.heads_slider.GetValue(), HEAD_LAYOUT, self.order_choice.GetStringSelection()))
+    def update_order(self, e):
+        name = self.order_choice.GetStringSelection()
+        scan_perm[:] = scan_order(name, width, height).tolist()
+        palette_scan.set_order(scan_perm)
+        self.update_heads(e)
+
+    def update_analyzers(self, e): set_analyzers(self.analyzer_box.GetValue())
     def update_vol(self, e): db_val.value = self.vol_slider.GetValue()
     def update_speed(self, e): met.time = self.speed_slider.GetValue() / 1000.0
+    def update_rate(self, e): scan.time.value = palette_scan.time.value = 1.0 / self.rate_slider.GetValue()
+    def update_col_time(self, e): spectral.time.value = self.col_slider.GetValue() / 1000.0
+    def poll_cursor(self, e):
+        mode = self.mode_box.GetSelection()
+        if mode == 2:
+            col = spectral.position()
+            self.canvas.move_to([(col, y) for y in range(height)])
+            return
+        if mode == 0: pixels = [scan_perm[min(int(count.get()), num_pixels - 1)]]
+        elif mode == 1: pixels = scan.positions()
+        else: pixels = [palette_scan.position()]
+        self.canvas.move_to([(idx % width, idx // width) for idx in pixels])
     def update_rev(self, e): rev_mix.value = self.rev_slider.GetValue() / 100.0
     def update_thresh(self, e): comp_thresh.value = self.thresh_slider.GetValue()
     def update_ratio(self, e): comp_ratio.value = self.ratio_slider.GetValue()
-    def update_cursor(self, x, y):
-        self.cursor.SetPosition((int((x/width)*400), int((y/height)*400)))
 
 # 9. Logic
 met = Metro(time=0.04)
 count = Counter(met, min=0, max=num_pixels)
 
 def update_params():
-    idx = int(count.get())
-    if idx < num_pixels - 1:
-        r, g, b = pixel_data[idx]
-        x_idx, y_idx = idx % width, idx // width
-        f_gain = 1.0 - (y_idx / (height - 1)) if height > 1 else 1.0
-        pan_front.value, pan_rear.value = f_gain, 1.0 - f_gain
-        r_side = x_idx / (width - 1) if width > 1 else 0.5
-        pan_right.value, pan_left.value = r_side, 1.0 - r_side
-        gray = (0.299*r + 0.587*g + 0.114*b)
-        freq_ctrl.value = midiToHz((gray / 255.0) * 127.0)
-        total = r + g + b + 1
-        harm_ctrl.value = max(1, (r/total)*45 + (g/total)*20 + (b/total)*5)
-        env.mul = (gray / 255.0) * 0.2
+    step = int(count.get())
+    if step < num_pixels - 1:
+        idx = scan_perm[step]
+        pan_ctrl.value = p_gains[idx]
+        freq_ctrl.value = p_freq[idx]
+        harm_ctrl.value = p_harms[idx]
+        env.mul = p_amp[idx]
         env.play()
-        wx.CallAfter(frame.update_cursor, x_idx, y_idx)
     else:
         met.stop()
-        wx.CallAfter(frame.start_btn.Enable)
+        wx.CallAfter(frame.on_scan_end)
 
 trig = TrigFunc(met, update_params)
 
+def end_table_scan():
+    scan.stop()
+    spectral.stop()
+    palette_scan.stop()
+    wx.CallAfter(frame.on_scan_end)
+
+scan_end = TrigFunc(scan.end, end_table_scan)
+spectral_end = TrigFunc(spectral.end, end_table_scan)
+palette_end = TrigFunc(palette_scan.end, end_table_scan)
+
 # 10. Run
+select_mode(SCAN_MODE)
 s.start()
 app = wx.App(False)
 frame = SonifierFrame(None, "Paolo Fassoli - Compact Quad Scan", display_img)
 frame.Show()
+if ANALYZERS: set_analyzers(True)
 app.MainLoop()
\ No newline at end of file